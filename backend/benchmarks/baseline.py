@@ -0,0 +1,81 @@
+"""Latency statistics, JSON baselines and regression checks for the benchmarks."""
+
+import json
+import platform
+import statistics
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Metrics compared against the baseline and the direction that is worse
+HIGHER_IS_WORSE = ("p50_ms", "p95_ms", "p99_ms", "peak_kib_per_request")
+LOWER_IS_WORSE = ("throughput_rps",)
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile, q in [0, 1]"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def latency_summary(latencies_s: List[float], wall_s: float) -> Dict[str, float]:
+    ms = [s * 1000 for s in latencies_s]
+    return {
+        "requests": len(ms),
+        "p50_ms": round(percentile(ms, 0.50), 2),
+        "p95_ms": round(percentile(ms, 0.95), 2),
+        "p99_ms": round(percentile(ms, 0.99), 2),
+        "mean_ms": round(statistics.fmean(ms), 2),
+        "throughput_rps": round(len(ms) / wall_s, 2),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "recordedAt": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def baseline_path(name: str) -> Path:
+    return BASELINE_DIR / f"{name}.json"
+
+
+def load_baseline(name: str) -> Optional[Dict[str, Any]]:
+    path = baseline_path(name)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(name: str, results: Dict[str, Any]) -> Path:
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, prefix: str = ""
+) -> List[str]:
+    """
+    Regressions of ``current`` against ``baseline``: every compared metric
+    that got worse by more than ``threshold`` (0.2 = 20%), found by walking
+    both result trees in step
+    """
+    regressions = []
+    for key, value in current.items():
+        base = baseline.get(key)
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and isinstance(base, dict):
+            regressions += compare(base, value, threshold, f"{path}.")
+        elif not isinstance(value, (int, float)) or not isinstance(base, (int, float)) or not base:
+            continue
+        elif key in HIGHER_IS_WORSE and value > base * (1 + threshold):
+            regressions.append(f"{path}: {base} -> {value} (+{value / base - 1:.0%})")
+        elif key in LOWER_IS_WORSE and value < base * (1 - threshold):
+            regressions.append(f"{path}: {base} -> {value} ({value / base - 1:.0%})")
+    return regressions
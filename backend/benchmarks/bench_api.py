@@ -0,0 +1,277 @@
+"""
+End-to-end API benchmark for the chat and writing pipelines.
+
+Drives the FastAPI app in process (httpx ASGI transport, no sockets) with:
+POST /chat for text messages and writing forms, GET /chats, GET /writings
+and GET /analytics/summary. MongoDB is replaced by mongomock (optionally
+with a fixed latency per operation) and the LLM by the fake provider mode
+with a latency distribution, so no network or quota is needed.
+
+For each endpoint and concurrency level it reports p50/p95/p99 latency and
+throughput; a sequential pass under tracemalloc reports the peak memory
+allocated while serving one request and the memory retained per request.
+
+    cd backend
+    python -m benchmarks.bench_api
+    python -m benchmarks.bench_api --concurrency 1,8,32 --requests 96 --latency lognormal:0.2,0.3
+    python -m benchmarks.bench_api --mongo-latency 0.005   # simulated server round trips
+    python -m benchmarks.bench_api --save-baseline    # write benchmarks/baselines/api.json
+    python -m benchmarks.bench_api --threshold 0.25   # compare; exit 1 on regression
+
+Results are compared against the stored baseline when there is one; any
+latency or allocation metric higher, or throughput lower, by more than
+--threshold is flagged. Baselines are machine-specific: record one on the
+machine that runs the comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.baseline import (
+    compare,
+    environment,
+    latency_summary,
+    load_baseline,
+    save_baseline,
+)
+from benchmarks.fakes import install_offline_backend
+
+BASELINE_NAME = "api"
+
+TEXT_MESSAGES = [
+    "Hello! What is your favourite animal?",
+    "How can I make my stories more exciting?",
+    "Why is the sky blue?",
+    "Can you show me how I did on my last writing?",
+]
+
+WRITING = (
+    "Last weekend I went to the park with my family. We played ball and "
+    "I saw a big brown dog. It ran after the ball and made me laugh. "
+    "Then we ate sandwiches under a tree. It was day number {i}."
+)
+
+# name -> (method, path, body factory taking the request number)
+Request = Tuple[str, str, Any]
+Scenario = Callable[[int], Request]
+
+
+def chat_text(i: int) -> Request:
+    return "POST", "/chat", {
+        "tempId": f"bench-text-{time.monotonic_ns()}-{i}",
+        "role": "user",
+        "content": f"{TEXT_MESSAGES[i % len(TEXT_MESSAGES)]} ({i})",
+        "type": "text",
+    }
+
+
+def chat_writing(i: int) -> Request:
+    # Unique text per request, so the duplicate check does not short-circuit
+    return "POST", "/chat", {
+        "tempId": f"bench-writing-{time.monotonic_ns()}-{i}",
+        "role": "user",
+        "content": "My weekend",
+        "type": "form",
+        "formType": "writing",
+        "payload": {
+            "title": f"My weekend {i}",
+            "text": WRITING.format(i=f"{i}-{time.monotonic_ns()}"),
+        },
+    }
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "chat_text": chat_text,
+    "chat_writing": chat_writing,
+    "get_chats": lambda i: ("GET", "/chats", None),
+    "get_writings": lambda i: ("GET", "/writings", None),
+    "analytics_summary": lambda i: ("GET", "/analytics/summary", None),
+}
+
+
+def seed_database(chats: int, writings: int):
+    """History for the read endpoints, as the app itself would store it"""
+    from db.client import MongoDBClient
+    from db.constants import CollectionName
+    from db.models import EnglishWriting
+
+    db = MongoDBClient.get_db()
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    db[CollectionName.CHATHISTORY.value].insert_many(
+        [
+            {
+                "role": "user" if i % 2 == 0 else "ai",
+                "type": "text",
+                "content": TEXT_MESSAGES[i % len(TEXT_MESSAGES)],
+                "created_at": start + timedelta(minutes=i),
+            }
+            for i in range(chats)
+        ]
+    )
+    db[CollectionName.ENG_WRITINGS.value].insert_many(
+        [
+            {
+                "title": f"Seed writing {i}",
+                "text": WRITING.format(i=i),
+                "genre": "narrative",
+                "subjects": ["family", "park"],
+                "feedback_student": "Great job!",
+                "feedback_parent": "Good use of past tense.",
+                "overall_score": 5 + i % 5,
+                "rubric_scores": [],
+                "improved_text": WRITING.format(i=i),
+                "word_count": 45,
+                # mongomock ignores partial indexes: every row needs its hash
+                "content_hash": EnglishWriting.compute_content_hash(
+                    f"Seed writing {i}", WRITING.format(i=i)
+                ),
+                "created_at": start + timedelta(hours=i),
+                "updated_at": start + timedelta(hours=i),
+            }
+            for i in range(writings)
+        ]
+    )
+
+
+async def send(client, scenario: Scenario, i: int) -> float:
+    method, path, body = scenario(i)
+    start = time.perf_counter()
+    response = await client.request(method, path, json=body)
+    elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        raise RuntimeError(f"{method} {path} -> {response.status_code}: {response.text[:200]}")
+    return elapsed
+
+
+async def run_level(client, scenario: Scenario, requests: int, concurrency: int) -> Dict[str, float]:
+    """``requests`` requests, at most ``concurrency`` in flight at a time"""
+    latencies: List[float] = []
+    numbers = iter(range(requests))
+
+    async def worker():
+        for i in numbers:
+            latencies.append(await send(client, scenario, i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latency_summary(latencies, time.perf_counter() - start)
+
+
+async def measure_allocations(client, scenario: Scenario, requests: int) -> Dict[str, float]:
+    """Peak allocation while serving one request, and memory kept afterwards"""
+    await send(client, scenario, 0)  # first-call imports and caches
+    peaks = []
+    tracemalloc.start()
+    try:
+        retained_start = tracemalloc.get_traced_memory()[0]
+        for i in range(requests):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await send(client, scenario, i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        retained = tracemalloc.get_traced_memory()[0] - retained_start
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+    return {
+        "peak_kib_per_request": round(peaks[len(peaks) // 2] / 1024, 1),
+        "retained_kib_per_request": round(retained / requests / 1024, 1),
+    }
+
+
+async def run_benchmarks(args) -> Dict[str, Any]:
+    import httpx
+
+    from main import app
+    from workflows.registry import GraphRegistry
+
+    GraphRegistry.warmup()
+    seed_database(args.seed_chats, args.seed_writings)
+
+    results: Dict[str, Any] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        for name in args.scenarios:
+            scenario = SCENARIOS[name]
+            levels = {}
+            for concurrency in args.concurrency:
+                summary = await run_level(client, scenario, args.requests, concurrency)
+                levels[str(concurrency)] = summary
+                print(f"  {name:18s} c={concurrency:<3d} {format_level(summary)}", file=sys.stderr)
+            allocations = await measure_allocations(client, scenario, args.alloc_requests)
+            print(f"  {name:18s} allocations {allocations}", file=sys.stderr)
+            results[name] = {"concurrency": levels, "allocations": allocations}
+    return results
+
+
+def format_level(summary: Dict[str, float]) -> str:
+    return (
+        f"p50={summary['p50_ms']:8.1f}ms  p95={summary['p95_ms']:8.1f}ms  "
+        f"p99={summary['p99_ms']:8.1f}ms  throughput={summary['throughput_rps']:7.1f} req/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", default="lognormal:0.2,0.3", help="fake LLM latency spec")
+    parser.add_argument(
+        "--mongo-latency", type=float, default=0.0, help="seconds added to every Mongo operation"
+    )
+    parser.add_argument("--concurrency", default="1,8,32", help="comma-separated levels")
+    parser.add_argument("--requests", type=int, default=64, help="requests per level")
+    parser.add_argument("--alloc-requests", type=int, default=10)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seed-chats", type=int, default=500)
+    parser.add_argument("--seed-writings", type=int, default=100)
+    parser.add_argument("--threshold", type=float, default=0.2, help="regression threshold (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    args.scenarios = args.scenarios.split(",")
+
+    install_offline_backend(args.latency, mongo_latency=args.mongo_latency)
+    scenarios = asyncio.run(run_benchmarks(args))
+
+    results = {
+        "config": {
+            "latency": args.latency,
+            "mongo_latency": args.mongo_latency,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": {"chats": args.seed_chats, "writings": args.seed_writings},
+        },
+        "environment": environment(),
+        "scenarios": scenarios,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        print(f"baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is None:
+        print("no baseline yet; record one with --save-baseline")
+        return
+    if baseline.get("config") != results["config"]:
+        print("warning: baseline was recorded with a different configuration")
+    regressions = compare(baseline["scenarios"], scenarios, args.threshold)
+    if regressions:
+        print(f"REGRESSIONS (> {args.threshold:.0%} worse than baseline):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"no regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
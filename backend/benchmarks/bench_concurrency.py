@@ -0,0 +1,73 @@
+"""
+Concurrent /chat throughput on a single event loop, blocking vs. async graph.
+
+Every chat makes two fake LLM calls (routing + answer) that each sleep for
+--latency seconds, plus the chat-history inserts into an in-memory Mongo.
+The blocking mode reproduces the old handler (graph.invoke inside an async
+endpoint); the async mode is the current one (await graph.ainvoke).
+
+    cd backend
+    python -m benchmarks.bench_concurrency --concurrency 50 --latency 0.2
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.fakes import install_fakes
+
+
+def chat_state():
+    from db.constants import ChatHistoryRole, ChatHistoryType
+    from workflows.states import SupervisorState
+
+    return SupervisorState(
+        role=ChatHistoryRole.USER,
+        userContent="Hello! What is your favourite animal?",
+        type=ChatHistoryType.TEXT,
+    )
+
+
+async def blocking_chat(graph):
+    # What chat() used to do: a synchronous invoke on the event loop thread
+    return graph.invoke(chat_state())
+
+
+async def async_chat(graph):
+    return await graph.ainvoke(chat_state())
+
+
+async def run(handler, graph, concurrency: int) -> float:
+    start = time.perf_counter()
+    results = await asyncio.gather(*(handler(graph) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    assert all(r.get("AIMsgId") for r in results)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    install_fakes(args.latency)
+    from workflows.registry import GraphRegistry
+
+    graph = GraphRegistry.get("supervisor")
+    GraphRegistry.warmup()
+
+    ideal = 2 * args.latency
+    print(f"{args.concurrency} concurrent chats, 2 LLM calls x {args.latency}s each")
+    print(f"(a single chat needs at least {ideal:.2f}s)\n")
+
+    for name, handler in (("blocking invoke", blocking_chat), ("async ainvoke", async_chat)):
+        elapsed = asyncio.run(run(handler, graph, args.concurrency))
+        print(
+            f"{name:16s}: wall={elapsed:7.2f}s  "
+            f"throughput={args.concurrency / elapsed:7.1f} chats/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
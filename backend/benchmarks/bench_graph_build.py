@@ -0,0 +1,79 @@
+"""
+Per-request graph overhead: building graphs on every request vs. the registry.
+
+Measures only graph construction/compilation, not LLM or Mongo work, so no
+network access is needed.
+
+    cd backend
+    python -m benchmarks.bench_graph_build --requests 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+# The analysis builder creates its LLM client; a placeholder key keeps the
+# provider from failing. No request is ever sent.
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-placeholder")
+
+from workflows.registry import GraphRegistry  # noqa: E402
+from workflows.supervisor import build_supervisor  # noqa: E402
+from workflows.workflow_analysis import build_analysis_workflow  # noqa: E402
+from workflows.workflow_general import build_general_workflow  # noqa: E402
+from workflows.workflow_writing import build_writing_workflow  # noqa: E402
+
+# Sub-graph a request compiles on top of the supervisor, as in the old /chat path
+SUBGRAPH_BUILDERS = {
+    "writing": build_writing_workflow,
+    "analysis": build_analysis_workflow,
+    "general": build_general_workflow,
+}
+
+
+def per_request_build(subgraph: str):
+    build_supervisor()
+    SUBGRAPH_BUILDERS[subgraph]()
+
+
+def per_request_registry(subgraph: str):
+    GraphRegistry.get("supervisor")
+    GraphRegistry.get(subgraph)
+
+
+def measure(fn, subgraph: str, requests: int) -> list[float]:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        fn(subgraph)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return f"mean={statistics.mean(ordered):8.3f}ms  p50={statistics.median(ordered):8.3f}ms  p95={p95:8.3f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    GraphRegistry.warmup()
+    print(f"registry warmup (one-off): {(time.perf_counter() - start) * 1000:.1f}ms\n")
+
+    for subgraph in SUBGRAPH_BUILDERS:
+        before = measure(per_request_build, subgraph, args.requests)
+        after = measure(per_request_registry, subgraph, args.requests)
+        speedup = statistics.mean(before) / max(statistics.mean(after), 1e-9)
+        print(f"[{subgraph}]")
+        print(f"  build per request : {summarize(before)}")
+        print(f"  registry          : {summarize(after)}")
+        print(f"  speedup           : {speedup:,.0f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Startup benchmark: import time, warmup and the first requests of a fresh process.
+
+Every run starts a new interpreter (offline backend: fake LLM provider and
+mongomock) and times:
+
+- import: ``import main``
+- warmup: the FastAPI lifespan startup (graph compilation, workflow
+  instances, job workers); skipped in the cold variant
+- first_request / second_request: POST /chat with a text message
+
+The warm variant is what a server does; the cold variant shows what the
+first request pays when nothing was initialized up front.
+
+    cd backend
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --save-baseline
+    python -m benchmarks.bench_startup --threshold 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.baseline import (
+    compare,
+    environment,
+    load_baseline,
+    percentile,
+    save_baseline,
+)
+
+BASELINE_NAME = "startup"
+PHASES = ("import", "warmup", "first_request", "second_request")
+VARIANTS = ("warm", "cold")
+
+
+def child(variant: str):
+    """One measured process start; prints the phase timings as JSON"""
+    timings: Dict[str, float] = {}
+    start = time.perf_counter()
+    import main
+
+    timings["import"] = time.perf_counter() - start
+
+    # Clients and models are created on first use, so this can follow the import
+    from benchmarks.fakes import install_offline_backend
+
+    install_offline_backend("fixed:0")
+
+    async def run():
+        import httpx
+
+        async def chat(client, i):
+            start = time.perf_counter()
+            response = await client.post(
+                "/chat",
+                json={
+                    "tempId": f"startup-{variant}-{i}-{time.monotonic_ns()}",
+                    "role": "user",
+                    "content": "Hello! What is your favourite animal?",
+                    "type": "text",
+                },
+            )
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            if variant == "warm":
+                start = time.perf_counter()
+                async with main.app.router.lifespan_context(main.app):
+                    timings["warmup"] = time.perf_counter() - start
+                    timings["first_request"] = await chat(client, 1)
+                    timings["second_request"] = await chat(client, 2)
+            else:
+                timings["first_request"] = await chat(client, 1)
+                timings["second_request"] = await chat(client, 2)
+
+    asyncio.run(run())
+    print(json.dumps({k: round(v * 1000, 2) for k, v in timings.items()}))
+
+
+def measure(variant: str) -> Dict[str, float]:
+    env = {**os.environ, "LOG_LEVEL": "WARNING"}
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", variant],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"startup run failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples),
+        "p50_ms": round(percentile(samples, 0.50), 2),
+        "p95_ms": round(percentile(samples, 0.95), 2),
+        "mean_ms": round(statistics.fmean(samples), 2),
+    }
+
+
+def run_benchmarks(runs: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for variant in VARIANTS:
+        samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+        for _ in range(runs):
+            for phase, ms in measure(variant).items():
+                samples[phase].append(ms)
+        results[variant] = {phase: summary(s) for phase, s in samples.items() if s}
+        for phase, stats in results[variant].items():
+            print(
+                f"  {variant:5s} {phase:15s} p50={stats['p50_ms']:8.1f}ms  "
+                f"p95={stats['p95_ms']:8.1f}ms",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="process starts per variant")
+    parser.add_argument("--threshold", type=float, default=0.25, help="regression threshold")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--child", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    results = {
+        "config": {"runs": args.runs},
+        "environment": environment(),
+        "variants": run_benchmarks(args.runs),
+    }
+    if args.save_baseline:
+        print(f"baseline saved to {save_baseline(BASELINE_NAME, results)}")
+        return
+
+    baseline = load_baseline(BASELINE_NAME)
+    if baseline is None:
+        print("no baseline yet; record one with --save-baseline")
+        return
+    regressions = compare(baseline["variants"], results["variants"], args.threshold)
+    if regressions:
+        print(f"REGRESSIONS (> {args.threshold:.0%} worse than baseline):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"no regressions above {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
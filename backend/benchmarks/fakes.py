@@ -0,0 +1,111 @@
+"""Offline stand-ins for Gemini and MongoDB used by the benchmarks."""
+
+import asyncio
+import time
+from typing import Any, List, Optional
+
+import mongomock
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from tests.async_mongomock import AsyncMongomockClient
+
+
+class LatencyFakeChatModel(BaseChatModel):
+    """Chat model that answers with a fixed text after a fixed delay"""
+
+    latency: float = 0.2
+    response: str = "general"
+
+    @property
+    def _llm_type(self) -> str:
+        return "latency-fake"
+
+    def _result(self) -> ChatResult:
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=self.response))]
+        )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return self._result()
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._result()
+
+
+class _SlowProxy:
+    """Sync mongomock client/database/collection with ``latency`` per operation"""
+
+    def __init__(self, target, latency: float):
+        self._target = target
+        self._latency = latency
+
+    def __getitem__(self, name: str):
+        return _SlowProxy(self._target[name], self._latency)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if isinstance(attr, (mongomock.Database, mongomock.Collection)):
+            return _SlowProxy(attr, self._latency)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if isinstance(result, (mongomock.Database, mongomock.Collection)):
+                return _SlowProxy(result, self._latency)
+            time.sleep(self._latency)
+            return result
+
+        return call
+
+
+def install_fakes(latency: float):
+    """Point LLMProvider and MongoDBClient at in-process fakes"""
+    from db.client import MongoDBClient
+    from llm.provider import LLMProvider
+
+    LLMProvider._llmInstance = LatencyFakeChatModel(latency=latency)
+    client = mongomock.MongoClient()
+    MongoDBClient._client = client
+    MongoDBClient._async_client = AsyncMongomockClient(client)
+
+
+def install_offline_backend(latency: str, seed: int = 0, mongo_latency: float = 0.0):
+    """
+    Run the whole backend offline: the fake LLM provider mode with the given
+    latency distribution and an in-memory Mongo, optionally with
+    ``mongo_latency`` seconds per operation to stand in for the server round
+    trip. Must run before the app's warmup or first request, which create the
+    Mongo clients and the models.
+    """
+    import os
+
+    os.environ["LLM_PROVIDER_MODE"] = "fake"
+    os.environ["LLM_FAKE_LATENCY"] = latency
+    os.environ["LLM_FAKE_SEED"] = str(seed)
+    # Measure the pipeline, not cache hits on repeated prompts
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ.setdefault("LLM_MAX_CONCURRENCY", "256")
+    os.environ.setdefault("LLM_MAX_QUEUE", "1024")
+
+    from db.client import MongoDBClient
+
+    client = mongomock.MongoClient()
+    MongoDBClient._client = _SlowProxy(client, mongo_latency) if mongo_latency else client
+    MongoDBClient._async_client = AsyncMongomockClient(client, mongo_latency)
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from bson import ObjectId
+from cachetools import TTLCache
+from fastapi.encoders import jsonable_encoder
+from pymongo.errors import DuplicateKeyError
+
+from db.constants import CollectionName
+from db.indexes import INDEXES
+
+logger = logging.getLogger(__name__)
+
+IN_FLIGHT = "in_flight"
+COMPLETED = "completed"
+
+
+class IdempotencyConflict(Exception):
+    """The key is still being processed elsewhere and did not finish in time"""
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a request with a different body"""
+
+
+class IdempotencyStore:
+    """
+    Idempotency records for chat requests, keyed by the frontend ``tempId``.
+
+    A request either owns its key and runs, or is a duplicate:
+    - a duplicate of a request running in this process awaits the same
+      execution (single-flight);
+    - a duplicate of a request running in another worker polls the shared
+      record until it completes;
+    - a duplicate of a completed request gets the stored response.
+
+    Completed responses are kept in-process and in a MongoDB collection with
+    a TTL index on ``expiresAt``. A failed execution deletes its record so the
+    client can retry. An in-flight record holds a lease, renewed while the
+    request runs; if its worker dies, the record expires and the next retry
+    runs the request again. Records are written only by the claim that owns
+    them, so a run that lost its lease never overwrites its successor's.
+
+    Configuration (environment):
+    - IDEMPOTENCY_TTL_SECONDS: how long completed responses are kept (default 86400)
+    - IDEMPOTENCY_LEASE_SECONDS: lifetime of an in-flight record without a
+      renewal (default 300)
+    - IDEMPOTENCY_WAIT_SECONDS: how long a duplicate waits for another
+      worker before giving up with a conflict (default 120)
+    - IDEMPOTENCY_PERSISTENT: "false" keeps records in-process only
+    """
+
+    def __init__(
+        self,
+        ttl: int = 86400,
+        lease: int = 300,
+        wait_timeout: float = 120,
+        poll_interval: float = 0.2,
+        persistent: bool = True,
+        collection=None,
+        maxsize: int = 10000,
+    ):
+        self.ttl = ttl
+        self.lease = lease
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.persistent = persistent
+        self._collection = collection
+        self._index_ready = False
+        # key -> (fingerprint, response) and key -> (fingerprint, future)
+        self._completed: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        # key -> (claim token, lease renewal task) for keys this process runs
+        self._claims: Dict[str, Tuple[str, asyncio.Task]] = {}
+
+    @classmethod
+    def from_env(cls) -> "IdempotencyStore":
+        return cls(
+            ttl=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+            lease=int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "300")),
+            wait_timeout=float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120")),
+            persistent=os.getenv("IDEMPOTENCY_PERSISTENT", "true").lower() != "false",
+        )
+
+    # Persistent records (async client)
+
+    async def _get_collection(self):
+        collection = self._collection
+        if collection is None:
+            from db.client import MongoDBClient
+
+            # Looked up on use: the async client belongs to the event loop
+            collection = MongoDBClient.get_async_db()[CollectionName.IDEMPOTENCY.value]
+        if not self._index_ready:
+            await collection.create_indexes(INDEXES[CollectionName.IDEMPOTENCY])
+            self._index_ready = True
+        return collection
+
+    async def _claim(self, key: str, fingerprint: str, owner: str) -> Optional[Dict[str, Any]]:
+        """Insert an in-flight record; returns the existing record if there is one"""
+        now = datetime.now(timezone.utc)
+        collection = await self._get_collection()
+        try:
+            await collection.insert_one(
+                {
+                    "_id": key,
+                    "status": IN_FLIGHT,
+                    "fingerprint": fingerprint,
+                    "owner": owner,
+                    "createdAt": now,
+                    "expiresAt": now + timedelta(seconds=self.lease),
+                }
+            )
+            return None
+        except DuplicateKeyError:
+            existing = await collection.find_one({"_id": key})
+            if existing is None:
+                # Expired between insert and read; try once more
+                return await self._claim(key, fingerprint, owner)
+            return existing
+
+    async def _renew(self, key: str, owner: str) -> bool:
+        collection = await self._get_collection()
+        result = await collection.update_one(
+            {"_id": key, "status": IN_FLIGHT, "owner": owner},
+            {"$set": {"expiresAt": datetime.now(timezone.utc) + timedelta(seconds=self.lease)}},
+        )
+        return result.modified_count == 1
+
+    async def _store(self, key: str, owner: str, response: Dict[str, Any]):
+        # Upsert: the record may have expired during a long run, which is
+        # fine as long as nobody else claimed the key meanwhile
+        collection = await self._get_collection()
+        try:
+            await collection.update_one(
+                {"_id": key, "owner": owner},
+                {
+                    "$set": {
+                        "status": COMPLETED,
+                        "response": response,
+                        "expiresAt": datetime.now(timezone.utc) + timedelta(seconds=self.ttl),
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            logger.warning("Idempotency record %s was claimed by another run", key)
+
+    async def _release(self, key: str, owner: str):
+        collection = await self._get_collection()
+        await collection.delete_one({"_id": key, "status": IN_FLIGHT, "owner": owner})
+
+    async def _keep_lease(self, key: str, owner: str):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                if not await self._renew(key, owner):
+                    logger.warning("Lost the idempotency lease on %s", key)
+                    return
+            except Exception as e:
+                logger.warning("Failed to renew idempotency lease %s: %s", key, e)
+
+    def _hold(self, key: str, owner: str):
+        """Keep the lease on a key this process now runs"""
+        self._claims[key] = (owner, asyncio.create_task(self._keep_lease(key, owner)))
+
+    async def _wait_for_other_worker(
+        self, key: str, fingerprint: str, owner: str, record: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Poll a record owned by another worker; None means we now own the key"""
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            if record.get("fingerprint") != fingerprint:
+                raise IdempotencyKeyReused(key)
+            if record.get("status") == COMPLETED:
+                return record["response"]
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict(key)
+            await asyncio.sleep(self.poll_interval)
+            collection = await self._get_collection()
+            record = await collection.find_one({"_id": key})
+            if record is None:
+                # The owner failed or its lease expired: take over
+                record = await self._claim(key, fingerprint, owner)
+                if record is None:
+                    return None
+
+    # Public API
+
+    async def begin(self, key: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Claim ``key`` for a request with body ``fingerprint``.
+
+        Returns None when the caller owns the key and must run the request,
+        then call complete() or fail(). Otherwise returns the response of the
+        original request, waiting for it if it is still running.
+        """
+        # No awaits until the in-flight future is registered, so concurrent
+        # duplicates in this process see it
+        local = self._completed.get(key) or self._inflight.get(key)
+        if local is not None:
+            owner_fingerprint, result = local
+            if owner_fingerprint != fingerprint:
+                raise IdempotencyKeyReused(key)
+            if isinstance(result, asyncio.Future):
+                return await asyncio.shield(result)
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        if not self.persistent:
+            return None
+
+        owner = uuid.uuid4().hex
+        try:
+            record = await self._claim(key, fingerprint, owner)
+            response = (
+                None
+                if record is None
+                else await self._wait_for_other_worker(key, fingerprint, owner, record)
+            )
+        except Exception as e:
+            self._finish(key, error=e)
+            raise
+
+        if response is not None:
+            self._finish(key, response=response)
+        else:
+            self._hold(key, owner)
+        return response
+
+    async def complete(self, key: str, response: Any) -> Dict[str, Any]:
+        """
+        Store the response of the request that owns ``key``; returns it in
+        the JSON-compatible form duplicates will receive
+        """
+        response = jsonable_encoder(response, custom_encoder={ObjectId: str})
+        owner = self._drop_claim(key)
+        if owner is not None:
+            try:
+                await self._store(key, owner, response)
+            except Exception as e:
+                logger.warning("Failed to store idempotency record %s: %s", key, e)
+        self._finish(key, response=response)
+        return response
+
+    async def fail(self, key: str, error: BaseException):
+        """Release ``key`` after a failed execution so the client can retry"""
+        owner = self._drop_claim(key)
+        if owner is not None:
+            try:
+                await self._release(key, owner)
+            except Exception as e:
+                logger.warning("Failed to release idempotency record %s: %s", key, e)
+        self._finish(key, error=error)
+
+    def _drop_claim(self, key: str) -> Optional[str]:
+        """Stop renewing the lease on ``key``; returns the claim token, if any"""
+        owner, renewal = self._claims.pop(key, (None, None))
+        if renewal is not None:
+            renewal.cancel()
+        return owner
+
+    def _finish(self, key: str, response: Any = None, error: BaseException = None):
+        fingerprint, future = self._inflight.pop(key, (None, None))
+        if error is None and fingerprint is not None:
+            self._completed[key] = (fingerprint, response)
+        if future is not None and not future.done():
+            if error is None:
+                future.set_result(response)
+            else:
+                future.set_exception(error)
+                # Duplicates may not be waiting; don't warn about it
+                future.exception()
+
+    async def run(
+        self, key: str, fingerprint: str, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Run ``func`` at most once per key and return its (stored) response"""
+        response = await self.begin(key, fingerprint)
+        if response is not None:
+            return response
+        try:
+            response = await func()
+        except BaseException as e:
+            await self.fail(key, e)
+            raise
+        return await self.complete(key, response)
@@ -0,0 +1,397 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pymongo import ASCENDING, ReturnDocument
+
+from core.tracing import Tracing
+from db.constants import CollectionName
+from db.indexes import INDEXES
+from llm.admission import AdmissionRejected
+from llm.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# No LLM capacity for the job right now, through no fault of its own: it is
+# put back without using up an attempt. Other errors, provider errors that
+# outlasted their retries included, count as failed attempts.
+DEFERRABLE_ERRORS = (AdmissionRejected, CircuitOpenError)
+
+# handler(input, report) -> result; report(node, update) records progress
+ProgressReporter = Callable[[str, Dict[str, Any]], Awaitable[None]]
+JobHandler = Callable[[Dict[str, Any], ProgressReporter], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """
+    Job queue persisted in MongoDB and shared by every backend process.
+
+    A worker claims the oldest queued job, or a running job whose lease has
+    expired (its worker crashed or hung), with a single find_one_and_update,
+    so two workers never hold the same job. The owner renews the lease while
+    the job runs; progress, result and failure updates only apply while the
+    caller still owns it. Failed jobs are re-queued until ``max_attempts``,
+    each retry waiting twice as long as the last, from ``retry_backoff_seconds``.
+    A job is deferred at most ``max_deferrals`` times; after that, running out
+    of capacity counts as a failed attempt too.
+
+    Methods are blocking (pymongo) and used by the workers through
+    asyncio.to_thread; the request handlers' enqueue and read have
+    ``a``-prefixed variants on the async client.
+    """
+
+    def __init__(
+        self,
+        lease_seconds: int = 60,
+        max_attempts: int = 3,
+        retention_seconds: int = 7 * 24 * 3600,
+        retry_backoff_seconds: float = 30,
+        max_deferrals: int = 20,
+        collection=None,
+        async_collection=None,
+    ):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.max_deferrals = max_deferrals
+        self.retention_seconds = retention_seconds
+        self._collection = collection
+        self._async_collection = async_collection
+        self._indexes_ready = False
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        return cls(
+            lease_seconds=int(os.getenv("JOB_LEASE_SECONDS", "60")),
+            max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+            retention_seconds=int(os.getenv("JOB_RETENTION_SECONDS", str(7 * 24 * 3600))),
+            retry_backoff_seconds=float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "30")),
+            max_deferrals=int(os.getenv("JOB_MAX_DEFERRALS", "20")),
+        )
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            from db.client import MongoDBClient
+
+            self._collection = MongoDBClient.get_db()[CollectionName.JOBS.value]
+        if not self._indexes_ready:
+            self._collection.create_indexes(INDEXES[CollectionName.JOBS])
+            self._indexes_ready = True
+        return self._collection
+
+    @property
+    def acollection(self):
+        """The same collection on the async client, looked up on use"""
+        if self._async_collection is not None:
+            return self._async_collection
+        from db.client import MongoDBClient
+
+        return MongoDBClient.get_async_db()[CollectionName.JOBS.value]
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _new_job(self, kind: str, job_input: Dict[str, Any]) -> Dict[str, Any]:
+        now = self._now()
+        return {
+            "kind": kind,
+            "status": QUEUED,
+            "input": job_input,
+            "progress": [],
+            "attempts": 0,
+            "createdAt": now,
+            "updatedAt": now,
+        }
+
+    def enqueue(self, kind: str, job_input: Dict[str, Any]) -> str:
+        result = self.collection.insert_one(self._new_job(kind, job_input))
+        return str(result.inserted_id)
+
+    async def aenqueue(self, kind: str, job_input: Dict[str, Any]) -> str:
+        result = await self.acollection.insert_one(self._new_job(kind, job_input))
+        return str(result.inserted_id)
+
+    @staticmethod
+    def _job_query(job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return {"_id": ObjectId(job_id)}
+        except Exception:
+            return None
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        query = self._job_query(job_id)
+        return None if query is None else self.collection.find_one(query)
+
+    async def aget(self, job_id: str) -> Optional[Dict[str, Any]]:
+        query = self._job_query(job_id)
+        return None if query is None else await self.acollection.find_one(query)
+
+    def claim(self, owner: str, kinds: List[str]) -> Optional[Dict[str, Any]]:
+        """Take the oldest available job, or one whose lease has expired"""
+        now = self._now()
+        return self.collection.find_one_and_update(
+            {
+                "kind": {"$in": kinds},
+                "$or": [
+                    {"status": QUEUED, "notBefore": {"$not": {"$gt": now}}},
+                    {"status": RUNNING, "leaseExpiresAt": {"$lt": now}},
+                ],
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "leaseOwner": owner,
+                    "leaseExpiresAt": now + timedelta(seconds=self.lease_seconds),
+                    "startedAt": now,
+                    "updatedAt": now,
+                    "progress": [],
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("createdAt", ASCENDING)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def _owned(self, job_id, owner: str) -> Dict[str, Any]:
+        return {"_id": job_id, "status": RUNNING, "leaseOwner": owner}
+
+    def renew(self, job_id, owner: str) -> bool:
+        now = self._now()
+        result = self.collection.update_one(
+            self._owned(job_id, owner),
+            {
+                "$set": {
+                    "leaseExpiresAt": now + timedelta(seconds=self.lease_seconds),
+                    "updatedAt": now,
+                }
+            },
+        )
+        return result.modified_count == 1
+
+    def record_progress(self, job_id, owner: str, node: str, ms: Optional[float] = None):
+        now = self._now()
+        self.collection.update_one(
+            self._owned(job_id, owner),
+            {
+                "$push": {"progress": {"node": node, "ms": ms, "at": now}},
+                "$set": {"currentNode": node, "updatedAt": now},
+            },
+        )
+
+    def complete(self, job_id, owner: str, result: Dict[str, Any]) -> bool:
+        now = self._now()
+        update = self.collection.update_one(
+            self._owned(job_id, owner),
+            {
+                "$set": {
+                    "status": COMPLETED,
+                    "result": jsonable_encoder(result, custom_encoder={ObjectId: str}),
+                    "finishedAt": now,
+                    "updatedAt": now,
+                    "expiresAt": now + timedelta(seconds=self.retention_seconds),
+                },
+                "$unset": {"leaseOwner": "", "leaseExpiresAt": "", "currentNode": ""},
+            },
+        )
+        return update.modified_count == 1
+
+    def fail(self, job_id, owner: str, error: str, attempts: int) -> str:
+        """Re-queue the job, or mark it failed once attempts are used up"""
+        now = self._now()
+        status = QUEUED if attempts < self.max_attempts else FAILED
+        fields = {"status": status, "error": error, "updatedAt": now}
+        if status == QUEUED:
+            # A failure that repeats straight away (e.g. a bad input, a down
+            # dependency) should not spin through its attempts
+            delay = self.retry_backoff_seconds * 2 ** max(attempts - 1, 0)
+            fields["notBefore"] = now + timedelta(seconds=delay)
+        else:
+            fields["finishedAt"] = now
+            fields["expiresAt"] = now + timedelta(seconds=self.retention_seconds)
+        self.collection.update_one(
+            self._owned(job_id, owner),
+            {
+                "$set": fields,
+                "$unset": {"leaseOwner": "", "leaseExpiresAt": "", "currentNode": ""},
+            },
+        )
+        return status
+
+    def defer(self, job_id, owner: str, delay: float, reason: str):
+        """Put the job back in the queue for later without using up an attempt"""
+        now = self._now()
+        self.collection.update_one(
+            self._owned(job_id, owner),
+            {
+                "$set": {
+                    "status": QUEUED,
+                    "notBefore": now + timedelta(seconds=delay),
+                    "deferredReason": reason,
+                    "updatedAt": now,
+                },
+                "$inc": {"attempts": -1, "deferrals": 1},
+                "$unset": {"leaseOwner": "", "leaseExpiresAt": "", "currentNode": ""},
+            },
+        )
+
+    @staticmethod
+    def to_public(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Job document as returned by the API"""
+        public = {
+            "jobId": str(job["_id"]),
+            "kind": job.get("kind"),
+            "status": job.get("status"),
+            "attempts": job.get("attempts", 0),
+            "currentNode": job.get("currentNode"),
+            "progress": job.get("progress", []),
+            "createdAt": job.get("createdAt"),
+            "startedAt": job.get("startedAt"),
+            "finishedAt": job.get("finishedAt"),
+        }
+        if job.get("status") == COMPLETED:
+            public["result"] = job.get("result")
+        if job.get("error"):
+            public["error"] = job["error"]
+        return public
+
+
+class JobWorkerPool:
+    """
+    Bounded pool of asyncio workers draining a JobQueue in this process.
+
+    ``workers`` jobs run at most at the same time per process; other
+    processes running their own pools share the queue. Workers poll the
+    queue every ``poll_interval`` seconds and are woken immediately when this
+    process enqueues a job.
+
+    Configuration (environment):
+    - JOB_WORKERS: workers per process, 0 for an API-only process (default 2)
+    - JOB_POLL_INTERVAL: seconds between queue polls when idle (default 1)
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, JobHandler],
+        workers: int = 2,
+        poll_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @classmethod
+    def from_env(cls, queue: JobQueue, handlers: Dict[str, JobHandler]) -> "JobWorkerPool":
+        return cls(
+            queue,
+            handlers,
+            workers=int(os.getenv("JOB_WORKERS", "2")),
+            poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1")),
+        )
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind: str, job_input: Dict[str, Any]) -> str:
+        job_id = await self.queue.aenqueue(kind, job_input)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def _worker(self, index: int):
+        while True:
+            try:
+                job = await asyncio.to_thread(
+                    self.queue.claim, self.owner, list(self.handlers)
+                )
+            except Exception as e:
+                logger.warning("Job worker %d failed to claim a job: %s", index, e)
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                await self.run_job(job)
+            except Exception as e:
+                # Recording the outcome failed (e.g. MongoDB unreachable); the
+                # lease expires and another worker picks the job up again
+                logger.exception("Job worker %d failed running job %s: %s", index, job["_id"], e)
+
+    async def _keep_lease(self, job_id):
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.renew, job_id, self.owner):
+                logger.warning("Lost the lease on job %s", job_id)
+                return
+
+    async def run_job(self, job: Dict[str, Any]):
+        """Run one claimed job to completion or failure"""
+        job_id = job["_id"]
+        logger.info(
+            "Running job %s (%s) attempt %d on %s", job_id, job["kind"], job["attempts"], self.owner
+        )
+
+        async def report(node: str, update: Dict[str, Any]):
+            ms = (update.get("node_timings") or {}).get(node)
+            await asyncio.to_thread(self.queue.record_progress, job_id, self.owner, node, ms)
+
+        lease = asyncio.create_task(self._keep_lease(job_id))
+        try:
+            attributes = {"job.id": str(job_id), "job.attempt": job["attempts"]}
+            with Tracing.span(f"job {job['kind']}", attributes=attributes):
+                result = await self.handlers[job["kind"]](job.get("input", {}), report)
+            await asyncio.to_thread(self.queue.complete, job_id, self.owner, result)
+        except asyncio.CancelledError:
+            # Shutting down: the lease expires and another worker resumes it
+            raise
+        except Exception as e:
+            if (
+                isinstance(e, DEFERRABLE_ERRORS)
+                and job.get("deferrals", 0) < self.queue.max_deferrals
+            ):
+                retry_after = e.retry_after or self.queue.retry_backoff_seconds
+                logger.info("Job %s deferred for %ss: %s", job_id, retry_after, e)
+                await asyncio.to_thread(
+                    self.queue.defer, job_id, self.owner, retry_after, str(e)
+                )
+                return
+            logger.warning("Job %s failed: %s", job_id, e)
+            status = await asyncio.to_thread(
+                self.queue.fail, job_id, self.owner, str(e), job["attempts"]
+            )
+            logger.info("Job %s is %s", job_id, status)
+        finally:
+            lease.cancel()
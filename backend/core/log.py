@@ -0,0 +1,160 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import reprlib
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# Attributes every LogRecord has; anything else was passed with extra={...}
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+_SCALARS = (str, int, float, bool, type(None))
+
+
+class PayloadRepr(reprlib.Repr):
+    """
+    Size-bounded repr for log arguments: long strings, lists and dicts are
+    cut while being rendered, so logging a whole chat history or workflow
+    state costs about as much as logging its first few items.
+    """
+
+    def __init__(self, max_length: int = 200):
+        super().__init__()
+        self.maxlevel = 3
+        self.maxlist = self.maxtuple = self.maxset = self.maxdict = 10
+        self.maxstring = self.maxother = self.maxlong = max_length
+
+    def repr_str(self, x: str, level: int) -> str:
+        if level < self.maxlevel:
+            return super().repr_str(x, level)
+        # Top-level strings are logged as they are, not quoted
+        if len(x) <= self.maxstring:
+            return x
+        return x[: self.maxstring] + f"...(+{len(x) - self.maxstring})"
+
+    def repr_instance(self, x: Any, level: int) -> str:
+        text = str(x)
+        return text if len(text) <= self.maxother else text[: self.maxother] + "..."
+
+
+class SampledQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that does the minimum on the calling thread: DEBUG records
+    are sampled (``debug_sample_rate`` of them are kept), the message is
+    rendered with size-bounded arguments, and the record is queued for the
+    listener thread, which formats and writes it.
+    """
+
+    def __init__(self, q: queue.Queue, debug_sample_rate: float = 1.0, max_length: int = 200):
+        super().__init__(q)
+        self.debug_sample_rate = debug_sample_rate
+        self.repr = PayloadRepr(max_length)
+
+    def filter(self, record: logging.LogRecord):
+        if record.levelno <= logging.DEBUG and random.random() >= self.debug_sample_rate:
+            return False
+        return super().filter(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            args = record.args if isinstance(record.args, tuple) else (record.args,)
+            try:
+                record.msg = str(record.msg) % tuple(
+                    a if isinstance(a, (int, float)) else self.repr.repr(a) for a in args
+                )
+            except (TypeError, ValueError):
+                record.msg = record.getMessage()
+            record.args = None
+        elif not isinstance(record.msg, str):
+            record.msg = self.repr.repr(record.msg)
+        if record.exc_info:
+            # Tracebacks hold frames; render them here and drop the references
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not isinstance(value, _SCALARS):
+                setattr(record, key, self.repr.repr(value))
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (k, v) for k, v in vars(record).items() if k not in _RECORD_ATTRS and k not in entry
+        )
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class Logging:
+    """
+    Process-wide logging setup: every logger propagates to a root queue
+    handler, and a listener thread writes the records to stderr.
+
+    Configuration (environment):
+    - LOG_LEVEL: root level (default INFO); request payloads and workflow
+      states are logged at DEBUG
+    - LOG_FORMAT: "json" (default) or "text"
+    - LOG_DEBUG_SAMPLE_RATE: fraction of DEBUG records kept (default 0.1)
+    - LOG_MAX_FIELD_LENGTH: longest string/argument rendered (default 200)
+    """
+
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, stream=None) -> logging.handlers.QueueListener:
+        with cls._lock:
+            if cls._listener is not None:
+                return cls._listener
+
+            output = logging.StreamHandler(stream or sys.stderr)
+            if os.getenv("LOG_FORMAT", "json").lower() == "text":
+                output.setFormatter(
+                    logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+                )
+            else:
+                output.setFormatter(JsonFormatter())
+
+            records: queue.Queue = queue.Queue(-1)
+            handler = SampledQueueHandler(
+                records,
+                debug_sample_rate=float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1")),
+                max_length=int(os.getenv("LOG_MAX_FIELD_LENGTH", "200")),
+            )
+            root = logging.getLogger()
+            root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+            root.addHandler(handler)
+            # One INFO line per outgoing HTTP request (LLM provider calls)
+            logging.getLogger("httpx").setLevel(logging.WARNING)
+
+            cls._listener = logging.handlers.QueueListener(records, output)
+            cls._listener.start()
+            atexit.register(cls.shutdown)
+            return cls._listener
+
+    @classmethod
+    def shutdown(cls):
+        """Write out queued records and stop the listener thread"""
+        with cls._lock:
+            if cls._listener is None:
+                return
+            cls._listener.stop()
+            for handler in list(logging.getLogger().handlers):
+                if isinstance(handler, SampledQueueHandler):
+                    logging.getLogger().removeHandler(handler)
+            cls._listener = None
@@ -0,0 +1,232 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+from pymongo import monitoring
+
+# Node wall times range from a Pydantic dump to a multi-second evaluation
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+GRAPH_NODE_DURATION = Histogram(
+    "graph_node_duration_seconds",
+    "Wall time of LangGraph node runs",
+    ["graph", "node", "status"],
+    buckets=DURATION_BUCKETS,
+)
+GRAPH_NODE_ERRORS = Counter(
+    "graph_node_errors",
+    "LangGraph node runs that raised, by exception type",
+    ["graph", "node", "error"],
+)
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds",
+    "Wall time of chat model calls made inside graph nodes",
+    ["graph", "node", "model", "status"],
+    buckets=DURATION_BUCKETS,
+)
+LLM_TOKENS = Histogram(
+    "llm_tokens",
+    "Tokens per chat model call (kind is input or output)",
+    ["graph", "node", "model", "kind"],
+    buckets=TOKEN_BUCKETS,
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds",
+    "Duration of MongoDB commands as reported by the driver",
+    ["command", "collection", "status"],
+    buckets=MONGO_BUCKETS,
+)
+
+
+def metrics_enabled() -> bool:
+    """METRICS_ENABLED=false turns off collection and the /metrics endpoint"""
+    return os.getenv("METRICS_ENABLED", "true").lower() != "false"
+
+
+def render() -> Tuple[bytes, str]:
+    """Prometheus text exposition of all metrics, and its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class GraphMetricsHandler(BaseCallbackHandler):
+    """
+    Callback handler that times the nodes of the registered graphs and the
+    chat model calls made inside them.
+
+    A run belongs to a graph when it is the graph's root run (named after the
+    graph, see GraphRegistry) or descends from one, so a subgraph invoked
+    from a supervisor node is labelled with its own name. A run is a node
+    when its name is the ``langgraph_node`` of its metadata. Runs outside any
+    registered graph are ignored.
+    """
+
+    # Callbacks run in the calling thread/task: only dict and histogram updates
+    run_inline = True
+    raise_error = False
+
+    def __init__(self, graphs: Iterable[str]):
+        self.graphs = frozenset(graphs)
+        # run_id -> (graph, node or None, start time)
+        self._runs: Dict[UUID, Tuple[str, Optional[str], float]] = {}
+        # run_id -> (graph, node, model, start time)
+        self._llm_runs: Dict[UUID, Tuple[str, str, str, float]] = {}
+
+    def on_chain_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        name = kwargs.get("name")
+        parent = self._runs.get(parent_run_id) if parent_run_id else None
+        if name in self.graphs:
+            graph = name
+        elif parent:
+            graph = parent[0]
+        else:
+            return
+        node = None
+        if (
+            metadata
+            and metadata.get("langgraph_node") == name
+            and name != graph
+            and not name.startswith("__")  # LangGraph's own __start__ step
+        ):
+            # A runnable inside the node may share its name; time the outer run only
+            if not parent or parent[1] != name:
+                node = name
+        self._runs[run_id] = (graph, node, time.perf_counter())
+
+    def _end_chain(self, run_id: UUID, status: str, error: Optional[BaseException] = None):
+        run = self._runs.pop(run_id, None)
+        if run is None or run[1] is None:
+            return
+        graph, node, started = run
+        GRAPH_NODE_DURATION.labels(graph, node, status).observe(time.perf_counter() - started)
+        if error is not None:
+            GRAPH_NODE_ERRORS.labels(graph, node, type(error).__name__).inc()
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+        self._end_chain(run_id, "ok")
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        self._end_chain(run_id, "error", error)
+
+    def on_chat_model_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        messages: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        parent = self._runs.get(parent_run_id) if parent_run_id else None
+        if parent is None:
+            return
+        metadata = metadata or {}
+        self._llm_runs[run_id] = (
+            parent[0],
+            metadata.get("langgraph_node") or "",
+            metadata.get("ls_model_name") or "unknown",
+            time.perf_counter(),
+        )
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        run = self._llm_runs.pop(run_id, None)
+        if run is None:
+            return
+        graph, node, model, started = run
+        LLM_CALL_DURATION.labels(graph, node, model, "ok").observe(time.perf_counter() - started)
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        if input_tokens or output_tokens:
+            LLM_TOKENS.labels(graph, node, model, "input").observe(input_tokens)
+            LLM_TOKENS.labels(graph, node, model, "output").observe(output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        run = self._llm_runs.pop(run_id, None)
+        if run is None:
+            return
+        graph, node, model, started = run
+        LLM_CALL_DURATION.labels(graph, node, model, "error").observe(time.perf_counter() - started)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding mongo_command_duration_seconds"""
+
+    def __init__(self):
+        # request_id -> collection; commands on one client run on many threads
+        self._collections: Dict[int, str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        target = event.command.get(event.command_name)
+        self._collections[event.request_id] = target if isinstance(target, str) else ""
+
+    def _observe(self, event, status: str):
+        collection = self._collections.pop(event.request_id, "")
+        MONGO_COMMAND_DURATION.labels(event.command_name, collection, status).observe(
+            event.duration_micros / 1e6
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._observe(event, "ok")
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._observe(event, "error")
+
+
+class GraphMetrics:
+    """
+    Process-wide installation of the metrics hooks.
+
+    The graph handler is attached to every callback manager through a
+    LangChain configure hook, so graph invocations need no extra config and
+    token streaming callbacks are left untouched. When metrics are disabled
+    nothing is installed and runs carry no extra handler.
+    """
+
+    _handler: Optional[GraphMetricsHandler] = None
+    _mongo_listener: Optional[MongoCommandMetrics] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def install(cls, graphs: Iterable[str]) -> Optional[GraphMetricsHandler]:
+        if not metrics_enabled():
+            return None
+        with cls._lock:
+            if cls._handler is None:
+                cls._handler = GraphMetricsHandler(graphs)
+                register_configure_hook(
+                    ContextVar("graph_metrics_handler", default=cls._handler), inheritable=True
+                )
+        return cls._handler
+
+    @classmethod
+    def mongo_listeners(cls) -> list:
+        """Event listeners for new MongoClients (none when metrics are disabled)"""
+        if not metrics_enabled():
+            return []
+        with cls._lock:
+            if cls._mongo_listener is None:
+                cls._mongo_listener = MongoCommandMetrics()
+        return [cls._mongo_listener]
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+FAILED = "failed"
+PENDING = "pending"
+
+
+class Readiness:
+    """
+    Startup warmup and readiness state behind GET /ready.
+
+    Components are named callables (compile the graphs, open the Mongo
+    pools, load the writing criteria, ...) run in order during startup, each
+    timed and bounded by ``timeout``; blocking ones run on a worker thread,
+    coroutine functions on the event loop. The service
+    is ready once every component has succeeded; a failed component does not
+    stop startup, it is retried by the next readiness probe instead.
+
+    A component that times out keeps running on its thread; the probe only
+    stops waiting for it.
+    """
+
+    def __init__(self, components: Dict[str, Callable[[], Any]], timeout: float = 10.0):
+        self.components = components
+        self.timeout = timeout
+        self._results: Dict[str, Dict[str, Any]] = {
+            name: {"status": PENDING} for name in components
+        }
+        self._lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_env(cls, components: Dict[str, Callable[[], Any]]) -> "Readiness":
+        return cls(components, timeout=float(os.getenv("READY_COMPONENT_TIMEOUT", "10")))
+
+    @property
+    def ready(self) -> bool:
+        return all(r["status"] == OK for r in self._results.values())
+
+    def pending(self) -> List[str]:
+        return [name for name, r in self._results.items() if r["status"] != OK]
+
+    async def _run(self, name: str):
+        start = time.perf_counter()
+        try:
+            component = self.components[name]
+            if asyncio.iscoroutinefunction(component):
+                await asyncio.wait_for(component(), self.timeout)
+            else:
+                await asyncio.wait_for(asyncio.to_thread(component), self.timeout)
+            result = {"status": OK}
+        except asyncio.TimeoutError:
+            result = {"status": FAILED, "error": f"timed out after {self.timeout:g}s"}
+        except Exception as e:
+            # Driver errors can be long (pymongo includes the topology)
+            result = {"status": FAILED, "error": f"{type(e).__name__}: {e}"[:200]}
+        result["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self._results[name] = result
+        if result["status"] == OK:
+            logger.info("Warmup %s done in %.1fms", name, result["ms"])
+        else:
+            logger.warning("Warmup %s failed: %s", name, result["error"])
+
+    async def warmup(self) -> Dict[str, Any]:
+        """Run every component that has not succeeded yet; returns the report"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for name in self.pending():
+                await self._run(name)
+        return self.report()
+
+    async def check(self) -> Dict[str, Any]:
+        """
+        Report for a readiness probe; retries failed components unless a
+        warmup is already running, in which case its progress is reported
+        """
+        if self.ready or (self._lock is not None and self._lock.locked()):
+            return self.report()
+        return await self.warmup()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "components": {name: dict(r) for name, r in self._results.items()},
+            "total_ms": round(sum(r.get("ms", 0) for r in self._results.values()), 2),
+        }
@@ -0,0 +1,520 @@
+"""
+Lightweight OpenTelemetry-style tracing with a local OTLP/JSON file exporter.
+
+Spans are kept in a context variable, so they follow asyncio tasks and
+threads started with a copied context (asyncio.to_thread, LangGraph's
+executors). LangGraph graph and node runs and chat model calls are traced by
+a callback handler, MongoDB commands by a pymongo command listener; both
+find their parent span from the LangChain run they happen in.
+
+Finished spans are batched by a background thread and appended to
+``$TRACE_DIR/traces-<date>-<pid>.jsonl``, one OTLP ExportTraceServiceRequest
+per line (the format of the OpenTelemetry Collector file exporter), so they
+can be loaded into any OTLP tool offline. To print a waterfall:
+
+    python -m core.tracing traces/traces-20250101-1234.jsonl [trace_id]
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tracers.context import register_configure_hook
+from pymongo import monitoring
+
+# OTLP span kinds and status codes
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SERVICE_NAME = "kidsprogress-backend"
+
+
+class Span:
+    """One timed operation in a trace"""
+
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+        "attributes", "events", "status", "status_message", "run_id",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        parent: Optional["Span"] = None,
+        kind: int = INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status = 0
+        self.status_message = ""
+        # LangChain run the span was opened in (see Tracing.current_span)
+        self.run_id: Optional[UUID] = None
+
+    def set_attribute(self, key: str, value: Any):
+        if value is not None:
+            self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = str(error)[:500]
+        self.events.append(
+            {
+                "name": "exception",
+                "timeUnixNano": time.time_ns(),
+                "attributes": {
+                    "exception.type": type(error).__name__,
+                    "exception.message": str(error)[:500],
+                },
+            }
+        )
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            Tracing.export(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.status_message},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.events:
+            span["events"] = [
+                {
+                    "name": e["name"],
+                    "timeUnixNano": str(e["timeUnixNano"]),
+                    "attributes": otlp_attributes(e["attributes"]),
+                }
+                for e in self.events
+            ]
+        return span
+
+
+def otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [otlp_value(v) for v in value]}}
+    return {"stringValue": str(value)}
+
+
+def otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": otlp_value(v)} for k, v in attributes.items()]
+
+
+class OTLPFileExporter:
+    """
+    Batches finished spans on a background thread and appends them to a
+    JSON Lines file as OTLP ExportTraceServiceRequest objects.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 2.0, max_batch: int = 512):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.path = os.path.join(
+            directory, f"traces-{datetime.now(timezone.utc):%Y%m%d}-{os.getpid()}.jsonl"
+        )
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span):
+        self._queue.put(span)
+
+    def _run(self):
+        while True:
+            batch: List[Optional[Span]] = []
+            try:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+                while len(batch) < self.max_batch:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            spans = [s for s in batch if s is not None]
+            if spans:
+                self._write(spans)
+            if None in batch:
+                return
+
+    def _write(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": otlp_attributes({"service.name": SERVICE_NAME})},
+                    "scopeSpans": [
+                        {"scope": {"name": "kidsprogress"}, "spans": [s.to_otlp() for s in spans]}
+                    ],
+                }
+            ]
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request) + "\n")
+
+    def shutdown(self):
+        """Write out the queued spans and stop the thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+
+def _langchain_run_id() -> Optional[UUID]:
+    """Run id of the LangChain run (graph, node, chain) the caller is inside"""
+    config = var_child_runnable_config.get()
+    if not config:
+        return None
+    return getattr(config.get("callbacks"), "parent_run_id", None)
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """
+    Opens spans for graph runs (a root run named after a registered graph),
+    their nodes and chat model calls. Other runs are not traced but remember
+    their nearest traced ancestor, so spans below them nest correctly.
+    """
+
+    run_inline = True
+    raise_error = False
+
+    def __init__(self, graphs: Iterable[str]):
+        self.graphs = frozenset(graphs)
+        # run_id -> (span opened for the run or None, nearest traced span)
+        self._runs: Dict[UUID, Tuple[Optional[Span], Span]] = {}
+
+    def span_for(self, run_id: UUID) -> Optional[Span]:
+        run = self._runs.get(run_id)
+        return run[1] if run else None
+
+    def _parent(self, parent_run_id: Optional[UUID]) -> Optional[Span]:
+        if parent_run_id is not None:
+            return self.span_for(parent_run_id)
+        return Tracing.current_span()
+
+    def on_chain_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        name = kwargs.get("name") or ""
+        parent = self._parent(parent_run_id)
+        metadata = metadata or {}
+        if name in self.graphs:
+            span = Span(name, parent, attributes={"langgraph.graph": name})
+        elif parent is None:
+            return
+        elif (
+            metadata.get("langgraph_node") == name
+            and not name.startswith("__")
+            # A runnable inside the node may share its name; trace the outer run only
+            and parent.attributes.get("langgraph.node") != name
+        ):
+            span = Span(
+                name,
+                parent,
+                attributes={
+                    "langgraph.graph": parent.attributes.get("langgraph.graph"),
+                    "langgraph.node": name,
+                    "langgraph.step": metadata.get("langgraph_step"),
+                },
+            )
+        else:
+            self._runs[run_id] = (None, parent)
+            return
+        self._runs[run_id] = (span, span)
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        run = self._runs.pop(run_id, None)
+        if run is None or run[0] is None:
+            return None
+        span = run[0]
+        if error is not None:
+            span.record_exception(error)
+        return span
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any):
+        span = self._end(run_id)
+        if span:
+            span.end()
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        span = self._end(run_id, error)
+        if span:
+            span.end()
+
+    def on_chat_model_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        messages: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ):
+        parent = self._parent(parent_run_id)
+        if parent is None:
+            return
+        model = (metadata or {}).get("ls_model_name") or "unknown"
+        span = Span(
+            f"chat {model}",
+            parent,
+            kind=CLIENT,
+            attributes={
+                "gen_ai.operation.name": "chat",
+                "gen_ai.request.model": model,
+                "gen_ai.provider.name": (metadata or {}).get("ls_provider"),
+                "langgraph.node": (metadata or {}).get("langgraph_node"),
+            },
+        )
+        span.attributes = {k: v for k, v in span.attributes.items() if v is not None}
+        self._runs[run_id] = (span, span)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        span = self._end(run_id)
+        if span is None:
+            return
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    input_tokens += usage.get("input_tokens", 0)
+                    output_tokens += usage.get("output_tokens", 0)
+        if input_tokens or output_tokens:
+            span.set_attribute("gen_ai.usage.input_tokens", input_tokens)
+            span.set_attribute("gen_ai.usage.output_tokens", output_tokens)
+        span.end()
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        span = self._end(run_id, error)
+        if span:
+            span.end()
+
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """pymongo command listener opening a client span per MongoDB command"""
+
+    def __init__(self):
+        self._spans: Dict[int, Span] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        parent = Tracing.current_span()
+        if parent is None:
+            return
+        target = event.command.get(event.command_name)
+        collection = target if isinstance(target, str) else None
+        span = Span(
+            f"{event.command_name} {collection}" if collection else event.command_name,
+            parent,
+            kind=CLIENT,
+            attributes={
+                "db.system": "mongodb",
+                "db.operation.name": event.command_name,
+                "db.namespace": event.database_name,
+            },
+        )
+        span.set_attribute("db.collection.name", collection)
+        self._spans[event.request_id] = span
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        span = self._spans.pop(event.request_id, None)
+        if span:
+            span.end()
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        span = self._spans.pop(event.request_id, None)
+        if span:
+            span.status = STATUS_ERROR
+            span.status_message = str(event.failure.get("errmsg", ""))[:500]
+            span.end()
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracing:
+    """
+    Process-wide tracer.
+
+    Configuration (environment):
+    - TRACING_ENABLED: "true" to record spans (default off: span() is a no-op
+      and no handler or listener is installed)
+    - TRACE_DIR: directory of the span files (default ./traces)
+    """
+
+    _exporter: Optional[OTLPFileExporter] = None
+    _handler: Optional[TracingCallbackHandler] = None
+    _mongo_listener: Optional[MongoCommandTracer] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        return os.getenv("TRACING_ENABLED", "false").lower() == "true"
+
+    @classmethod
+    def install(cls, graphs: Iterable[str]) -> Optional[TracingCallbackHandler]:
+        """Start the exporter and trace the runs of ``graphs`` (and below)"""
+        if not cls.enabled():
+            return None
+        with cls._lock:
+            if cls._handler is None:
+                cls._exporter = OTLPFileExporter(os.getenv("TRACE_DIR", "traces"))
+                cls._handler = TracingCallbackHandler(graphs)
+                register_configure_hook(
+                    ContextVar("tracing_handler", default=cls._handler), inheritable=True
+                )
+                atexit.register(cls.shutdown)
+        return cls._handler
+
+    @classmethod
+    def mongo_listeners(cls) -> list:
+        if not cls.enabled():
+            return []
+        with cls._lock:
+            if cls._mongo_listener is None:
+                cls._mongo_listener = MongoCommandTracer()
+        return [cls._mongo_listener]
+
+    @classmethod
+    def export(cls, span: Span):
+        if cls._exporter is not None:
+            cls._exporter.export(span)
+
+    @classmethod
+    def shutdown(cls):
+        with cls._lock:
+            if cls._exporter is not None:
+                cls._exporter.shutdown()
+                cls._exporter = None
+
+    @classmethod
+    def current_span(cls) -> Optional[Span]:
+        """
+        The innermost active span: a span opened with span() in the current
+        LangChain run, otherwise the span of that run (graph, node or model
+        call), otherwise the span opened outside any run.
+        """
+        explicit = _current_span.get()
+        if cls._handler is not None:
+            run_id = _langchain_run_id()
+            if run_id is not None and (explicit is None or explicit.run_id != run_id):
+                span = cls._handler.span_for(run_id)
+                if span is not None:
+                    return span
+        return explicit
+
+    @classmethod
+    @contextmanager
+    def span(
+        cls, name: str, kind: int = INTERNAL, attributes: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Optional[Span]]:
+        """Open a span as the current one; yields None when tracing is off"""
+        if cls._exporter is None:
+            yield None
+            return
+        span = Span(name, cls.current_span(), kind=kind, attributes=attributes)
+        span.run_id = _langchain_run_id()
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Generator closed from another context (e.g. a client disconnect)
+                pass
+            span.end()
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    spans = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                for resource in json.loads(line)["resourceSpans"]:
+                    for scope in resource["scopeSpans"]:
+                        spans.extend(scope["spans"])
+    return spans
+
+
+def waterfall(spans: List[Dict[str, Any]], width: int = 40) -> List[str]:
+    """Text waterfall of one trace: indented span tree with offsets and bars"""
+    children = defaultdict(list)
+    ids = {s["spanId"] for s in spans}
+    for s in spans:
+        parent = s.get("parentSpanId")
+        children[parent if parent in ids else None].append(s)
+    starts = [int(s["startTimeUnixNano"]) for s in spans]
+    origin, total = min(starts), max(int(s["endTimeUnixNano"]) for s in spans) - min(starts)
+    lines = []
+
+    def walk(span, depth):
+        start = int(span["startTimeUnixNano"]) - origin
+        duration = int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])
+        left = round(start / total * width) if total else 0
+        bar = " " * left + "#" * max(1, round(duration / total * width) if total else 1)
+        error = " !" if span.get("status", {}).get("code") == STATUS_ERROR else ""
+        label = f"{'  ' * depth}{span['name']}{error}"
+        lines.append(f"{label:50.50s} {start / 1e6:9.1f}ms {duration / 1e6:9.1f}ms |{bar:{width}s}|")
+        for child in sorted(children[span["spanId"]], key=lambda c: int(c["startTimeUnixNano"])):
+            walk(child, depth + 1)
+
+    for root in sorted(children[None], key=lambda c: int(c["startTimeUnixNano"])):
+        walk(root, 0)
+    return lines
+
+
+if __name__ == "__main__":
+    by_trace = defaultdict(list)
+    for span in load_spans(sys.argv[1]):
+        by_trace[span["traceId"]].append(span)
+    trace_ids = sys.argv[2:] or list(by_trace)
+    for trace_id in trace_ids:
+        print(f"trace {trace_id}")
+        print("\n".join(waterfall(by_trace[trace_id])))
+        print()
@@ -1,28 +1,99 @@
+import asyncio
 import os
-from pymongo import MongoClient
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import AsyncMongoClient, MongoClient
+
+from core.metrics import GraphMetrics
+from core.tracing import Tracing
 
 
 class MongoDBClient:
+    """
+    Shared MongoDB clients, one connection pool each.
+
+    The blocking ``MongoClient`` serves sync code (scripts, worker threads,
+    the sync graph paths); the ``AsyncMongoClient`` serves coroutines, so a
+    query waiting on the server holds no threadpool thread. The async client
+    is opened and closed by the FastAPI lifespan and, like every asyncio
+    object, belongs to the event loop that first uses it.
+    """
+
     _client = None
+    _async_client = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def min_pool_size() -> int:
+        """Connections the pool keeps open (MONGO_MIN_POOL_SIZE, default 2)"""
+        return int(os.getenv("MONGO_MIN_POOL_SIZE", "2"))
+
+    @classmethod
+    def _client_options(cls) -> dict:
+        return {
+            "host": os.getenv("MONGO_URI", "mongodb://localhost:27016/"),
+            "minPoolSize": cls.min_pool_size(),
+            "event_listeners": GraphMetrics.mongo_listeners() + Tracing.mongo_listeners(),
+        }
 
     @classmethod
     def get_client(cls):
         if cls._client is None:
-            cls._client = MongoClient(
-                os.getenv("MONGO_URI", "mongodb://localhost:27016/")
-            )
+            with cls._lock:
+                if cls._client is None:
+                    cls._client = MongoClient(**cls._client_options())
         return cls._client
 
+    @classmethod
+    def get_async_client(cls):
+        # Only touched from the event loop thread, so no lock is needed
+        if cls._async_client is None:
+            cls._async_client = AsyncMongoClient(**cls._client_options())
+        return cls._async_client
+
     @classmethod
     def get_db(cls, db_name="kidsprogress"):
         return cls.get_client()[db_name]
 
+    @classmethod
+    def get_async_db(cls, db_name="kidsprogress"):
+        return cls.get_async_client()[db_name]
+
+    @classmethod
+    def warmup(cls) -> int:
+        """
+        Connect to the server and open the pool's minimum connections instead
+        of leaving that to the first requests; returns the minimum pool size
+        """
+        client = cls.get_client()
+        client.admin.command("ping")
+        size = cls.min_pool_size()
+        # Concurrent pings check out (and so open) that many connections
+        if size > 1:
+            with ThreadPoolExecutor(max_workers=size) as pool:
+                list(pool.map(lambda _: client.admin.command("ping"), range(size)))
+        return size
+
+    @classmethod
+    async def awarmup(cls) -> int:
+        """Async variant of warmup, for the async client's pool"""
+        client = cls.get_async_client()
+        size = max(1, cls.min_pool_size())
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(size)))
+        return size
+
     @classmethod
     def close(cls):
         if cls._client:
             cls._client.close()
             cls._client = None
 
+    @classmethod
+    async def aclose(cls):
+        if cls._async_client:
+            client, cls._async_client = cls._async_client, None
+            await client.close()
+
 
 if __name__ == "__main__":
     db = MongoDBClient.get_db()
@@ -8,6 +8,10 @@ class CollectionName(str, Enum):
     STUDENT_PROGRESS = "studentProgress"
     ANALYSIS_RESULTS = "analysisResults"
     CHATHISTORY = "chatHistory"
+    LLM_CACHE = "llmCache"
+    IDEMPOTENCY = "idempotencyKeys"
+    JOBS = "jobs"
+    ANALYTICS_ROLLUPS = "analyticsRollups"
 
 
 class ChatHistoryType(str, Enum):
@@ -0,0 +1,87 @@
+import logging
+import os
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from db.constants import CollectionName
+
+logger = logging.getLogger(__name__)
+
+# Indexes every collection needs, by the queries that rely on them.
+# Created (or checked, with MONGO_INDEXES=verify) during startup warmup;
+# modules that may run without the app (job workers, scripts) also create
+# their collection's entries on first use.
+INDEXES: Dict[CollectionName, List[IndexModel]] = {
+    CollectionName.CHATHISTORY: [
+        # GET /chats: newest first, keyset pages on (created_at, _id)
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    CollectionName.ENG_WRITINGS: [
+        # Duplicate submissions; documents saved before hashing are not indexed
+        IndexModel(
+            [("content_hash", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"content_hash": {"$exists": True}},
+        ),
+        # Recent writings, and GET /writings pages on (created_at, _id)
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+        # Writings by genre, and GET /writings?genre= pages
+        IndexModel([("genre", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    CollectionName.MATH_PROBLEMS: [
+        IndexModel([("created_at", DESCENDING)]),
+        IndexModel([("problem_type", ASCENDING)]),
+        IndexModel([("difficulty_level", ASCENDING)]),
+    ],
+    CollectionName.JOBS: [
+        # Claiming: oldest queued job, or a running one with an expired lease
+        IndexModel([("status", ASCENDING), ("leaseExpiresAt", ASCENDING), ("createdAt", ASCENDING)]),
+        # Finished jobs are removed after the retention period
+        IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0),
+    ],
+    CollectionName.IDEMPOTENCY: [
+        IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0),
+    ],
+    CollectionName.ANALYTICS_ROLLUPS: [
+        # Most common weaknesses: criterion rollups by low-score count
+        IndexModel([("kind", ASCENDING), ("low_count", DESCENDING)]),
+    ],
+    CollectionName.LLM_CACHE: [
+        # Let MongoDB expire entries on its own
+        IndexModel([("expiresAt", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
+
+
+def missing_indexes(db) -> Dict[str, List[str]]:
+    """Declared indexes that do not exist yet, by collection"""
+    missing = {}
+    for name, models in INDEXES.items():
+        existing = db[name.value].index_information()
+        absent = [m.document["name"] for m in models if m.document["name"] not in existing]
+        if absent:
+            missing[name.value] = absent
+    return missing
+
+
+def ensure_indexes(db) -> Dict[str, List[str]]:
+    """
+    Create every declared index (MONGO_INDEXES=create, the default) or only
+    check that they exist (MONGO_INDEXES=verify, for deployments where
+    indexes are built by a migration). Creating an index that exists is a
+    no-op; one that exists with different options raises OperationFailure.
+    Returns the index names per collection.
+    """
+    if os.getenv("MONGO_INDEXES", "create").lower() == "verify":
+        missing = missing_indexes(db)
+        if missing:
+            raise RuntimeError(f"Missing MongoDB indexes: {missing}")
+    else:
+        for name, models in INDEXES.items():
+            db[name.value].create_indexes(models)
+    names = {
+        name.value: [m.document["name"] for m in models] for name, models in INDEXES.items()
+    }
+    logger.info("MongoDB indexes ready %s", names)
+    return names
@@ -1,5 +1,8 @@
+import re
+import unicodedata
 from datetime import datetime, timezone
 from typing import List, Any, Optional
+import xxhash
 from pydantic import BaseModel, Field, field_validator
 
 from db.constants import ChatHistoryType, ChatHistoryRole, ChatHistoryFormType
@@ -31,11 +34,27 @@ class EnglishWriting(BaseModel):
     difficulty_level: Optional[str] = Field(default="beginner")
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Hash of the normalized title and text, unique among current evaluations
+    content_hash: Optional[str] = None
 
     class Config:
         allow_population_by_field_name = True
         by_alias = True
 
+    @staticmethod
+    def compute_content_hash(title: str, text: str) -> str:
+        """
+        Hash of a submission that ignores differences a resubmission may add:
+        Unicode form, line endings and runs of whitespace. Case and punctuation
+        are kept since they are part of what gets evaluated.
+        """
+
+        def normalize(value: str) -> str:
+            value = unicodedata.normalize("NFC", value or "")
+            return re.sub(r"\s+", " ", value).strip()
+
+        return xxhash.xxh3_128_hexdigest(f"{normalize(title)}\x00{normalize(text)}")
+
     """Writing data structure
     rubric_scores:
     [
@@ -53,6 +72,31 @@ class EnglishWriting(BaseModel):
     """
 
 
+class WritingSummary(BaseModel):
+    """Card fields of a writing, for the GET /writings listing"""
+
+    id: Optional[str] = Field(alias="_id", default=None)
+    title: str
+    genre: Optional[str] = None
+    overall_score: Optional[int] = None
+    word_count: Optional[int] = Field(default=0)
+    created_at: datetime
+
+    class Config:
+        allow_population_by_field_name = True
+        by_alias = True
+
+
+# Projection that reads only the WritingSummary fields
+WRITING_SUMMARY_FIELDS = {
+    "title": 1,
+    "genre": 1,
+    "overall_score": 1,
+    "word_count": 1,
+    "created_at": 1,
+}
+
+
 class MathProblem(BaseModel):
     id: Optional[str] = Field(alias="_id", default=None)
     problem_text: str
@@ -111,6 +155,10 @@ class ChatHistory(BaseModel):
     content: str
     payload: Optional[Any] = None
     analysis_result: Optional[AnalysisResult] = None
+    # Supervisor routing decision for user messages; routeSource "llm" rows
+    # are the training/evaluation labels for the local text classifier
+    route: Optional[str] = None
+    routeSource: Optional[str] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
     class Config:
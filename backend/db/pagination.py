@@ -0,0 +1,149 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING
+
+BEFORE = "before"  # older than the cursor position
+AFTER = "after"  # newer than the cursor position
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_millis(value: datetime) -> int:
+    # BSON dates have millisecond precision and come back naive (UTC)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(milliseconds=1)
+
+
+class KeysetCursor:
+    """
+    Position in a collection ordered by ``(created_at, _id)``, encoded as an
+    opaque URL-safe token.
+
+    ``_id`` breaks ties between documents saved in the same millisecond (a
+    user message and its AI reply), so every document has exactly one
+    position and a page boundary never skips or repeats one. The filter is a
+    range on the compound ``(created_at, _id)`` index, so a page costs the
+    same however far back it starts.
+    """
+
+    __slots__ = ("created_at", "id", "direction")
+
+    def __init__(self, created_at: datetime, id: ObjectId, direction: str = BEFORE):
+        if direction not in (BEFORE, AFTER):
+            raise ValueError(f"Unknown cursor direction: {direction}")
+        self.created_at = created_at
+        self.id = id
+        self.direction = direction
+
+    @classmethod
+    def from_document(cls, doc: Dict[str, Any], direction: str = BEFORE) -> "KeysetCursor":
+        return cls(doc["created_at"], ObjectId(doc["_id"]), direction)
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            {"t": _to_millis(self.created_at), "id": str(self.id), "d": self.direction},
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "KeysetCursor":
+        """Parse a token from ``encode``; ValueError if it is malformed"""
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+            created_at = _EPOCH + timedelta(milliseconds=int(raw["t"]))
+            return cls(created_at, ObjectId(raw["id"]), raw.get("d", BEFORE))
+        except (ValueError, KeyError, TypeError, InvalidId) as e:
+            raise ValueError("Invalid cursor") from e
+
+    def filter(self) -> Dict[str, Any]:
+        op = "$lt" if self.direction == BEFORE else "$gt"
+        return {
+            "$or": [
+                {"created_at": {op: self.created_at}},
+                {"created_at": self.created_at, "_id": {op: self.id}},
+            ]
+        }
+
+    def sort(self) -> List[Tuple[str, int]]:
+        return _sort(self.direction)
+
+
+def _sort(direction: str) -> List[Tuple[str, int]]:
+    order = DESCENDING if direction == BEFORE else ASCENDING
+    return [("created_at", order), ("_id", order)]
+
+
+# Newest documents first: the first page, and every BEFORE page
+NEWEST_FIRST = _sort(BEFORE)
+
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    limit: int,
+    cursor: Optional[KeysetCursor] = None,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[KeysetCursor], Optional[KeysetCursor]]:
+    """
+    One page of ``collection`` (async client) matching ``query``, oldest
+    document first, with the cursors of the neighbouring pages:
+    ``(documents, next, prev)``. Without a cursor the page holds the newest
+    documents.
+
+    ``next`` pages towards older documents and is None once there are none:
+    history only grows at the newest end, so that is final. ``prev`` pages
+    towards newer documents and is set for every non-empty page (new
+    documents can arrive at any time); an AFTER page that comes back empty
+    returns its own cursor, so a client can keep polling with it.
+    """
+    if cursor is not None:
+        query = {"$and": [query, cursor.filter()]} if query else cursor.filter()
+    sort = cursor.sort() if cursor is not None else NEWEST_FIRST
+
+    # One extra document tells whether there are older ones
+    docs = await collection.find(query, projection).sort(sort).limit(limit + 1).to_list()
+    if cursor is None or cursor.direction == BEFORE:
+        older = len(docs) > limit
+        docs = docs[:limit]
+        docs.reverse()
+    else:
+        # An AFTER page starts right after an existing document
+        older = True
+        docs = docs[:limit]
+
+    if not docs:
+        return docs, None, cursor if cursor is not None and cursor.direction == AFTER else None
+    next_cursor = KeysetCursor.from_document(docs[0], BEFORE) if older else None
+    return docs, next_cursor, KeysetCursor.from_document(docs[-1], AFTER)
+
+
+async def fetch_ordered_page(
+    collection,
+    query: Dict[str, Any],
+    limit: int,
+    cursor: Optional[KeysetCursor] = None,
+    direction: str = BEFORE,
+    projection: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[KeysetCursor]]:
+    """
+    One page of a listing in ``(created_at, _id)`` order, newest first
+    (``direction=BEFORE``) or oldest first (``AFTER``), and the cursor of
+    the next page, None on the last one. A cursor carries its direction, so
+    later pages keep the order of the first.
+    """
+    if cursor is not None:
+        query = {"$and": [query, cursor.filter()]} if query else cursor.filter()
+        direction = cursor.direction
+
+    docs = await collection.find(query, projection).sort(_sort(direction)).limit(limit + 1).to_list()
+    if len(docs) <= limit:
+        return docs, None
+    docs = docs[:limit]
+    return docs, KeysetCursor.from_document(docs[-1], direction)
@@ -0,0 +1,233 @@
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from db.constants import CollectionName
+
+logger = logging.getLogger(__name__)
+
+# Rubric criteria scored below this count as weaknesses
+LOW_SCORE = 7
+
+# Rollup documents, by _id:
+#   "writings"          count, scored, score_sum
+#   "genre:<genre>"     count, scored, score_sum
+#   "criterion:<name>"  count, score_sum, low_count, low_score_sum
+#   "chats"             count
+# Genre and criterion documents also carry ``kind`` and ``name``, so the
+# per-genre and per-criterion reads are one query on the small collection.
+WRITINGS = "writings"
+CHATS = "chats"
+GENRE = "genre"
+CRITERION = "criterion"
+
+Counters = Dict[str, Dict[str, Any]]
+
+
+def _key(kind: str, name: str) -> str:
+    return f"{kind}:{name}"
+
+
+def writing_counters(doc: Dict[str, Any]) -> Counters:
+    """Increments one saved englishWritings document adds, by rollup _id"""
+    counters: Counters = defaultdict(lambda: defaultdict(int))
+    score = doc.get("overall_score")
+    targets = [counters[WRITINGS]]
+    if doc.get("genre"):
+        targets.append(counters[_key(GENRE, doc["genre"])])
+    for target in targets:
+        target["count"] += 1
+        if score is not None:
+            target["scored"] += 1
+            target["score_sum"] += score
+
+    for dimension in doc.get("rubric_scores") or []:
+        for criterion in dimension.get("criteria") or []:
+            value = criterion.get("score")
+            if value is None or not criterion.get("criterion"):
+                continue
+            target = counters[_key(CRITERION, criterion["criterion"])]
+            target["count"] += 1
+            target["score_sum"] += value
+            if value < LOW_SCORE:
+                target["low_count"] += 1
+                target["low_score_sum"] += value
+    return {key: dict(values) for key, values in counters.items()}
+
+
+def _identity(key: str) -> Dict[str, str]:
+    kind, _, name = key.partition(":")
+    return {"kind": kind, "name": name} if name else {"kind": kind}
+
+
+def _update(key: str, values: Dict[str, Any]) -> Dict[str, Any]:
+    return {"$inc": values, "$setOnInsert": _identity(key)}
+
+
+def _apply(db, counters: Counters):
+    # Each rollup document is updated atomically; a failure leaves the
+    # rollups behind the raw data until the next rebuild, never the save
+    collection = db[CollectionName.ANALYTICS_ROLLUPS.value]
+    try:
+        for key, values in counters.items():
+            collection.update_one({"_id": key}, _update(key, values), upsert=True)
+    except Exception:
+        logger.warning("Analytics rollup update failed", exc_info=True)
+
+
+async def _aapply(db, counters: Counters):
+    collection = db[CollectionName.ANALYTICS_ROLLUPS.value]
+    try:
+        for key, values in counters.items():
+            await collection.update_one({"_id": key}, _update(key, values), upsert=True)
+    except Exception:
+        logger.warning("Analytics rollup update failed", exc_info=True)
+
+
+def record_writing(db, doc: Dict[str, Any]):
+    """Add a saved writing to the rollups"""
+    _apply(db, writing_counters(doc))
+
+
+async def arecord_writing(db, doc: Dict[str, Any]):
+    await _aapply(db, writing_counters(doc))
+
+
+def record_chats(db, count: int):
+    """Add ``count`` saved chat messages to the rollups"""
+    _apply(db, {CHATS: {"count": count}})
+
+
+async def arecord_chats(db, count: int):
+    await _aapply(db, {CHATS: {"count": count}})
+
+
+def _average(rollup: Optional[Dict[str, Any]], total: str, count: str) -> float:
+    if not rollup or not rollup.get(count):
+        return 0.0
+    return rollup.get(total, 0) / rollup[count]
+
+
+def summary(writings: Optional[Dict[str, Any]], chats: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    writings = writings or {}
+    return {
+        "total_writings": writings.get("count", 0),
+        "average_score": _average(writings, "score_sum", "scored"),
+        "total_interactions": (chats or {}).get("count", 0),
+    }
+
+
+async def aget_summary(db) -> Dict[str, Any]:
+    """Writing count, average score and chat message count"""
+    collection = db[CollectionName.ANALYTICS_ROLLUPS.value]
+    writings = await collection.find_one({"_id": WRITINGS})
+    chats = await collection.find_one({"_id": CHATS})
+    return summary(writings, chats)
+
+
+def average_score(db, genre: Optional[str] = None) -> float:
+    """Average overall score of all writings, or of one genre"""
+    key = _key(GENRE, genre) if genre else WRITINGS
+    rollup = db[CollectionName.ANALYTICS_ROLLUPS.value].find_one({"_id": key})
+    return _average(rollup, "score_sum", "scored")
+
+
+async def aaverage_score(db, genre: Optional[str] = None) -> float:
+    key = _key(GENRE, genre) if genre else WRITINGS
+    rollup = await db[CollectionName.ANALYTICS_ROLLUPS.value].find_one({"_id": key})
+    return _average(rollup, "score_sum", "scored")
+
+
+def _weaknesses_cursor(db, n: int):
+    return (
+        db[CollectionName.ANALYTICS_ROLLUPS.value]
+        .find({"kind": CRITERION, "low_count": {"$gt": 0}})
+        .sort("low_count", -1)
+        .limit(n)
+    )
+
+
+def _weakness(rollup: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "_id": rollup["name"],
+        "count": rollup["low_count"],
+        "avg_score": _average(rollup, "low_score_sum", "low_count"),
+    }
+
+
+def common_weaknesses(db, n: int = 5) -> List[Dict[str, Any]]:
+    """
+    Criteria most often scored below LOW_SCORE, as ``{"_id": criterion,
+    "count": low scores, "avg_score": average low score}``
+    """
+    return [_weakness(rollup) for rollup in _weaknesses_cursor(db, n)]
+
+
+async def acommon_weaknesses(db, n: int = 5) -> List[Dict[str, Any]]:
+    return [_weakness(rollup) for rollup in await _weaknesses_cursor(db, n).to_list()]
+
+
+def compute(db) -> Counters:
+    """Rollups recomputed from the raw collections"""
+    totals: Counters = defaultdict(lambda: defaultdict(int))
+    writings = db[CollectionName.ENG_WRITINGS.value].find(
+        {}, {"genre": 1, "overall_score": 1, "rubric_scores": 1}
+    )
+    for doc in writings:
+        for key, values in writing_counters(doc).items():
+            for field, value in values.items():
+                totals[key][field] += value
+    totals[CHATS]["count"] = db[CollectionName.CHATHISTORY.value].count_documents({})
+    # The writings document also marks the rollups as built (ensure_rollups)
+    totals[WRITINGS]["count"] += 0
+    return {key: dict(values) for key, values in totals.items()}
+
+
+def _stored(db) -> Counters:
+    stored = {}
+    for rollup in db[CollectionName.ANALYTICS_ROLLUPS.value].find():
+        key = rollup.pop("_id")
+        stored[key] = {k: v for k, v in rollup.items() if k not in ("kind", "name")}
+    return stored
+
+
+def _counters_equal(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    fields = set(a) | set(b)
+    return all(a.get(f, 0) == b.get(f, 0) for f in fields)
+
+
+def verify(db) -> Dict[str, Dict[str, Any]]:
+    """
+    Rollup documents that differ from the raw data, as ``{_id: {"stored":
+    ..., "expected": ...}}``; empty when they match
+    """
+    expected, stored = compute(db), _stored(db)
+    mismatches = {}
+    for key in sorted(set(expected) | set(stored)):
+        if not _counters_equal(stored.get(key, {}), expected.get(key, {})):
+            mismatches[key] = {"stored": stored.get(key), "expected": expected.get(key)}
+    return mismatches
+
+
+def rebuild(db) -> Counters:
+    """
+    Replace the rollups with totals recomputed from the raw data. Documents
+    are replaced, not incremented, so running it twice is harmless; a save
+    that lands while it runs can be lost or counted twice, so run it when
+    writes are quiet and check the result with ``verify``.
+    """
+    counters = compute(db)
+    collection = db[CollectionName.ANALYTICS_ROLLUPS.value]
+    for key, values in counters.items():
+        collection.replace_one({"_id": key}, {**_identity(key), **values}, upsert=True)
+    collection.delete_many({"_id": {"$nin": list(counters)}})
+    logger.info("Rebuilt %d analytics rollups", len(counters))
+    return counters
+
+
+def ensure_rollups(db) -> bool:
+    """Build the rollups from the raw data if they were never built; True if it did"""
+    if db[CollectionName.ANALYTICS_ROLLUPS.value].find_one({"_id": WRITINGS}) is not None:
+        return False
+    rebuild(db)
+    return True
@@ -0,0 +1,327 @@
+import asyncio
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from llm.errors import LLMUnavailableError
+
+# Priority classes, lower is served first
+INTERACTIVE = 0  # text chat, a child is waiting for an answer
+STANDARD = 1  # writing submitted through /chat
+BACKGROUND = 2  # queued evaluation jobs
+PRIORITY_NAMES = {INTERACTIVE: "interactive", STANDARD: "standard", BACKGROUND: "background"}
+
+GLOBAL = "global"
+
+# (route, priority) of the work running in the current context; set once at
+# the entry point (HTTP handler, job worker) and inherited by graph nodes
+_scope: ContextVar[Tuple[str, int]] = ContextVar(
+    "llm_admission_scope", default=("default", STANDARD)
+)
+
+
+@contextmanager
+def admission_scope(route: str, priority: int = STANDARD):
+    """Attribute LLM calls made inside the block to ``route`` at ``priority``"""
+    token = _scope.set((route, priority))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def current_scope() -> Tuple[str, int]:
+    return _scope.get()
+
+
+class AdmissionRejected(LLMUnavailableError):
+    """No LLM capacity: the wait queue is full or the wait timed out"""
+
+    def __init__(self, reason: str, route: str, retry_after: float):
+        super().__init__(f"LLM admission rejected ({reason}) for route {route}", retry_after)
+        self.reason = reason
+        self.route = route
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "buckets", "route", "enqueued", "outcome", "notify")
+
+    def __init__(self, priority: int, seq: int, buckets: List[str], route: str, notify):
+        self.priority = priority
+        self.seq = seq
+        self.buckets = buckets
+        self.route = route
+        self.enqueued = time.monotonic()
+        self.outcome: Optional[str] = None  # "granted" or "evicted"
+        self.notify = notify
+
+    @property
+    def order(self) -> Tuple[int, int]:
+        return self.priority, self.seq
+
+
+class AdmissionController:
+    """
+    Concurrency limiter for LLM calls with a bounded priority wait queue.
+
+    Each call needs a slot in every bucket it belongs to: the global bucket
+    and its route's bucket (plus any extra bucket, e.g. per model). Calls that
+    cannot start wait in a single queue ordered by priority class, then
+    arrival. When the queue is full the lowest-priority, newest waiter is
+    rejected, so interactive chats displace queued background work rather
+    than the other way round. Waiting longer than ``queue_timeout`` is also a
+    rejection. Rejections raise AdmissionRejected with a Retry-After estimate.
+
+    Works for both sync callers (threads) and async callers (event loop).
+
+    Configuration (environment):
+    - LLM_MAX_CONCURRENCY: global concurrent calls (default 8)
+    - LLM_ROUTE_LIMITS: JSON object of per-route limits, e.g. {"writing": 4}
+    - LLM_MAX_QUEUE: maximum waiting calls (default 32)
+    - LLM_QUEUE_TIMEOUT: maximum wait in seconds (default 30)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        route_limits: Optional[Dict[str, int]] = None,
+        max_queue: int = 32,
+        queue_timeout: float = 30.0,
+    ):
+        self.limits: Dict[str, int] = {GLOBAL: max_concurrency}
+        for route, limit in (route_limits or {}).items():
+            self.limits[f"route:{route}"] = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._in_use: Counter = Counter()
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._counters: Counter = Counter()
+        self._wait_ms: Dict[int, Deque[float]] = {p: deque(maxlen=1000) for p in PRIORITY_NAMES}
+        self._hold_s: Deque[float] = deque(maxlen=200)
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            route_limits=json.loads(os.getenv("LLM_ROUTE_LIMITS", "{}")),
+            max_queue=int(os.getenv("LLM_MAX_QUEUE", "32")),
+            queue_timeout=float(os.getenv("LLM_QUEUE_TIMEOUT", "30")),
+        )
+
+    def set_limit(self, bucket: str, limit: Optional[int]):
+        """Add, change or (with None) remove the limit of a bucket"""
+        with self._lock:
+            if limit is None:
+                self.limits.pop(bucket, None)
+            else:
+                self.limits[bucket] = limit
+            self._dispatch()
+
+    # Internal bookkeeping, called with the lock held
+
+    def _has_room(self, buckets: List[str]) -> bool:
+        return all(
+            self._in_use[b] < self.limits[b] for b in buckets if b in self.limits
+        )
+
+    def _take(self, buckets: List[str]):
+        for b in buckets:
+            self._in_use[b] += 1
+
+    def _dispatch(self):
+        for waiter in list(self._waiters):
+            if self._has_room(waiter.buckets):
+                self._take(waiter.buckets)
+                self._waiters.remove(waiter)
+                self._resolve(waiter, "granted")
+
+    def _resolve(self, waiter: _Waiter, outcome: str):
+        waiter.outcome = outcome
+        if outcome == "granted":
+            self._wait_ms[waiter.priority].append(
+                (time.monotonic() - waiter.enqueued) * 1000
+            )
+        waiter.notify()
+
+    def _retry_after(self) -> float:
+        hold = sum(self._hold_s) / len(self._hold_s) if self._hold_s else 5.0
+        per_slot = (len(self._waiters) + 1) / max(self.limits[GLOBAL], 1)
+        return float(max(1, math.ceil(hold * per_slot)))
+
+    def _reject(self, reason: str, route: str) -> AdmissionRejected:
+        self._counters[f"rejected_{reason}"] += 1
+        self._counters[f"rejected_route:{route}"] += 1
+        return AdmissionRejected(reason, route, self._retry_after())
+
+    def _enqueue(self, buckets: List[str], route: str, priority: int, notify) -> _Waiter:
+        """Queue a waiter and try to start it; raises if the queue overflows"""
+        waiter = _Waiter(priority, next(self._seq), buckets, route, notify)
+        self._waiters.append(waiter)
+        self._waiters.sort(key=lambda w: w.order)
+        self._dispatch()
+        if waiter.outcome is None and len(self._waiters) > self.max_queue:
+            victim = self._waiters[-1]
+            self._waiters.remove(victim)
+            if victim is waiter:
+                raise self._reject("queue_full", route)
+            self._counters["evicted"] += 1
+            self._resolve(victim, "evicted")
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Give up waiting; returns True if the slot was granted meanwhile"""
+        if waiter.outcome == "granted":
+            return True
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        return False
+
+    def _buckets(self, route: str, extra: Optional[List[str]]) -> List[str]:
+        return [GLOBAL, f"route:{route}", *(extra or [])]
+
+    # Public API
+
+    def check_capacity(self, route: Optional[str] = None, priority: Optional[int] = None):
+        """
+        Fail fast before starting a request: raise AdmissionRejected if a new
+        call at this priority would be rejected right now
+        """
+        scope_route, scope_priority = current_scope()
+        route = route or scope_route
+        priority = scope_priority if priority is None else priority
+        with self._lock:
+            if len(self._waiters) >= self.max_queue and all(
+                w.priority <= priority for w in self._waiters
+            ):
+                raise self._reject("queue_full", route)
+
+    def release(self, buckets: List[str], held_since: float):
+        with self._lock:
+            for b in buckets:
+                self._in_use[b] -= 1
+            self._hold_s.append(time.monotonic() - held_since)
+            self._counters["completed"] += 1
+            self._dispatch()
+
+    def acquire(self, extra_buckets: Optional[List[str]] = None) -> List[str]:
+        """Blocking acquire for sync callers; returns the buckets to release"""
+        route, priority = current_scope()
+        buckets = self._buckets(route, extra_buckets)
+        event = threading.Event()
+        with self._lock:
+            waiter = self._enqueue(buckets, route, priority, event.set)
+        event.wait(self.queue_timeout)
+        with self._lock:
+            if waiter.outcome == "evicted":
+                raise self._reject("evicted", route)
+            if not self._abandon(waiter):
+                raise self._reject("timeout", route)
+            self._counters["admitted"] += 1
+        return buckets
+
+    async def aacquire(self, extra_buckets: Optional[List[str]] = None) -> List[str]:
+        """Async acquire; waits on the event loop instead of a thread"""
+        route, priority = current_scope()
+        buckets = self._buckets(route, extra_buckets)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def notify():
+            def wake():
+                if not future.done():
+                    future.set_result(None)
+
+            loop.call_soon_threadsafe(wake)
+
+        with self._lock:
+            waiter = self._enqueue(buckets, route, priority, notify)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = self._abandon(waiter)
+            if granted:
+                self.release(buckets, time.monotonic())
+            raise
+        with self._lock:
+            if waiter.outcome == "evicted":
+                raise self._reject("evicted", route)
+            if not self._abandon(waiter):
+                raise self._reject("timeout", route)
+            self._counters["admitted"] += 1
+        return buckets
+
+    def _releaser(self, buckets: List[str]):
+        """Release callable for a granted slot; only the first call releases"""
+        start = time.monotonic()
+        once = threading.Lock()
+
+        def release():
+            if once.acquire(blocking=False):
+                self.release(buckets, start)
+
+        return release
+
+    @contextmanager
+    def slot(self, extra_buckets: Optional[List[str]] = None):
+        """Hold a slot for the block; yields a callable that releases it early"""
+        release = self._releaser(self.acquire(extra_buckets))
+        try:
+            yield release
+        finally:
+            release()
+
+    @asynccontextmanager
+    async def aslot(self, extra_buckets: Optional[List[str]] = None):
+        buckets = await self.aacquire(extra_buckets)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(buckets, start)
+
+    def stats(self) -> Dict[str, Any]:
+        def percentile(values: List[float], q: float) -> Optional[float]:
+            if not values:
+                return None
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 1)
+
+        with self._lock:
+            counters = dict(self._counters)
+            queue_wait = {
+                PRIORITY_NAMES[p]: {
+                    "samples": len(values),
+                    "p50_ms": percentile(list(values), 0.5),
+                    "p95_ms": percentile(list(values), 0.95),
+                    "max_ms": round(max(values), 1) if values else None,
+                }
+                for p, values in self._wait_ms.items()
+            }
+            return {
+                "limits": dict(self.limits),
+                "in_use": {b: n for b, n in self._in_use.items() if n},
+                "queued": len(self._waiters),
+                "max_queue": self.max_queue,
+                "admitted": counters.get("admitted", 0),
+                "completed": counters.get("completed", 0),
+                "evicted": counters.get("evicted", 0),
+                "rejected": {
+                    k[len("rejected_"):]: v
+                    for k, v in counters.items()
+                    if k.startswith("rejected_")
+                },
+                "queue_wait": queue_wait,
+                "retry_after": self._retry_after(),
+            }
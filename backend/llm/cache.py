@@ -0,0 +1,282 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+import xxhash
+from cachetools import LRUCache
+from langchain_core._api.beta_decorator import suppress_langchain_beta_warning
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.runnables.config import ensure_config
+
+from db.constants import CollectionName
+from db.indexes import INDEXES
+
+logger = logging.getLogger(__name__)
+
+# Default lifetime of a cached response, in seconds
+DEFAULT_TTL = 24 * 3600
+
+# Per-node lifetimes, keyed by the LangGraph node that made the call.
+# None opts the node out of caching entirely (answers that should vary).
+NODE_TTLS: Dict[str, Optional[int]] = {
+    # Deterministic classification of a given writing or message
+    "route": 7 * 24 * 3600,
+    "classify": 7 * 24 * 3600,
+    "extract_metadata": 30 * 24 * 3600,
+    # Re-submitted writings get the same evaluation
+    "evaluate": 30 * 24 * 3600,
+    # Analysis prompts embed the student's data, so an identical prompt means
+    # identical data; keep them short-lived anyway
+    "macro_analysis": 3600,
+    "single_analysis": 3600,
+    "learning_advice": 3600,
+    "data_query": 3600,
+    # Free conversation should not repeat itself
+    "ask_general_question": None,
+    "general_response": None,
+}
+
+# Run metadata flag for forced re-evaluations: lookups miss so every call
+# reaches the model, and the fresh responses replace the cached ones
+REFRESH = "llm_cache_refresh"
+
+
+def refresh_config(refresh: bool = True) -> Optional[Dict[str, Any]]:
+    """Run config for a graph run whose LLM calls must not be served from the cache"""
+    return {"metadata": {REFRESH: True}} if refresh else None
+
+
+class LLMResponseCache(BaseCache):
+    """
+    Content-addressed cache for chat model responses.
+
+    Installed as the chat model's ``cache``, so every invoke/ainvoke, including
+    structured-output calls, goes through it. The key is an xxhash of the
+    model string (model name, parameters and bound tools, i.e. the
+    structured-output schema) and the normalized messages.
+
+    Two tiers:
+    - an in-process LRU (``maxsize`` entries)
+    - a MongoDB collection shared by all workers, with a TTL index on
+      ``expiresAt``; skipped when ``persistent`` is False
+
+    The lifetime of an entry depends on the LangGraph node making the call
+    (see NODE_TTLS); nodes mapped to None are never cached. Runs started with
+    ``refresh_config()`` skip lookups and overwrite the entries they produce.
+
+    Configuration (environment):
+    - LLM_CACHE_ENABLED: "false" disables the cache (default true)
+    - LLM_CACHE_MAXSIZE: in-process entries (default 1024)
+    - LLM_CACHE_TTL: default lifetime in seconds (default 86400)
+    - LLM_CACHE_PERSISTENT: "false" keeps the cache in-process only
+    - LLM_CACHE_NODE_TTLS: JSON object overriding NODE_TTLS,
+      e.g. {"evaluate": 600, "macro_analysis": null}
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        default_ttl: Optional[int] = DEFAULT_TTL,
+        node_ttls: Optional[Dict[str, Optional[int]]] = None,
+        persistent: bool = True,
+        collection=None,
+    ):
+        self.default_ttl = default_ttl
+        self.node_ttls = dict(NODE_TTLS if node_ttls is None else node_ttls)
+        self.persistent = persistent
+        self._collection = collection
+        self._memory: LRUCache = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._index_ready = False
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMResponseCache"]:
+        if os.getenv("LLM_CACHE_ENABLED", "true").lower() == "false":
+            return None
+        node_ttls = dict(NODE_TTLS)
+        node_ttls.update(json.loads(os.getenv("LLM_CACHE_NODE_TTLS", "{}")))
+        return cls(
+            maxsize=int(os.getenv("LLM_CACHE_MAXSIZE", "1024")),
+            default_ttl=int(os.getenv("LLM_CACHE_TTL", str(DEFAULT_TTL))),
+            node_ttls=node_ttls,
+            persistent=os.getenv("LLM_CACHE_PERSISTENT", "true").lower() != "false",
+        )
+
+    # Keys and policy
+
+    @staticmethod
+    def _normalize(value: Any) -> Any:
+        if isinstance(value, str):
+            return value.replace("\r\n", "\n").strip()
+        if isinstance(value, list):
+            return [LLMResponseCache._normalize(v) for v in value]
+        if isinstance(value, dict):
+            # Message ids differ between otherwise identical calls
+            kwargs = value.get("kwargs")
+            if isinstance(kwargs, dict):
+                value = {**value, "kwargs": {k: v for k, v in kwargs.items() if k != "id"}}
+            return {k: LLMResponseCache._normalize(v) for k, v in value.items()}
+        return value
+
+    @classmethod
+    def make_key(cls, prompt: str, llm_string: str) -> str:
+        """xxhash of the model string and the normalized serialized messages"""
+        try:
+            messages = json.dumps(cls._normalize(json.loads(prompt)), sort_keys=True)
+        except ValueError:
+            messages = cls._normalize(prompt)
+        return xxhash.xxh3_128_hexdigest(f"{llm_string}\x00{messages}")
+
+    @staticmethod
+    def current_node() -> Optional[str]:
+        """LangGraph node of the running call, if any"""
+        return ensure_config().get("metadata", {}).get("langgraph_node")
+
+    @staticmethod
+    def refresh_requested() -> bool:
+        """Whether the running call belongs to a run started with refresh_config()"""
+        return bool(ensure_config().get("metadata", {}).get(REFRESH))
+
+    def ttl_for(self, node: Optional[str]) -> Optional[int]:
+        if node is not None and node in self.node_ttls:
+            return self.node_ttls[node]
+        return self.default_ttl
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[name] += amount
+
+    # Persistent tier
+
+    def _get_collection(self):
+        if self._collection is None:
+            from db.client import MongoDBClient
+
+            self._collection = MongoDBClient.get_db()[CollectionName.LLM_CACHE.value]
+        if not self._index_ready:
+            self._collection.create_indexes(INDEXES[CollectionName.LLM_CACHE])
+            self._index_ready = True
+        return self._collection
+
+    def _persistent_lookup(self, key: str):
+        try:
+            doc = self._get_collection().find_one({"_id": key})
+        except Exception as e:
+            logger.warning("LLM cache lookup failed, continuing without it: %s", e)
+            self._count("persistent_errors")
+            return None
+        if not doc:
+            return None
+        expires_at = doc["expiresAt"]
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        # The TTL monitor only runs once a minute
+        if expires_at <= datetime.now(timezone.utc):
+            return None
+        return doc["value"], expires_at.timestamp()
+
+    def _persistent_update(self, key: str, payload: str, ttl: int, node: Optional[str]):
+        try:
+            self._get_collection().replace_one(
+                {"_id": key},
+                {
+                    "_id": key,
+                    "value": payload,
+                    "node": node,
+                    "bytes": len(payload),
+                    "expiresAt": datetime.now(timezone.utc) + timedelta(seconds=ttl),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            logger.warning("LLM cache store failed, continuing without it: %s", e)
+            self._count("persistent_errors")
+
+    # BaseCache interface
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        node = self.current_node()
+        if self.ttl_for(node) is None:
+            self._count("bypassed")
+            return None
+        if self.refresh_requested():
+            self._count("refreshed")
+            return None
+
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self._memory[key]
+                entry = None
+        tier = "memory"
+
+        if entry is None and self.persistent:
+            entry = self._persistent_lookup(key)
+            tier = "persistent"
+            if entry is not None:
+                with self._lock:
+                    self._memory[key] = entry
+
+        if entry is None:
+            self._count("misses")
+            return None
+
+        payload = entry[0]
+        self._count(f"{tier}_hits")
+        self._count("bytes_served", len(payload))
+        with suppress_langchain_beta_warning():
+            return loads(payload)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        node = self.current_node()
+        ttl = self.ttl_for(node)
+        if ttl is None:
+            return
+
+        key = self.make_key(prompt, llm_string)
+        payload = dumps(return_val)
+        with self._lock:
+            self._memory[key] = (payload, time.time() + ttl)
+        self._count("stores")
+        self._count("bytes_stored", len(payload))
+
+        if self.persistent:
+            self._persistent_update(key, payload, ttl, node)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.persistent:
+            self._get_collection().delete_many({})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+            memory_bytes = sum(len(payload) for payload, _ in self._memory.values())
+        hits = counters.get("memory_hits", 0) + counters.get("persistent_hits", 0)
+        lookups = hits + counters.get("misses", 0)
+        return {
+            "lookups": lookups,
+            "memory_hits": counters.get("memory_hits", 0),
+            "persistent_hits": counters.get("persistent_hits", 0),
+            "misses": counters.get("misses", 0),
+            "bypassed": counters.get("bypassed", 0),
+            "refreshed": counters.get("refreshed", 0),
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "stores": counters.get("stores", 0),
+            "bytes_served": counters.get("bytes_served", 0),
+            "bytes_stored": counters.get("bytes_stored", 0),
+            "memory_entries": memory_entries,
+            "memory_bytes": memory_bytes,
+            "persistent_errors": counters.get("persistent_errors", 0),
+            "persistent": self.persistent,
+        }
@@ -0,0 +1,209 @@
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core._api.beta_decorator import suppress_langchain_beta_warning
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps, loads
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import ConfigDict
+
+from llm.cache import LLMResponseCache
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recorded exchange for a call"""
+
+
+class Cassette:
+    """
+    Recorded LLM exchanges in a gzip-compressed JSON Lines file.
+
+    Each line holds the call key (model, bound tools and normalized messages,
+    hashed like the response cache key), the node and latency of the call and
+    the serialized result. Recording appends one gzip member per exchange, so
+    a crashed recording keeps everything written before the crash. Identical
+    calls recorded several times are replayed in turn.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[str, int] = defaultdict(int)
+        self._loaded = False
+
+    @staticmethod
+    def make_key(model: str, messages: List[BaseMessage], kwargs: Dict[str, Any]) -> str:
+        params = json.dumps(
+            {"model": model, **{k: v for k, v in kwargs.items() if k != "run_manager"}},
+            sort_keys=True,
+            default=str,
+        )
+        return LLMResponseCache.make_key(dumps(messages), params)
+
+    def load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path.exists():
+                with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._entries[entry["key"]].append(entry)
+            self._loaded = True
+
+    def __len__(self) -> int:
+        self.load()
+        with self._lock:
+            return sum(len(entries) for entries in self._entries.values())
+
+    def record(self, key: str, node: Optional[str], latency: float, result: ChatResult):
+        entry = {
+            "key": key,
+            "node": node,
+            "latency": round(latency, 4),
+            "generations": dumps(result.generations),
+            "recordedAt": time.time(),
+        }
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._entries[key].append(entry)
+
+    def play(self, key: str) -> Dict[str, Any]:
+        """Next recorded exchange for ``key``; raises CassetteMiss if none"""
+        self.load()
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded LLM exchange for key {key} in {self.path}")
+            index = self._served[key] % len(entries)
+            self._served[key] += 1
+            return entries[index]
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Chat model that records the exchanges of ``inner`` to a cassette, or
+    replays them without calling any provider.
+
+    In replay mode each answer waits for its recorded latency multiplied by
+    ``speed`` (0 answers immediately). A call missing from the cassette is
+    sent to ``inner`` when one is set (e.g. a FakeChatModel), otherwise it
+    raises CassetteMiss.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    cassette: Cassette
+    mode: str = REPLAY
+    model: str = "cassette"
+    inner: Optional[BaseChatModel] = None
+    speed: float = 1.0
+
+    @property
+    def _llm_type(self) -> str:
+        return f"cassette-{self.mode}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "mode": self.mode}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # Tools are bound in the OpenAI format whatever the provider, so keys
+        # recorded with one model match on replay with another
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _inner_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Bound tools converted to the format of the inner model"""
+        if "tools" not in kwargs:
+            return kwargs
+        others = {k: v for k, v in kwargs.items() if k not in ("tools", "tool_choice")}
+        choice = {"tool_choice": kwargs["tool_choice"]} if "tool_choice" in kwargs else {}
+        bound = self.inner.bind_tools(kwargs["tools"], **choice)
+        return {**others, **bound.kwargs}
+
+    def _replayed(self, entry: Dict[str, Any]) -> ChatResult:
+        with suppress_langchain_beta_warning():
+            return ChatResult(generations=loads(entry["generations"]))
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = Cassette.make_key(self.model, messages, {"stop": stop, **kwargs})
+        if self.mode == REPLAY:
+            try:
+                entry = self.cassette.play(key)
+            except CassetteMiss:
+                if self.inner is None:
+                    raise
+            else:
+                time.sleep(entry["latency"] * self.speed)
+                return self._replayed(entry)
+
+        started = time.monotonic()
+        result = self.inner._generate(
+            messages, stop=stop, run_manager=run_manager, **self._inner_kwargs(kwargs)
+        )
+        if self.mode == RECORD:
+            self.cassette.record(
+                key, LLMResponseCache.current_node(), time.monotonic() - started, result
+            )
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        key = Cassette.make_key(self.model, messages, {"stop": stop, **kwargs})
+        if self.mode == REPLAY:
+            try:
+                entry = self.cassette.play(key)
+            except CassetteMiss:
+                if self.inner is None:
+                    raise
+            else:
+                await asyncio.sleep(entry["latency"] * self.speed)
+                return self._replayed(entry)
+
+        started = time.monotonic()
+        result = await self.inner._agenerate(
+            messages, stop=stop, run_manager=run_manager, **self._inner_kwargs(kwargs)
+        )
+        if self.mode == RECORD:
+            # File writes stay off the event loop
+            await asyncio.to_thread(
+                self.cassette.record,
+                key,
+                LLMResponseCache.current_node(),
+                time.monotonic() - started,
+                result,
+            )
+        return result
+
+
+def cassette_path(model: str) -> str:
+    """Cassette file for ``model`` in LLM_CASSETTE_DIR (default ./cassettes)"""
+    directory = os.getenv("LLM_CASSETTE_DIR", "cassettes")
+    return os.path.join(directory, f"{model.replace('/', '_')}.jsonl.gz")
@@ -0,0 +1,14 @@
+from typing import Optional
+
+
+class LLMUnavailableError(Exception):
+    """
+    The LLM cannot serve the call right now (overload, rate limits, outage).
+
+    Raised instead of a generic error so callers can skip fallbacks that would
+    make another LLM call, and the API can answer 429 with Retry-After.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+import xxhash
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from llm.cache import LLMResponseCache
+
+WORDS = (
+    "the cat dog sun tree park friend school happy big small red blue story "
+    "played ran jumped found liked wanted went saw made day night home garden "
+    "ball book picture family brother sister teacher rain snow beach river"
+).split()
+
+
+class LatencyDistribution:
+    """
+    Response latency in seconds, parsed from a spec string:
+
+    - "fixed:0.2"
+    - "uniform:0.1,0.5"
+    - "normal:0.8,0.2" (mean, standard deviation; never below 0)
+    - "lognormal:0.8,0.5" (median, sigma; long right tail like real LLMs)
+    """
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, args = spec.partition(":")
+        self.spec = spec
+        self.kind = kind.strip().lower()
+        self.args = [float(a) for a in args.split(",") if a.strip()]
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.args[0] if self.args else 0.0
+        if self.kind == "uniform":
+            return rng.uniform(self.args[0], self.args[1])
+        if self.kind == "normal":
+            return max(0.0, rng.gauss(self.args[0], self.args[1]))
+        return rng.lognormvariate(math.log(self.args[0]), self.args[1])
+
+
+def schema_instance(schema: Dict[str, Any], rng: random.Random, defs: Optional[Dict] = None) -> Any:
+    """Random value that validates against a JSON schema (the subset pydantic emits)"""
+    defs = schema.get("$defs", defs or {})
+    if "$ref" in schema:
+        return schema_instance(defs[schema["$ref"].split("/")[-1]], rng, defs)
+    for combinator in ("anyOf", "oneOf"):
+        if combinator in schema:
+            options = [s for s in schema[combinator] if s.get("type") != "null"]
+            return schema_instance(options[0] if options else {"type": "null"}, rng, defs)
+    if "allOf" in schema:
+        return schema_instance(schema["allOf"][0], rng, defs)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if kind == "object":
+        return {
+            name: schema_instance(prop, rng, defs)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        count = rng.randint(max(schema.get("minItems", 1), 1), min(schema.get("maxItems", 3), 3))
+        return [schema_instance(schema.get("items", {}), rng, defs) for _ in range(count)]
+    if kind == "integer":
+        return rng.randint(int(schema.get("minimum", 1)), int(schema.get("maximum", 10)))
+    if kind == "number":
+        return round(rng.uniform(schema.get("minimum", 0), schema.get("maximum", 10)), 2)
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline chat model for load tests and benchmarks.
+
+    Answers are derived from a hash of the messages and bound tools, so the
+    same call always gets the same answer. Calls with bound tools (which is
+    how with_structured_output works) get a tool call whose arguments are
+    generated from the tool's JSON schema, so WritingEvaluation,
+    WritingClassification and TextRoute parse as with a real model. Each call
+    sleeps for a latency drawn from the node's distribution.
+    """
+
+    model: str = "fake"
+    latency: str = "fixed:0"
+    # Per LangGraph node latency specs, e.g. {"evaluate": "lognormal:3,0.4"}
+    node_latency: Dict[str, str] = {}
+    seed: int = 0
+
+    @classmethod
+    def from_env(cls, model: str = "fake") -> "FakeChatModel":
+        return cls(
+            model=model,
+            latency=os.getenv("LLM_FAKE_LATENCY", "fixed:0"),
+            node_latency=json.loads(os.getenv("LLM_FAKE_NODE_LATENCY", "{}")),
+            seed=int(os.getenv("LLM_FAKE_SEED", "0")),
+        )
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "seed": self.seed}
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _rng(self, messages: List[BaseMessage], tools: Optional[List[Dict]]) -> random.Random:
+        digest = xxhash.xxh64_intdigest(
+            f"{self.seed}\x00{self.model}\x00{dumps(messages)}\x00{json.dumps(tools, sort_keys=True)}"
+        )
+        return random.Random(digest)
+
+    def _delay(self, rng: random.Random) -> float:
+        node = LLMResponseCache.current_node()
+        spec = self.node_latency.get(node, self.latency) if node else self.latency
+        return LatencyDistribution(spec).sample(rng)
+
+    def _message(self, rng: random.Random, tools: Optional[List[Dict]]) -> AIMessage:
+        if tools:
+            function = tools[0]["function"]
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": function["name"],
+                        "args": schema_instance(function.get("parameters", {}), rng),
+                        "id": f"call_{rng.getrandbits(48):012x}",
+                    }
+                ],
+            )
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 40))]
+        return AIMessage(content=" ".join(words).capitalize() + ".")
+
+    def _answer(self, messages: List[BaseMessage], kwargs: Dict[str, Any]):
+        tools = kwargs.get("tools")
+        rng = self._rng(messages, tools)
+        delay = self._delay(rng)
+        return delay, self._message(rng, tools)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, message = self._answer(messages, kwargs)
+        time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        delay, message = self._answer(messages, kwargs)
+        await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    # Text answers stream word by word; the latency is spread over the words
+
+    @staticmethod
+    def _tool_chunk(message: AIMessage) -> ChatGenerationChunk:
+        return ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                    for i, c in enumerate(message.tool_calls)
+                ],
+            )
+        )
+
+    @staticmethod
+    def _chunks(message: AIMessage) -> List[str]:
+        words = str(message.content).split(" ")
+        return [w + (" " if i < len(words) - 1 else "") for i, w in enumerate(words)]
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        delay, message = self._answer(messages, kwargs)
+        if message.tool_calls:
+            time.sleep(delay)
+            yield self._tool_chunk(message)
+            return
+        chunks = self._chunks(message)
+        for text in chunks:
+            time.sleep(delay / len(chunks))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        delay, message = self._answer(messages, kwargs)
+        if message.tool_calls:
+            await asyncio.sleep(delay)
+            yield self._tool_chunk(message)
+            return
+        chunks = self._chunks(message)
+        for text in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=text))
+            if run_manager:
+                await run_manager.on_llm_new_token(text, chunk=chunk)
+            yield chunk
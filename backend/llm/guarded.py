@@ -0,0 +1,151 @@
+from contextlib import nullcontext
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict
+
+from llm.admission import AdmissionController
+from llm.cache import LLMResponseCache
+from llm.resilience import ResiliencePolicy, on_abandon
+
+
+class GuardedChatModel(BaseChatModel):
+    """
+    Chat model that runs every call of ``inner`` through the backend's
+    protections: the resilience policy (timeouts, retries, circuit breaker,
+    hedging) around admission control (concurrency limits and the priority
+    wait queue). Every attempt takes its own slot, so a call waiting to be
+    retried does not hold one.
+
+    It is a chat model itself, so invoke/ainvoke, streaming (token callbacks
+    used by /chat/stream) and with_structured_output behave as with the
+    wrapped model. Tools are bound through the wrapped model's bind_tools so
+    provider-specific tool formats are kept. The response cache is installed
+    on this wrapper: cached answers never take a slot.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseChatModel
+    admission: Optional[AdmissionController] = None
+    # Extra admission buckets for this model (e.g. its own concurrency limit)
+    admission_buckets: List[str] = []
+    resilience: Optional[ResiliencePolicy] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return f"guarded-{self.inner._llm_type}"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return self.inner._identifying_params
+
+    def _get_ls_params(self, stop: Optional[List[str]] = None, **kwargs: Any):
+        return self.inner._get_ls_params(stop=stop, **kwargs)
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        # Let the provider format the tools, then bind the result to the wrapper
+        bound = self.inner.bind_tools(tools, **kwargs)
+        return self.bind(**bound.kwargs)
+
+    def _should_stream(self, *, async_api: bool, run_manager=None, **kwargs: Any) -> bool:
+        return self.inner._should_stream(
+            async_api=async_api, run_manager=run_manager, **kwargs
+        )
+
+    # Protection hooks
+
+    def _slot(self):
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.slot(self.admission_buckets)
+
+    def _aslot(self):
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.aslot(self.admission_buckets)
+
+    # BaseChatModel implementation
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        def attempt() -> ChatResult:
+            with self._slot() as release:
+                if release is not None:
+                    # A timed-out attempt's thread must not keep its slot
+                    on_abandon(release)
+                return self.inner._generate(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+
+        if self.resilience is None:
+            return attempt()
+        return self.resilience.call(attempt, LLMResponseCache.current_node())
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        async def attempt() -> ChatResult:
+            async with self._aslot():
+                return await self.inner._agenerate(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+
+        if self.resilience is None:
+            return await attempt()
+        return await self.resilience.acall(attempt, LLMResponseCache.current_node())
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        def open_stream() -> Iterator[ChatGenerationChunk]:
+            with self._slot():
+                yield from self.inner._stream(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                )
+
+        if self.resilience is None:
+            yield from open_stream()
+        else:
+            yield from self.resilience.stream(open_stream, LLMResponseCache.current_node())
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        async def open_stream() -> AsyncIterator[ChatGenerationChunk]:
+            async with self._aslot():
+                async for chunk in self.inner._astream(
+                    messages, stop=stop, run_manager=run_manager, **kwargs
+                ):
+                    yield chunk
+
+        stream = (
+            open_stream()
+            if self.resilience is None
+            else self.resilience.astream(open_stream, LLMResponseCache.current_node())
+        )
+        async for chunk in stream:
+            yield chunk
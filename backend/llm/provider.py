@@ -1,11 +1,65 @@
 import configparser
+import json
 import os
+import sys
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 from langchain.chat_models import init_chat_model
+from llm.admission import AdmissionController
+from llm.cache import LLMResponseCache
+from llm.cassette import RECORD, REPLAY, Cassette, CassetteChatModel, cassette_path
+from llm.fake import FakeChatModel
+from llm.guarded import GuardedChatModel
+from llm.resilience import ResiliencePolicy
+
+DEFAULT_PROVIDER = "google_genai"
+DEFAULT_MODEL = "gemini-2.5-flash"
+
+# Model used by each graph node. Routing and classification only pick a
+# label, so they run on the small low-latency model at temperature 0;
+# evaluation and free-text answers keep the default model.
+NODE_MODELS: Dict[str, Dict[str, Any]] = {
+    "supervisor_router": {"model": "gemini-2.5-flash-lite", "params": {"temperature": 0}},
+    "classify_question": {"model": "gemini-2.5-flash-lite", "params": {"temperature": 0}},
+    "WritingClassificationNode": {"model": "gemini-2.5-flash-lite", "params": {"temperature": 0}},
+    "EvaluationNode": {"model": DEFAULT_MODEL},
+    "general_response_node": {"model": DEFAULT_MODEL},
+}
+
+ModelKey = Tuple[str, str, str]
+
 
 class LLMProvider:
+    """
+    Registry of chat models shared by the workflows.
+
+    Models are created once per (provider, model, params) and shared by every
+    node configured with them. ``get_llm(node=...)`` looks the node up in
+    NODE_MODELS, overridable with LLM_NODE_MODELS (JSON object mapping node
+    names to {"provider", "model", "params"}). LLM_MODEL_LIMITS (JSON object
+    of model name to max concurrent calls) adds a per-model admission limit.
+
+    Every model shares the response cache and the admission controller, and
+    has its own resilience policy, so one failing model's circuit breaker does
+    not stop the others.
+
+    LLM_PROVIDER_MODE selects where answers come from:
+    - live: the provider (default)
+    - fake: FakeChatModel, offline answers with configurable latency
+    - record: the provider, saving every exchange to a cassette per model
+      in LLM_CASSETTE_DIR (disable the response cache while recording)
+    - replay: the cassettes, at the recorded latency times LLM_REPLAY_SPEED;
+      calls missing from them get a fake answer, or fail with
+      LLM_REPLAY_FALLBACK=none
+    """
+
+    # When set (tests, benchmarks), served to every node
     _llmInstance=None
+    _models: Dict[ModelKey, GuardedChatModel] = {}
+    _lock=threading.Lock()
+    _cache=None
+    _admission=None
     
     @classmethod
     def _get_api_key(cls, apiKeyName:str):
@@ -18,6 +72,11 @@ class LLMProvider:
             if 'DEFAULT' in config and apiKeyName in config['DEFAULT']:
                 return config['DEFAULT'][apiKeyName]
         
+        if not sys.stdin or not sys.stdin.isatty():
+            # Servers, workers and tests have nobody to answer a prompt
+            raise RuntimeError(
+                f"{apiKeyName} is not set: export it or add it to config.ini"
+            )
         api_key = input(f"Enter {apiKeyName}: ")
         
         # Write to the configuration file
@@ -29,13 +88,134 @@ class LLMProvider:
         
         return api_key
     
+    @staticmethod
+    def node_models() -> Dict[str, Dict[str, Any]]:
+        """NODE_MODELS with the LLM_NODE_MODELS overrides applied"""
+        overrides = json.loads(os.getenv("LLM_NODE_MODELS", "{}"))
+        return {**NODE_MODELS, **overrides}
+
+    @staticmethod
+    def model_limits() -> Dict[str, int]:
+        return json.loads(os.getenv("LLM_MODEL_LIMITS", "{}"))
+
     @classmethod
-    def get_llm(cls, provider: str = "google_genai", model: str = "gemini-2.5-flash", apiKeyName: str = "GOOGLE_API_KEY"):
+    def get_llm(
+        cls,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        apiKeyName: str = "GOOGLE_API_KEY",
+        node: Optional[str] = None,
+        **params: Any,
+    ):
+        """
+        Chat model for ``node`` (see NODE_MODELS), or for an explicit
+        provider/model/params; the default model when neither is given
+        """
         if cls._llmInstance is not None:
             return cls._llmInstance
-        
+
+        if node is not None and model is None:
+            config = cls.node_models().get(node, {})
+            provider = provider or config.get("provider")
+            model = config.get("model")
+            params = {**config.get("params", {}), **params}
+        provider = provider or DEFAULT_PROVIDER
+        model = model or DEFAULT_MODEL
+
+        key = (provider, model, json.dumps(params, sort_keys=True))
+        llm = cls._models.get(key)
+        if llm is not None:
+            return llm
+        with cls._lock:
+            if key not in cls._models:
+                cls._models[key] = cls._create(provider, model, apiKeyName, params)
+            return cls._models[key]
+
+    @classmethod
+    def _inner_model(cls, provider: str, model: str, apiKeyName: str, params: Dict[str, Any]):
+        mode = os.getenv("LLM_PROVIDER_MODE", "live").lower()
+        if mode == "fake":
+            return FakeChatModel.from_env(model=model)
+        if mode == REPLAY:
+            fallback = os.getenv("LLM_REPLAY_FALLBACK", "fake").lower()
+            return CassetteChatModel(
+                cassette=Cassette(cassette_path(model)),
+                mode=REPLAY,
+                model=model,
+                inner=FakeChatModel.from_env(model=model) if fallback == "fake" else None,
+                speed=float(os.getenv("LLM_REPLAY_SPEED", "1")),
+            )
+
         if not os.environ.get(apiKeyName):
             os.environ[apiKeyName] = cls._get_api_key(apiKeyName)
-        llm = init_chat_model(model, model_provider=provider)
-        cls._llmInstance = llm
-        return llm
\ No newline at end of file
+        # Retries are ours, so the provider client does not retry
+        llm = init_chat_model(model, model_provider=provider, max_retries=0, **params)
+        if mode == RECORD:
+            return CassetteChatModel(
+                cassette=Cassette(cassette_path(model)), mode=RECORD, model=model, inner=llm
+            )
+        return llm
+
+    @classmethod
+    def _create(cls, provider: str, model: str, apiKeyName: str, params: Dict[str, Any]):
+        """Build a registry entry; called with the registry lock held"""
+        if cls._cache is None:
+            cls._cache = LLMResponseCache.from_env()
+
+        admission = cls.get_admission()
+        buckets = []
+        limit = cls.model_limits().get(model)
+        if limit is not None:
+            buckets.append(f"model:{model}")
+            admission.set_limit(f"model:{model}", limit)
+
+        # Responses are cached per model, messages and output schema; calls
+        # that miss the cache go through the resilience policy and admission
+        # control
+        return GuardedChatModel(
+            inner=cls._inner_model(provider, model, apiKeyName, params),
+            cache=cls._cache,
+            admission=admission,
+            admission_buckets=buckets,
+            resilience=ResiliencePolicy.from_env(),
+        )
+
+    @classmethod
+    def models(cls) -> Dict[str, GuardedChatModel]:
+        """Registered models by "provider:model" (plus params when set)"""
+        with cls._lock:
+            entries = list(cls._models.items())
+        return {
+            f"{provider}:{model}" + ("" if params == "{}" else f" {params}"): llm
+            for (provider, model, params), llm in entries
+        }
+
+    @classmethod
+    def reset(cls):
+        """
+        Forget the models and the response cache, so they are created again
+        from the current configuration. Calls already running finish on the
+        objects they started with. The admission controller is kept: it
+        counts the calls in flight, and a fresh one would admit past the cap.
+        """
+        with cls._lock:
+            cls._models = {}
+            cls._cache = None
+
+    @classmethod
+    def get_admission(cls) -> AdmissionController:
+        if cls._admission is None:
+            cls._admission = AdmissionController.from_env()
+        return cls._admission
+
+    @classmethod
+    def resilience_stats(cls) -> Dict[str, Any]:
+        return {
+            name: llm.resilience.stats()
+            for name, llm in cls.models().items()
+            if llm.resilience is not None
+        }
+
+    @classmethod
+    def get_cache(cls) -> Optional[LLMResponseCache]:
+        return cls._cache
@@ -0,0 +1,538 @@
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Iterator,
+    Optional,
+    TypeVar,
+)
+
+from tenacity import (
+    AsyncRetrying,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from llm.errors import LLMUnavailableError
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# HTTP statuses and provider exception names worth another attempt
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = {
+    "DeadlineExceeded",
+    "ServiceUnavailable",
+    "ResourceExhausted",
+    "InternalServerError",
+    "TooManyRequests",
+    "RateLimitError",
+    "APIConnectionError",
+    "APITimeoutError",
+}
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """An LLM call took longer than its node's timeout"""
+
+
+class LLMTransientError(LLMUnavailableError):
+    """An LLM call kept failing with transient errors after all retries"""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """The circuit breaker is open: calls fail immediately until it resets"""
+
+
+def is_transient(error: BaseException) -> bool:
+    """Timeouts, connection problems, rate limits and provider 5xx errors"""
+    if isinstance(error, LLMUnavailableError):
+        # Local decisions (admission, open circuit): retrying only adds load
+        return isinstance(error, LLMTimeoutError)
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    for attr in ("code", "status_code"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int) and status in TRANSIENT_STATUS:
+            return True
+    return type(error).__name__ in TRANSIENT_ERRORS
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one model.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and calls fail immediately with CircuitOpenError for
+    ``reset_timeout`` seconds. Then a single trial call is let through
+    (half-open): success closes the circuit, and any other outcome (an
+    error of any kind, a cancellation) opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._counters: Counter = Counter()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trial_running = False
+        return self._state
+
+    def before_call(self) -> bool:
+        """
+        Raise CircuitOpenError unless the call may go through; returns True
+        for the half-open trial call, whose outcome must always be recorded
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            self._counters["short_circuited"] += 1
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            raise CircuitOpenError(
+                "LLM circuit breaker is open", retry_after=max(1.0, remaining)
+            )
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            if self._state != CLOSED:
+                self._state = CLOSED
+                self._counters["closed"] += 1
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            state = self._current_state()
+            if state == HALF_OPEN or (
+                state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._counters["opened"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                **self._counters,
+            }
+
+
+class _Abandonment:
+    """
+    Cleanups of a sync attempt running on a worker thread, run if the caller
+    stops waiting for it (timeout) while the thread carries on
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.abandoned = False
+
+    def register(self, callback: Callable[[], Any]):
+        with self._lock:
+            if not self.abandoned:
+                self._callbacks.append(callback)
+                return
+        callback()
+        raise LLMTimeoutError("LLM call abandoned before it started")
+
+    def abandon(self):
+        with self._lock:
+            self.abandoned = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+_current_attempt: contextvars.ContextVar[Optional[_Abandonment]] = contextvars.ContextVar(
+    "llm_attempt", default=None
+)
+
+
+def on_abandon(callback: Callable[[], Any]):
+    """
+    Run ``callback`` if the timed sync attempt running this code is abandoned
+    by its caller, e.g. to release an admission slot the thread still holds.
+    Raises LLMTimeoutError if the attempt was already abandoned (the thread
+    should not start the call). Outside a timed attempt it does nothing.
+    """
+    attempt = _current_attempt.get()
+    if attempt is not None:
+        attempt.register(callback)
+
+
+class ResiliencePolicy:
+    """
+    Timeouts, retries, circuit breaking and request hedging for LLM calls.
+
+    Each attempt is bounded by the timeout of the graph node making the call.
+    Transient failures (see is_transient) are retried with exponential
+    backoff and full jitter, so callers retrying together do not hit the
+    provider in lockstep. When the retries are used up the caller gets an
+    LLMUnavailableError, which skips the legacy fallback prompts: they would
+    make another call to the same failing provider.
+
+    With hedging on, an async call still running after the node's p95
+    latency gets a second, identical attempt, and whichever answers first
+    wins. The p95 is learned from recent successful calls, so hedging starts
+    once ``hedge_min_samples`` calls have completed for a node.
+
+    Configuration (environment):
+    - LLM_TIMEOUT: seconds per attempt (default 30)
+    - LLM_NODE_TIMEOUTS: JSON object of per-node timeouts, e.g. {"evaluate": 60}
+    - LLM_MAX_ATTEMPTS: attempts per call including the first (default 3)
+    - LLM_BACKOFF_BASE / LLM_BACKOFF_MAX: backoff seconds (default 0.5 / 8)
+    - LLM_BREAKER_THRESHOLD: consecutive failures that open the circuit (default 5)
+    - LLM_BREAKER_RESET: seconds the circuit stays open (default 30)
+    - LLM_HEDGE: "true" to enable hedged requests (default off)
+    - LLM_HEDGE_MIN_SAMPLES: calls per node before hedging (default 20)
+    """
+
+    # Sync calls run in these threads so a hung call can be abandoned
+    _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-call")
+
+    def __init__(
+        self,
+        timeout: Optional[float] = 30.0,
+        node_timeouts: Optional[Dict[str, float]] = None,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        breaker: Optional[CircuitBreaker] = None,
+        hedge: bool = False,
+        hedge_min_samples: int = 20,
+    ):
+        self.timeout = timeout
+        self.node_timeouts = dict(node_timeouts or {})
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=200))
+        self._counters: Counter = Counter()
+
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        return cls(
+            timeout=float(os.getenv("LLM_TIMEOUT", "30")),
+            node_timeouts=json.loads(os.getenv("LLM_NODE_TIMEOUTS", "{}")),
+            max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "3")),
+            backoff_base=float(os.getenv("LLM_BACKOFF_BASE", "0.5")),
+            backoff_max=float(os.getenv("LLM_BACKOFF_MAX", "8")),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("LLM_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("LLM_BREAKER_RESET", "30")),
+            ),
+            hedge=os.getenv("LLM_HEDGE", "false").lower() == "true",
+            hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")),
+        )
+
+    def timeout_for(self, node: Optional[str]) -> Optional[float]:
+        if node is not None and node in self.node_timeouts:
+            return self.node_timeouts[node]
+        return self.timeout
+
+    def hedge_delay(self, node: Optional[str]) -> Optional[float]:
+        """p95 latency of the node's recent calls, once there are enough"""
+        with self._lock:
+            samples = sorted(self._latencies[node or "default"])
+        if not self.hedge or len(samples) < self.hedge_min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _record(self, node: Optional[str], started: Optional[float]):
+        if started is not None:
+            with self._lock:
+                self._latencies[node or "default"].append(time.monotonic() - started)
+        self.breaker.record_success()
+
+    def _retry_kwargs(self) -> Dict[str, Any]:
+        def before_sleep(retry_state):
+            self._count("retries")
+            logger.warning(
+                "LLM call attempt %d failed, retrying: %s",
+                retry_state.attempt_number,
+                retry_state.outcome.exception(),
+            )
+
+        return dict(
+            stop=stop_after_attempt(self.max_attempts),
+            wait=wait_random_exponential(multiplier=self.backoff_base, max=self.backoff_max),
+            retry=retry_if_exception(is_transient),
+            before_sleep=before_sleep,
+            reraise=True,
+        )
+
+    def _failed(self, error: Exception) -> Exception:
+        """Error reported to the caller once retries are used up"""
+        if isinstance(error, LLMUnavailableError) or not is_transient(error):
+            return error
+        self._count("exhausted")
+        return LLMTransientError(
+            f"LLM call failed after {self.max_attempts} attempts: {error}",
+            retry_after=self.backoff_max,
+        )
+
+    def _check_outcome(self, error: BaseException, trial: bool = False):
+        # A failed trial reopens the circuit whatever the error; otherwise only
+        # transient errors count (a bad prompt says nothing about the provider)
+        if trial or is_transient(error):
+            self.breaker.record_failure()
+
+    # Sync calls
+
+    def _attempt(self, func: Callable[[], T], node: Optional[str]) -> T:
+        trial = self.breaker.before_call()
+        timeout = self.timeout_for(node)
+        started = time.monotonic()
+        try:
+            if timeout is None:
+                result = func()
+            else:
+                attempt = _Abandonment()
+                context = contextvars.copy_context()
+                context.run(_current_attempt.set, attempt)
+                future = self._executor.submit(context.run, func)
+                try:
+                    result = future.result(timeout)
+                except FutureTimeoutError:
+                    # The thread finishes in the background; nobody waits for
+                    # it, and what it holds (its admission slot) is let go now
+                    future.cancel()
+                    attempt.abandon()
+                    self._count("timeouts")
+                    raise LLMTimeoutError(
+                        f"LLM call timed out after {timeout}s (node {node})"
+                    )
+        except BaseException as e:
+            self._check_outcome(e, trial)
+            raise
+        self._record(node, started)
+        return result
+
+    def call(self, func: Callable[[], T], node: Optional[str] = None) -> T:
+        """Run a blocking call with timeout, retries and the circuit breaker"""
+        self._count("calls")
+        try:
+            for attempt in Retrying(**self._retry_kwargs()):
+                with attempt:
+                    return self._attempt(func, node)
+        except Exception as e:
+            failed = self._failed(e)
+            if failed is e:
+                raise
+            raise failed from e
+
+    # Async calls
+
+    async def _aattempt(self, afunc: Callable[[], Awaitable[T]], node: Optional[str]) -> T:
+        trial = self.breaker.before_call()
+        timeout = self.timeout_for(node)
+        started = time.monotonic()
+        try:
+            result = await self._ahedged(afunc, node, timeout)
+        except BaseException as e:
+            # Includes cancellation, so a half-open trial is always resolved
+            self._check_outcome(e, trial)
+            raise
+        self._record(node, started)
+        return result
+
+    async def _ahedged(
+        self, afunc: Callable[[], Awaitable[T]], node: Optional[str], timeout: Optional[float]
+    ) -> T:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        first = asyncio.ensure_future(afunc())
+        hedge = None
+        pending = {first}
+        delay = self.hedge_delay(node)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                wait = None if deadline is None else deadline - time.monotonic()
+                if hedge is None and delay is not None:
+                    wait = delay if wait is None else min(wait, delay)
+                done, pending = await asyncio.wait(
+                    pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+                if done:
+                    continue
+                if hedge is not None or (deadline is not None and time.monotonic() >= deadline):
+                    self._count("timeouts")
+                    raise LLMTimeoutError(f"LLM call timed out after {timeout}s (node {node})")
+                # Slower than the p95: race a second attempt against the first
+                self._count("hedged")
+                hedge = asyncio.ensure_future(afunc())
+                pending.add(hedge)
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def acall(
+        self, afunc: Callable[[], Awaitable[T]], node: Optional[str] = None
+    ) -> T:
+        """Async call with timeout, retries, the circuit breaker and hedging"""
+        self._count("calls")
+        try:
+            async for attempt in AsyncRetrying(**self._retry_kwargs()):
+                with attempt:
+                    return await self._aattempt(afunc, node)
+        except Exception as e:
+            failed = self._failed(e)
+            if failed is e:
+                raise
+            raise failed from e
+
+    # Streams: retried until the first chunk arrives, never after, since the
+    # chunks already yielded have been shown to the user
+
+    def stream(
+        self, open_stream: Callable[[], Generator[T, None, None]], node: Optional[str] = None
+    ) -> Iterator[T]:
+        """
+        Blocking stream with retries and the circuit breaker. Chunks are not
+        bounded by the timeout: a sync iterator cannot be interrupted.
+        """
+        self._count("calls")
+        try:
+            for attempt in Retrying(**self._retry_kwargs()):
+                with attempt:
+                    trial = self.breaker.before_call()
+                    iterator = open_stream()
+                    try:
+                        first = next(iterator, None)
+                    except BaseException as e:
+                        iterator.close()
+                        self._check_outcome(e, trial)
+                        raise
+                    if trial:
+                        # The provider answered: the trial is resolved
+                        self.breaker.record_success()
+        except Exception as e:
+            failed = self._failed(e)
+            if failed is e:
+                raise
+            raise failed from e
+
+        try:
+            if first is not None:
+                yield first
+                yield from iterator
+        except Exception as e:
+            self._check_outcome(e)
+            raise
+        finally:
+            iterator.close()
+        self._record(node, None)
+
+    async def _anext(self, iterator: AsyncGenerator[T, None], node: Optional[str]) -> Optional[T]:
+        timeout = self.timeout_for(node)
+        try:
+            return await asyncio.wait_for(iterator.__anext__(), timeout)
+        except StopAsyncIteration:
+            return None
+        except asyncio.TimeoutError:
+            self._count("timeouts")
+            raise LLMTimeoutError(f"LLM stream stalled for {timeout}s (node {node})")
+
+    async def astream(
+        self, open_stream: Callable[[], AsyncGenerator[T, None]], node: Optional[str] = None
+    ) -> AsyncIterator[T]:
+        """Async stream; every chunk must arrive within the node's timeout"""
+        self._count("calls")
+        try:
+            async for attempt in AsyncRetrying(**self._retry_kwargs()):
+                with attempt:
+                    trial = self.breaker.before_call()
+                    iterator = open_stream()
+                    try:
+                        chunk = await self._anext(iterator, node)
+                    except BaseException as e:
+                        await iterator.aclose()
+                        self._check_outcome(e, trial)
+                        raise
+                    if trial:
+                        self.breaker.record_success()
+        except Exception as e:
+            failed = self._failed(e)
+            if failed is e:
+                raise
+            raise failed from e
+
+        try:
+            while chunk is not None:
+                yield chunk
+                chunk = await self._anext(iterator, node)
+        except Exception as e:
+            self._check_outcome(e)
+            raise
+        finally:
+            await iterator.aclose()
+        self._record(node, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            nodes = list(self._latencies)
+        return {
+            "counters": counters,
+            "breaker": self.breaker.stats(),
+            "hedge": self.hedge,
+            "hedge_delay_s": {node: self.hedge_delay(node) for node in nodes},
+        }
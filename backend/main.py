@@ -1,32 +1,110 @@
+import asyncio
+import logging
+import math
+import os
 from datetime import datetime
-from typing import Any, List, Optional
+from typing import Any, List, Literal, Optional
 from bson import ObjectId
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
 
+import xxhash
 from pydantic import BaseModel
-from pymongo import DESCENDING
 
+from core.idempotency import IdempotencyConflict, IdempotencyKeyReused, IdempotencyStore
+from core.jobs import COMPLETED, FAILED, JobQueue, JobWorkerPool
+from core.log import Logging
+from core.metrics import GraphMetrics, metrics_enabled, render as render_metrics
+from core.readiness import Readiness
+from core.tracing import SERVER, Tracing
 from db.client import MongoDBClient
+from db.indexes import ensure_indexes
+from db.pagination import AFTER, BEFORE, KeysetCursor, fetch_ordered_page, fetch_page
+from db.rollups import aget_summary, ensure_rollups
 from db.constants import (
     ChatHistoryFormType,
     ChatHistoryRole,
     ChatHistoryType,
     CollectionName,
 )
-from db.models import ChatHistory, EnglishWriting
-from workflows.supervisor import build_supervisor
+from db.models import WRITING_SUMMARY_FIELDS, ChatHistory, EnglishWriting, WritingSummary
+from llm.admission import INTERACTIVE, STANDARD, admission_scope
+from llm.errors import LLMUnavailableError
+from llm.provider import LLMProvider
+from workflows.registry import GraphRegistry
 from workflows.states import SupervisorState
+from workflows.streaming import STREAM_MODES, ChatStreamTranslator, format_sse
+from workflows.workflow_writing import evaluate_writing_job, get_writing_workflow
+
+Logging.configure()
+logger = logging.getLogger(__name__)
+
+# Per-node latency/token histograms for every registered graph (GET /metrics)
+GraphMetrics.install(GraphRegistry.names())
+# Spans for requests, graph nodes, LLM calls and Mongo commands (TRACING_ENABLED)
+Tracing.install(GraphRegistry.names())
+
+# Writing evaluations submitted through POST /writings/evaluate
+WRITING_EVALUATION_JOB = "writing_evaluation"
+job_pool = JobWorkerPool.from_env(
+    JobQueue.from_env(), {WRITING_EVALUATION_JOB: evaluate_writing_job}
+)
+
+
+def ensure_mongo_indexes():
+    ensure_indexes(MongoDBClient.get_db())
+
+
+def ensure_analytics_rollups():
+    if ensure_rollups(MongoDBClient.get_db()):
+        logger.info("Built the analytics rollups from the raw data")
+
+
+def warm_writing_criteria():
+    get_writing_workflow().db_manager.get_writing_criteria()
+
+
+def probe_llm():
+    """One short completion, so the provider connection is open before traffic"""
+    LLMProvider.get_llm().invoke("Reply with OK.")
+
+
+def readiness_components() -> dict:
+    components = {
+        # Compile the supervisor and all sub-workflow graphs once, up front
+        "graphs": GraphRegistry.warmup,
+        "mongo": MongoDBClient.warmup,
+        "mongo_async": MongoDBClient.awarmup,
+        "indexes": ensure_mongo_indexes,
+        # First start on existing data: build the rollups behind /analytics
+        "rollups": ensure_analytics_rollups,
+        "writing_criteria": warm_writing_criteria,
+    }
+    if os.getenv("READY_LLM_PROBE", "false").lower() == "true":
+        components["llm"] = probe_llm
+    return components
+
+
+# Startup warmup; GET /ready reports it
+readiness = Readiness.from_env(readiness_components())
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("FastAPI starting up...")
-    MongoDBClient.get_client()
+    logger.info("FastAPI starting up")
+    # The async Mongo pool belongs to this event loop: open it here, close it below
+    MongoDBClient.get_async_client()
+    report = await readiness.warmup()
+    logger.info("Warmup finished in %.1fms, ready: %s", report["total_ms"], report["ready"])
+    await job_pool.start()
     yield
-    print("FastAPI shutting down...")
+    logger.info("FastAPI shutting down")
+    await job_pool.stop()
     MongoDBClient.close()
+    await MongoDBClient.aclose()
+    Tracing.shutdown()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -42,9 +120,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Page cursors of GET /chats and GET /writings
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
 )
 
 
+# Retried /chat requests with the same tempId join or replay the original
+chat_idempotency = IdempotencyStore.from_env()
+
+
 class ChatRequest(BaseModel):
     """
     Chat request model with temporary ID support for optimistic UI updates.
@@ -61,125 +145,408 @@ class ChatRequest(BaseModel):
     payload: Optional[Any] = None
 
 
-@app.post("/chat")
-async def chat(request: ChatRequest):
-    """Main chat endpoint for processing user messages and form submissions"""
-    print(">>>>>>>>>>enter /chat api")
-    print(request)
+def build_graph_state(request: ChatRequest) -> SupervisorState:
+    """Map a chat request onto the supervisor workflow input state"""
+    # Prepare state parameters
+    graphDataParams = {
+        "role": request.role,
+        "userContent": request.content,
+        "type": request.type,
+    }
+
+    # Add optional fields if present
+    for field in ["formType", "payload"]:
+        value = getattr(request, field, None)
+        if value is not None:
+            graphDataParams[field] = value
+
+    return SupervisorState(**graphDataParams)
+
+
+def build_chat_response(request: ChatRequest, result: dict) -> dict:
+    """Construct the chat response body from the final workflow state"""
+    # Construct return data with ID mapping
+    returnData = {
+        # ID mapping for frontend to update optimistic UI
+        "tempId": request.tempId,  # Original temp ID from frontend
+        "userMsgId": result.get("userMsgId"),  # Database ID for user message
+        "AIMsgId": result.get("AIMsgId"),  # Database ID for AI message
+        # AI response message
+        "AIMsg": {
+            "_id": result.get("AIMsgId"),
+            "role": ChatHistoryRole.AI,
+            "type": result.get("type"),
+            "content": result.get(
+                "AIContent",
+                "I'm having trouble processing your request. Please try again!",
+            ),
+        },
+    }
+
+    # Add optional response fields
+    formType = result.get("formType")
+    if formType:
+        returnData["AIMsg"]["formType"] = formType
+
+    payload = result.get("workflowResult")
+    if payload:
+        returnData["AIMsg"]["payload"] = payload
+
+    return returnData
+
+
+def request_fingerprint(request: ChatRequest) -> str:
+    """Hash of the request body without the tempId, to detect reused keys"""
+    return xxhash.xxh3_128_hexdigest(request.model_dump_json(exclude={"tempId"}))
+
+
+def build_idempotency_error(request: ChatRequest, error: Exception) -> HTTPException:
+    if isinstance(error, IdempotencyKeyReused):
+        return HTTPException(
+            status_code=422,
+            detail={
+                "tempId": request.tempId,
+                "error": True,
+                "message": "This tempId was already used for a different message.",
+            },
+        )
+    return HTTPException(
+        status_code=409,
+        detail={
+            "tempId": request.tempId,
+            "error": True,
+            "message": "This message is still being processed. Please try again shortly.",
+        },
+    )
 
-    try:
-        # Build and run supervisor workflow
-        graph = build_supervisor()
-
-        # Prepare state parameters
-        graphDataParams = {
-            "role": request.role,
-            "userContent": request.content,
-            "type": request.type,
-        }
 
-        # Add optional fields if present
-        for field in ["formType", "payload"]:
-            value = getattr(request, field, None)
-            if value is not None:
-                graphDataParams[field] = value
+def chat_admission_scope(request: ChatRequest):
+    """Text chats are interactive; writings submitted in chat rank below them"""
+    if request.type == ChatHistoryType.FORM:
+        return admission_scope("writing", STANDARD)
+    return admission_scope("chat", INTERACTIVE)
 
-        # Execute workflow
-        graphData = SupervisorState(**graphDataParams)
-        result = graph.invoke(graphData)
-
-        print(">>>>>>>workflow result")
-        print(result)
-
-        # Construct return data with ID mapping
-        returnData = {
-            # ID mapping for frontend to update optimistic UI
-            "tempId": request.tempId,  # Original temp ID from frontend
-            "userMsgId": result.get("userMsgId"),  # Database ID for user message
-            "AIMsgId": result.get("AIMsgId"),  # Database ID for AI message
-            # AI response message
-            "AIMsg": {
-                "_id": result.get("AIMsgId"),
-                "role": ChatHistoryRole.AI,
-                "type": result.get("type"),
-                "content": result.get(
-                    "AIContent",
-                    "I'm having trouble processing your request. Please try again!",
-                ),
-            },
-        }
 
-        # Add optional response fields
-        formType = result.get("formType")
-        if formType:
-            returnData["AIMsg"]["formType"] = formType
+def build_overload_error(request: ChatRequest, error: LLMUnavailableError) -> HTTPException:
+    retry_after = max(1, math.ceil(error.retry_after or 1))
+    return HTTPException(
+        status_code=429,
+        detail={
+            "tempId": request.tempId,
+            "error": True,
+            "message": "Lots of people are learning right now! Please try again in a moment.",
+            "retryAfter": retry_after,
+        },
+        headers={"Retry-After": str(retry_after)},
+    )
+
 
-        payload = result.get("workflowResult")
-        if payload:
-            returnData["AIMsg"]["payload"] = payload
+def build_chat_error(request: ChatRequest) -> dict:
+    # Return error response with temp ID for frontend error handling
+    return {
+        "tempId": request.tempId,  # Include temp ID for frontend to identify failed message
+        "error": True,
+        "message": "I'm having trouble processing your request. Please try again!",
+        "details": "Internal server error processing your request",
+    }
 
-        print(">>>>>>>>>>return data")
-        print(returnData)
-        return returnData
 
-    except Exception as e:
-        print(f"Error in chat endpoint: {e}")
+def chat_span_attributes(request: ChatRequest) -> dict:
+    return {
+        "chat.temp_id": request.tempId,
+        "chat.type": request.type.value if request.type else "",
+        "chat.form_type": request.formType.value if request.formType else "",
+    }
 
-        # Return error response with temp ID for frontend error handling
-        error_response = {
-            "tempId": request.tempId,  # Include temp ID for frontend to identify failed message
-            "error": True,
-            "message": "I'm having trouble processing your request. Please try again!",
-            "details": "Internal server error processing your request",
-        }
 
-        raise HTTPException(status_code=500, detail=error_response)
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    """Main chat endpoint for processing user messages and form submissions"""
+    logger.debug("Chat request %s", request)
+
+    async def run_chat():
+        # Fail fast while the LLM wait queue is full. Only a request that
+        # runs the graph needs capacity; retries get their stored response.
+        LLMProvider.get_admission().check_capacity()
+        # Shared, pre-compiled supervisor workflow
+        graph = GraphRegistry.get("supervisor")
+
+        # Execute workflow
+        graphData = build_graph_state(request)
+        # Async execution keeps the event loop free while LLM and DB calls wait
+        result = await graph.ainvoke(graphData)
+
+        logger.debug("Chat workflow result %s", result)
+
+        return build_chat_response(request, result)
+
+    with Tracing.span("POST /chat", SERVER, chat_span_attributes(request)):
+        try:
+            with chat_admission_scope(request):
+                # A retry with the same tempId joins the running execution or gets
+                # the stored response instead of running the graph again
+                returnData = await chat_idempotency.run(
+                    request.tempId, request_fingerprint(request), run_chat
+                )
+
+            logger.debug("Chat response %s", returnData)
+            return returnData
+
+        except (IdempotencyConflict, IdempotencyKeyReused) as e:
+            raise build_idempotency_error(request, e)
+        except LLMUnavailableError as e:
+            logger.warning("LLM unavailable in chat endpoint: %s", e)
+            raise build_overload_error(request, e)
+        except Exception:
+            logger.exception("Error in chat endpoint")
+            raise HTTPException(status_code=500, detail=build_chat_error(request))
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Streaming variant of /chat using Server-Sent Events.
+
+    Emits progress events while the supervisor graph runs (see
+    ChatStreamTranslator for the event list), then a final ``done`` event whose
+    data is exactly the /chat response body, or an ``error`` event with the
+    /chat error detail. The ``saved`` event already carries the
+    tempId/userMsgId/AIMsgId mapping for the optimistic UI.
+
+    Shares idempotency records with /chat: a retried tempId receives only the
+    ``done`` event with the original response.
+    """
+    logger.debug("Chat stream request %s", request)
+    graph = GraphRegistry.get("supervisor")
+    graphData = build_graph_state(request)
+    fingerprint = request_fingerprint(request)
+
+    async def event_stream():
+        with Tracing.span("POST /chat/stream", SERVER, chat_span_attributes(request)):
+            try:
+                stored = await chat_idempotency.begin(request.tempId, fingerprint)
+                if stored is None:
+                    try:
+                        with chat_admission_scope(request):
+                            LLMProvider.get_admission().check_capacity()
+                    except BaseException as e:
+                        await chat_idempotency.fail(request.tempId, e)
+                        raise
+            except (IdempotencyConflict, IdempotencyKeyReused) as e:
+                yield format_sse("error", build_idempotency_error(request, e).detail)
+                return
+            except LLMUnavailableError as e:
+                yield format_sse("error", build_overload_error(request, e).detail)
+                return
+            except Exception:
+                logger.exception("Error in chat stream endpoint")
+                yield format_sse("error", build_chat_error(request))
+                return
+            if stored is not None:
+                yield format_sse("done", stored)
+                return
+
+            translator = ChatStreamTranslator()
+            try:
+                with chat_admission_scope(request):
+                    async for namespace, mode, data in graph.astream(
+                        graphData, stream_mode=STREAM_MODES, subgraphs=True
+                    ):
+                        for event, payload in translator.translate(namespace, mode, data):
+                            if event == "saved":
+                                payload = {"tempId": request.tempId, **payload}
+                            yield format_sse(event, payload)
+
+                response = await chat_idempotency.complete(
+                    request.tempId, build_chat_response(request, translator.final_state)
+                )
+                yield format_sse("done", response)
+            except BaseException as e:
+                # Includes the client disconnecting mid-stream: release the key
+                await chat_idempotency.fail(request.tempId, e)
+                if not isinstance(e, Exception):
+                    raise
+                logger.exception("Error in chat stream endpoint")
+                if isinstance(e, LLMUnavailableError):
+                    yield format_sse("error", build_overload_error(request, e).detail)
+                else:
+                    yield format_sse("error", build_chat_error(request))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/chats", response_model=List[ChatHistory])
-def get_chats(limit: int = Query(30, gt=0), before: Optional[datetime] = None):
-    # def get_chats():
-    db = MongoDBClient.get_db()
+async def get_chats(
+    response: Response,
+    limit: int = Query(30, gt=0, le=200),
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    before: Optional[datetime] = None,
+):
+    """
+    One page of chat history, oldest message first. Without parameters the
+    newest ``limit`` messages; ``cursor`` continues from the X-Next-Cursor
+    (older) or X-Prev-Cursor (newer) header of a previous page; ``since`` is
+    a message id and returns the messages after it. ``before`` (a timestamp)
+    is kept for older clients and cannot tell apart messages saved in the
+    same millisecond.
+    """
+    db = MongoDBClient.get_async_db()
+    chats = db[CollectionName.CHATHISTORY.value]
     query = {}
     if before:
         query["created_at"] = {"$lt": before}  # get earlier messages
 
-    chats = (
-        db[CollectionName.CHATHISTORY.value]
-        .find(query)
-        .sort("created_at", DESCENDING)
-        .limit(limit)
-    )
-
-    chats_list = list(chats)
+    page_cursor = None
+    if cursor:
+        try:
+            page_cursor = KeysetCursor.decode(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    elif since:
+        if not ObjectId.is_valid(since):
+            raise HTTPException(status_code=400, detail="Invalid message id")
+        message = await chats.find_one({"_id": ObjectId(since)}, {"created_at": 1})
+        if message is None:
+            raise HTTPException(status_code=404, detail="Message not found")
+        page_cursor = KeysetCursor.from_document(message, AFTER)
+
+    chats_list, next_cursor, prev_cursor = await fetch_page(chats, query, limit, page_cursor)
     for chat in chats_list:
         chat["_id"] = str(chat["_id"])
-    print(chats_list)
-    chats_list.sort(key=lambda x: x["created_at"])
+    logger.debug("Chats %s", chats_list)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor.encode()
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor.encode()
     return chats_list
 
 
-@app.get("/writings", response_model=List[EnglishWriting])
-def get_writings():
-    db = MongoDBClient.get_db()
-    writings = db[CollectionName.ENG_WRITINGS.value].find()
-    writing_list = list(writings)
+@app.get("/writings", response_model=List[WritingSummary])
+async def get_writings(
+    response: Response,
+    limit: int = Query(20, gt=0, le=100),
+    cursor: Optional[str] = None,
+    sort: Literal["newest", "oldest"] = "newest",
+    genre: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """
+    One page of writing cards (title, genre, score, word count, date); the
+    full writing is read with GET /writings/{id}. ``cursor`` continues from
+    the X-Next-Cursor header of the previous page, in that page's order.
+    """
+    db = MongoDBClient.get_async_db()
+    query: dict = {}
+    if genre:
+        query["genre"] = genre
+    if start or end:
+        query["created_at"] = {}
+        if start:
+            query["created_at"]["$gte"] = start
+        if end:
+            query["created_at"]["$lte"] = end
+
+    page_cursor = None
+    if cursor:
+        try:
+            page_cursor = KeysetCursor.decode(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    writing_list, next_cursor = await fetch_ordered_page(
+        db[CollectionName.ENG_WRITINGS.value],
+        query,
+        limit,
+        page_cursor,
+        direction=BEFORE if sort == "newest" else AFTER,
+        projection=WRITING_SUMMARY_FIELDS,
+    )
     for writing in writing_list:
         writing["_id"] = str(writing["_id"])
-    print(writing_list)
+    logger.debug("Writings %s", writing_list)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor.encode()
     return writing_list
 
 
+class WritingEvaluationRequest(BaseModel):
+    title: str
+    text: str
+    force: bool = False  # re-evaluate even if the same writing was evaluated recently
+
+
+@app.post("/writings/evaluate", status_code=202)
+async def evaluate_writing(request: WritingEvaluationRequest):
+    """Queue a writing evaluation; poll GET /jobs/{id} or stream /jobs/{id}/stream"""
+    job_id = await job_pool.submit(WRITING_EVALUATION_JOB, request.model_dump())
+    return {"jobId": job_id, "status": "queued"}
+
+
+@app.get("/jobs/{id}")
+async def get_job(id: str):
+    """Status, per-node progress and, once completed, the result of a job"""
+    job = await job_pool.queue.aget(id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobQueue.to_public(job)
+
+
+@app.get("/jobs/{id}/stream")
+async def stream_job(id: str, poll_interval: float = Query(0.5, gt=0, le=10)):
+    """
+    Server-Sent Events for a job: one ``progress`` event per finished node,
+    then ``done`` with the job (including its result) or ``error`` if it failed.
+    """
+    job = await job_pool.queue.aget(id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_stream():
+        current = job
+        sent = 0
+        attempt = current.get("attempts", 0)
+        while True:
+            # A retried job starts its progress over
+            if current.get("attempts", 0) != attempt:
+                attempt, sent = current.get("attempts", 0), 0
+            progress = current.get("progress", [])
+            for entry in progress[sent:]:
+                yield format_sse("progress", entry)
+            sent = len(progress)
+
+            if current.get("status") == COMPLETED:
+                yield format_sse("done", JobQueue.to_public(current))
+                return
+            if current.get("status") == FAILED:
+                yield format_sse("error", JobQueue.to_public(current))
+                return
+
+            await asyncio.sleep(poll_interval)
+            current = await job_pool.queue.aget(id) or current
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.get("/writings/{id}", response_model=EnglishWriting)
-def get_writing_by_id(id: str):
+async def get_writing_by_id(id: str):
     """Get a specific writing by ID"""
-    db = MongoDBClient.get_db()
+    db = MongoDBClient.get_async_db()
     try:
         object_id = ObjectId(id)
     except:
         raise HTTPException(status_code=400, detail="Invalid ObjectId format")
 
-    writing = db[CollectionName.ENG_WRITINGS.value].find_one({"_id": object_id})
+    writing = await db[CollectionName.ENG_WRITINGS.value].find_one({"_id": object_id})
     if writing:
         writing["_id"] = str(writing["_id"])
         return writing
@@ -188,38 +555,76 @@ def get_writing_by_id(id: str):
 
 
 @app.get("/analytics/summary")
-def get_analytics_summary():
+async def get_analytics_summary():
     """Get overall analytics summary for the student"""
-    db = MongoDBClient.get_db()
+    db = MongoDBClient.get_async_db()
 
     try:
-        # Get writing statistics
-        writing_count = db[CollectionName.ENG_WRITINGS.value].count_documents({})
-
-        # Get average score
-        pipeline = [
-            {"$match": {"overall_score": {"$exists": True, "$ne": None}}},
-            {"$group": {"_id": None, "avg_score": {"$avg": "$overall_score"}}},
-        ]
-        avg_result = list(db[CollectionName.ENG_WRITINGS.value].aggregate(pipeline))
-        avg_score = avg_result[0]["avg_score"] if avg_result else 0
-
-        # Get recent activity count
-        recent_chats = db[CollectionName.CHATHISTORY.value].count_documents({})
+        # Counters kept up to date by every save (db/rollups.py)
+        rollups = await aget_summary(db)
+        writing_count = rollups["total_writings"]
 
         return {
             "total_writings": writing_count,
-            "average_score": round(avg_score, 1),
-            "total_interactions": recent_chats,
+            "average_score": round(rollups["average_score"], 1),
+            "total_interactions": rollups["total_interactions"],
             "current_level": 1,  # Placeholder - would be calculated based on progress
             "total_points": writing_count * 10,  # Simple point system
         }
-    except Exception as e:
-        print(f"Error getting analytics: {e}")
+    except Exception:
+        logger.exception("Error getting analytics")
         raise HTTPException(status_code=500, detail="Error retrieving analytics")
 
 
+@app.get("/router/stats")
+def get_router_stats():
+    """Hit-rate and shadow-accuracy counters of the local text classifier"""
+    from workflows.supervisor import get_supervisor_workflow
+
+    return get_supervisor_workflow().text_classifier.stats()
+
+
+@app.get("/llm/admission/stats")
+def get_llm_admission_stats():
+    """LLM concurrency, wait-queue and rejection counters"""
+    return LLMProvider.get_admission().stats()
+
+
+@app.get("/llm/resilience/stats")
+def get_llm_resilience_stats():
+    """LLM retry, timeout, hedging and circuit breaker counters per model"""
+    return LLMProvider.resilience_stats()
+
+
+@app.get("/llm/cache/stats")
+def get_llm_cache_stats():
+    """Hit/miss/byte counters of the LLM response cache"""
+    cache = LLMProvider.get_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus metrics: graph nodes, LLM calls and MongoDB commands"""
+    if not metrics_enabled():
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "KidsProgress API"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: 200 once the startup warmup has succeeded, 503 with the
+    failed components otherwise. Reports per-component warmup timings.
+    """
+    report = await readiness.check()
+    if not report["ready"]:
+        return JSONResponse(status_code=503, content=report)
+    return report
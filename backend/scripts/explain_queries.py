@@ -0,0 +1,190 @@
+"""
+Print the query plan of every repository query and fail on collection scans.
+
+Each query below mirrors one the backend runs (API handlers, repositories,
+jobs). For every query the winning plan of ``explain()`` is printed as a
+stage chain; a COLLSCAN on a collection with more than ``--max-collscan-docs``
+documents is a failure and makes the command exit with status 1. Small
+collections (e.g. the writing criteria) may be scanned.
+
+    cd backend
+    python -m scripts.explain_queries
+    python -m scripts.explain_queries --ensure-indexes --max-collscan-docs 0
+"""
+
+import argparse
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from db.constants import CollectionName
+from db.pagination import AFTER, BEFORE, NEWEST_FIRST, KeysetCursor
+
+NOW = datetime.now(timezone.utc)
+
+# name -> (collection, filter, sort, limit)
+Query = Tuple[CollectionName, Dict[str, Any], Optional[List[Tuple[str, int]]], int]
+
+QUERIES: Dict[str, Query] = {
+    "GET /chats": (CollectionName.CHATHISTORY, {}, NEWEST_FIRST, 31),
+    "GET /chats?cursor=": (
+        CollectionName.CHATHISTORY,
+        KeysetCursor(NOW.replace(tzinfo=None), ObjectId(), BEFORE).filter(),
+        NEWEST_FIRST,
+        31,
+    ),
+    "GET /chats?since=": (
+        CollectionName.CHATHISTORY,
+        KeysetCursor(NOW.replace(tzinfo=None), ObjectId(), AFTER).filter(),
+        [("created_at", ASCENDING), ("_id", ASCENDING)],
+        31,
+    ),
+    "GET /writings": (CollectionName.ENG_WRITINGS, {}, NEWEST_FIRST, 21),
+    "GET /writings?genre=&cursor=": (
+        CollectionName.ENG_WRITINGS,
+        {
+            "$and": [
+                {"genre": "narrative"},
+                KeysetCursor(NOW.replace(tzinfo=None), ObjectId(), BEFORE).filter(),
+            ]
+        },
+        NEWEST_FIRST,
+        21,
+    ),
+    "writing criteria": (CollectionName.WRITING_CRITERIA, {}, None, 0),
+    "writing duplicate": (
+        CollectionName.ENG_WRITINGS,
+        {"content_hash": "0" * 32, "created_at": {"$gte": NOW}},
+        None,
+        1,
+    ),
+    "recent writings": (CollectionName.ENG_WRITINGS, {}, [("created_at", DESCENDING)], 10),
+    "writings by genre": (CollectionName.ENG_WRITINGS, {"genre": "narrative"}, None, 0),
+    "writings by date": (
+        CollectionName.ENG_WRITINGS,
+        {"created_at": {"$gte": NOW, "$lte": NOW}},
+        None,
+        0,
+    ),
+    "recent math problems": (
+        CollectionName.MATH_PROBLEMS,
+        {},
+        [("created_at", DESCENDING)],
+        10,
+    ),
+    "math problems by type": (
+        CollectionName.MATH_PROBLEMS,
+        {"problem_type": "arithmetic"},
+        None,
+        0,
+    ),
+    "math problems by difficulty": (
+        CollectionName.MATH_PROBLEMS,
+        {"difficulty_level": "beginner"},
+        None,
+        0,
+    ),
+    "common weaknesses": (
+        CollectionName.ANALYTICS_ROLLUPS,
+        {"kind": "criterion", "low_count": {"$gt": 0}},
+        [("low_count", DESCENDING)],
+        5,
+    ),
+    "claim job": (
+        CollectionName.JOBS,
+        {
+            "kind": {"$in": ["writing_evaluation"]},
+            "$or": [
+                {"status": "queued", "notBefore": {"$not": {"$gt": NOW}}},
+                {"status": "running", "leaseExpiresAt": {"$lt": NOW}},
+            ],
+        },
+        [("createdAt", ASCENDING)],
+        1,
+    ),
+}
+
+
+def winning_plan(explain: Dict[str, Any]) -> Dict[str, Any]:
+    plan = explain["queryPlanner"]["winningPlan"]
+    # Slot-based engine plans nest the classic plan under queryPlan
+    return plan.get("queryPlan", plan)
+
+
+def stages(plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Every stage of a plan tree, depth first"""
+    found = [plan]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            found.extend(stages(child))
+    return found
+
+
+def describe(plan: Dict[str, Any]) -> str:
+    parts = []
+    for stage in stages(plan):
+        label = stage["stage"]
+        if "indexName" in stage:
+            label += f"({stage['indexName']})"
+        parts.append(label)
+    return " > ".join(parts)
+
+
+def is_collscan(plan: Dict[str, Any]) -> bool:
+    return any(stage["stage"] == "COLLSCAN" for stage in stages(plan))
+
+
+def explain(db, query: Query) -> Dict[str, Any]:
+    collection, filter, sort, limit = query
+    cursor = db[collection.value].find(filter)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor.explain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--max-collscan-docs",
+        type=int,
+        default=1000,
+        help="largest collection a query may scan (default 1000)",
+    )
+    parser.add_argument(
+        "--ensure-indexes", action="store_true", help="create the declared indexes first"
+    )
+    args = parser.parse_args()
+
+    from db.client import MongoDBClient
+    from db.indexes import ensure_indexes
+
+    db = MongoDBClient.get_db()
+    if args.ensure_indexes:
+        ensure_indexes(db)
+
+    failures = []
+    for name, query in QUERIES.items():
+        plan = winning_plan(explain(db, query))
+        size = db[query[0].value].estimated_document_count()
+        scan = is_collscan(plan)
+        failed = scan and size > args.max_collscan_docs
+        if failed:
+            failures.append(name)
+        status = "FAIL" if failed else ("scan" if scan else "ok")
+        print(f"{status:4s}  {name:28s} {query[0].value:16s} {size:>8d} docs  {describe(plan)}")
+
+    if failures:
+        print(f"\n{len(failures)} queries scan collections over {args.max_collscan_docs} documents:")
+        for name in failures:
+            print(f"  {name}")
+        sys.exit(1)
+    print("\nno collection scans above the threshold")
+
+
+if __name__ == "__main__":
+    main()
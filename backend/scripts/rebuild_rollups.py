@@ -0,0 +1,48 @@
+"""
+Recompute the analytics rollups from the raw collections and verify them.
+
+The rollups (``db/rollups.py``) are incremented by every writing and chat
+save. This command recomputes them from ``englishWritings`` and
+``chatHistory``, replaces the stored documents and checks the result. With
+``--verify`` it only compares and exits with status 1 when a rollup has
+drifted from the raw data.
+
+    cd backend
+    python -m scripts.rebuild_rollups
+    python -m scripts.rebuild_rollups --verify
+"""
+
+import argparse
+import sys
+
+
+def report(mismatches) -> int:
+    for key, values in mismatches.items():
+        print(f"DIFF  {key:32s} stored={values['stored']} expected={values['expected']}")
+    return len(mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--verify", action="store_true", help="only compare the rollups with the raw data"
+    )
+    args = parser.parse_args()
+
+    from db.client import MongoDBClient
+    from db.rollups import rebuild, verify
+
+    db = MongoDBClient.get_db()
+    if not args.verify:
+        counters = rebuild(db)
+        print(f"rebuilt {len(counters)} rollups")
+
+    mismatches = verify(db)
+    if report(mismatches):
+        print(f"\n{len(mismatches)} rollups differ from the raw data")
+        sys.exit(1)
+    print("rollups match the raw data")
+
+
+if __name__ == "__main__":
+    main()
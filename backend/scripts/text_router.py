@@ -0,0 +1,138 @@
+"""
+Train and evaluate the supervisor's local text classifier.
+
+Labelled samples come either from chat history (user text messages whose
+route was decided by the LLM, i.e. routeSource == "llm") or from a JSONL file
+with one {"text": ..., "label": "system_related" | "general"} object per line.
+
+    cd backend
+    python -m scripts.text_router train --output text_router_model.json
+    python -m scripts.text_router evaluate --input labelled.jsonl
+    python -m scripts.text_router evaluate --threshold 0.9 --no-rules
+
+scripts/text_router_samples.jsonl is a small hand-labelled set that includes
+everyday uses of the rule keywords ("the score of the game"), which must not
+be routed to the analysis workflow:
+
+    python -m scripts.text_router evaluate --input scripts/text_router_samples.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import List, Optional, Tuple
+
+from workflows.text_router import (
+    GENERAL,
+    SYSTEM_RELATED,
+    TextRouteClassifier,
+    TfidfLogisticModel,
+    evaluate,
+)
+
+ROUTE_LABELS = {"analysis_workflow": SYSTEM_RELATED, "general_workflow": GENERAL}
+
+
+def load_jsonl(path: str) -> List[Tuple[str, str]]:
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                samples.append((row["text"], row["label"]))
+    return samples
+
+
+def load_chat_history(limit: Optional[int] = None) -> List[Tuple[str, str]]:
+    from db.client import MongoDBClient
+    from db.constants import ChatHistoryRole, ChatHistoryType, CollectionName
+
+    cursor = MongoDBClient.get_db()[CollectionName.CHATHISTORY.value].find(
+        {
+            "role": ChatHistoryRole.USER.value,
+            "type": ChatHistoryType.TEXT.value,
+            "routeSource": "llm",
+            "route": {"$in": list(ROUTE_LABELS)},
+        },
+        {"content": 1, "route": 1},
+    )
+    if limit:
+        cursor = cursor.limit(limit)
+    return [(doc["content"], ROUTE_LABELS[doc["route"]]) for doc in cursor]
+
+
+def load_samples(args) -> List[Tuple[str, str]]:
+    return load_jsonl(args.input) if args.input else load_chat_history(args.limit)
+
+
+def train(args):
+    samples = load_samples(args)
+    if not samples:
+        sys.exit("No labelled samples found")
+
+    random.Random(0).shuffle(samples)
+    holdout = int(len(samples) * args.holdout)
+    test, train_set = samples[:holdout], samples[holdout:]
+
+    model = TfidfLogisticModel.train(
+        [t for t, _ in train_set],
+        [1 if label == SYSTEM_RELATED else 0 for _, label in train_set],
+        epochs=args.epochs,
+    )
+    model.save(args.output)
+    print(f"trained on {len(train_set)} samples, vocabulary {len(model.vocab)}")
+    print(f"saved to {args.output}")
+
+    if test:
+        classifier = TextRouteClassifier(model=model, threshold=args.threshold)
+        print(f"holdout ({len(test)} samples): {evaluate(classifier, test)}")
+
+
+def evaluate_command(args):
+    samples = load_samples(args)
+    if not samples:
+        sys.exit("No labelled samples found")
+
+    model = TfidfLogisticModel.load(args.model) if args.model else None
+    classifier = TextRouteClassifier(
+        model=model, threshold=args.threshold, use_rules=not args.no_rules
+    )
+
+    start = time.perf_counter()
+    result = evaluate(classifier, samples)
+    per_decision_us = (time.perf_counter() - start) / len(samples) * 1e6
+
+    for key, value in result.items():
+        print(f"{key:20s}: {value:.4f}" if isinstance(value, float) else f"{key:20s}: {value}")
+    print(f"{'latency_per_message':20s}: {per_decision_us:.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("train", "evaluate"):
+        p = sub.add_parser(name)
+        p.add_argument("--input", help="JSONL file; defaults to chat history in MongoDB")
+        p.add_argument("--limit", type=int, help="max chat history rows to read")
+        p.add_argument("--threshold", type=float, default=0.85)
+
+    sub.choices["train"].add_argument("--output", default="text_router_model.json")
+    sub.choices["train"].add_argument("--epochs", type=int, default=30)
+    sub.choices["train"].add_argument("--holdout", type=float, default=0.2)
+    sub.choices["evaluate"].add_argument(
+        "--model", help="trained model file; rules only when omitted"
+    )
+    sub.choices["evaluate"].add_argument("--no-rules", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "train":
+        train(args)
+    else:
+        evaluate_command(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Async (AsyncMongoClient-style) adapter over mongomock, shared by tests and benchmarks."""
+
+import asyncio
+import itertools
+from typing import Any, List, Optional
+
+
+class _AsyncCursor:
+    """pymongo's AsyncCursor API over a mongomock cursor"""
+
+    def __init__(self, cursor, latency: float):
+        self._cursor = cursor
+        self._latency = latency
+
+    def sort(self, *args, **kwargs):
+        self._cursor.sort(*args, **kwargs)
+        return self
+
+    def skip(self, n: int):
+        self._cursor.skip(n)
+        return self
+
+    def limit(self, n: int):
+        self._cursor.limit(n)
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Any]:
+        await asyncio.sleep(self._latency)
+        return list(itertools.islice(self._cursor, length))
+
+    async def __aiter__(self):
+        for doc in await self.to_list():
+            yield doc
+
+
+class _AsyncCollection:
+    """Every collection method as a coroutine, after ``latency`` seconds"""
+
+    def __init__(self, collection, latency: float):
+        self._collection = collection
+        self._latency = latency
+
+    def find(self, *args, **kwargs) -> _AsyncCursor:
+        return _AsyncCursor(self._collection.find(*args, **kwargs), self._latency)
+
+    async def aggregate(self, *args, **kwargs) -> _AsyncCursor:
+        await asyncio.sleep(self._latency)
+        return _AsyncCursor(self._collection.aggregate(*args, **kwargs), 0)
+
+    def __getattr__(self, name: str):
+        method = getattr(self._collection, name)
+
+        async def call(*args, **kwargs):
+            await asyncio.sleep(self._latency)
+            return method(*args, **kwargs)
+
+        return call
+
+
+class _AsyncDatabase:
+    def __init__(self, database, latency: float):
+        self._database = database
+        self._latency = latency
+
+    def __getitem__(self, name: str) -> _AsyncCollection:
+        return _AsyncCollection(self._database[name], self._latency)
+
+    __getattr__ = __getitem__
+
+    async def command(self, *args, **kwargs):
+        await asyncio.sleep(self._latency)
+        return self._database.command(*args, **kwargs)
+
+
+class AsyncMongomockClient:
+    """
+    AsyncMongoClient stand-in sharing the data of a (sync) mongomock client,
+    so the sync and async code paths see the same collections
+    """
+
+    def __init__(self, client, latency: float = 0.0):
+        self._client = client
+        self._latency = latency
+
+    def __getitem__(self, name: str) -> _AsyncDatabase:
+        return _AsyncDatabase(self._client[name], self._latency)
+
+    @property
+    def admin(self) -> _AsyncDatabase:
+        return self["admin"]
+
+    async def close(self):
+        pass
@@ -0,0 +1,32 @@
+import pytest
+from benchmarks.baseline import compare, latency_summary, percentile
+
+
+@pytest.mark.unit
+def test_latency_summary_percentiles():
+    summary = latency_summary([i / 1000 for i in range(1, 101)], wall_s=2.0)
+
+    assert percentile(list(range(1, 101)), 0.95) == 95
+    assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (50, 95, 99)
+    assert summary["throughput_rps"] == 50
+
+
+@pytest.mark.unit
+def test_compare_flags_only_regressions_above_threshold():
+    baseline = {
+        "chat_text": {
+            "concurrency": {"8": {"p95_ms": 100.0, "throughput_rps": 40.0, "requests": 64}},
+            "allocations": {"peak_kib_per_request": 100.0},
+        }
+    }
+    current = {
+        "chat_text": {
+            "concurrency": {"8": {"p95_ms": 130.0, "throughput_rps": 35.0, "requests": 64}},
+            "allocations": {"peak_kib_per_request": 50.0},
+        },
+        "new_scenario": {"concurrency": {"1": {"p95_ms": 1.0}}},
+    }
+
+    regressions = compare(baseline, current, threshold=0.2)
+
+    assert regressions == ["chat_text.concurrency.8.p95_ms: 100.0 -> 130.0 (+30%)"]
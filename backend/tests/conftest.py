@@ -36,7 +36,7 @@ class MockLLMProvider:
         self.llm.invoke = Mock(return_value=Mock(content="Mock LLM Response"))
     
     @staticmethod
-    def get_llm():
+    def get_llm(*args, **kwargs):
         return MockLLMProvider().llm
 
 @pytest.fixture
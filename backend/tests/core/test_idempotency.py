@@ -0,0 +1,144 @@
+import asyncio
+import mongomock
+import pytest
+from tests.async_mongomock import AsyncMongomockClient
+from core.idempotency import (
+    IdempotencyConflict,
+    IdempotencyKeyReused,
+    IdempotencyStore,
+)
+
+
+def shared_collection():
+    """Async idempotency collection and the same data through a sync client"""
+    client = mongomock.MongoClient()
+    return AsyncMongomockClient(client)["db"]["idempotencyKeys"], client.db.idempotencyKeys
+
+
+class CountingHandler:
+    def __init__(self, delay=0.05, fail=False):
+        self.calls = 0
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("boom")
+        return {"AIMsgId": f"ai{self.calls}"}
+
+
+@pytest.mark.unit
+def test_concurrent_duplicates_share_one_execution():
+    store = IdempotencyStore(persistent=False)
+    handler = CountingHandler()
+
+    async def scenario():
+        return await asyncio.gather(*(store.run("t1", "fp", handler) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert handler.calls == 1
+    assert all(r == {"AIMsgId": "ai1"} for r in results)
+
+
+@pytest.mark.unit
+def test_completed_response_is_replayed_across_workers():
+    collection, _ = shared_collection()
+    worker_a = IdempotencyStore(collection=collection)
+    worker_b = IdempotencyStore(collection=collection)
+    handler = CountingHandler()
+
+    first = asyncio.run(worker_a.run("t1", "fp", handler))
+    second = asyncio.run(worker_b.run("t1", "fp", handler))
+
+    assert handler.calls == 1
+    assert second == first
+
+
+@pytest.mark.unit
+def test_duplicate_waits_for_other_worker():
+    collection, _ = shared_collection()
+    worker_a = IdempotencyStore(collection=collection, poll_interval=0.01)
+    worker_b = IdempotencyStore(collection=collection, poll_interval=0.01)
+    handler = CountingHandler(delay=0.1)
+
+    async def scenario():
+        first = asyncio.create_task(worker_a.run("t1", "fp", handler))
+        await asyncio.sleep(0.02)
+        return await asyncio.gather(first, worker_b.run("t1", "fp", handler))
+
+    first, second = asyncio.run(scenario())
+
+    assert handler.calls == 1
+    assert first == second
+
+
+@pytest.mark.unit
+def test_wait_gives_up_with_conflict():
+    collection, records = shared_collection()
+    records.insert_one({"_id": "t1", "status": "in_flight", "fingerprint": "fp"})
+    store = IdempotencyStore(collection=collection, wait_timeout=0.05, poll_interval=0.01)
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(store.run("t1", "fp", CountingHandler()))
+
+
+@pytest.mark.unit
+def test_failure_releases_key_for_retry():
+    collection, _ = shared_collection()
+    store = IdempotencyStore(collection=collection)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.run("t1", "fp", CountingHandler(fail=True)))
+
+    handler = CountingHandler()
+    assert asyncio.run(store.run("t1", "fp", handler)) == {"AIMsgId": "ai1"}
+    assert handler.calls == 1
+
+
+@pytest.mark.unit
+def test_reused_key_with_different_body_is_rejected():
+    store = IdempotencyStore(persistent=False)
+    asyncio.run(store.run("t1", "fp", CountingHandler()))
+
+    with pytest.raises(IdempotencyKeyReused):
+        asyncio.run(store.run("t1", "other", CountingHandler()))
+
+
+@pytest.mark.unit
+def test_lease_is_renewed_while_the_request_runs():
+    """A run longer than the lease keeps its key; the duplicate waits for it"""
+    collection, _ = shared_collection()
+    worker_a = IdempotencyStore(collection=collection, lease=0.06, poll_interval=0.01)
+    worker_b = IdempotencyStore(collection=collection, lease=0.06, poll_interval=0.01)
+    handler = CountingHandler(delay=0.3)
+
+    async def scenario():
+        first = asyncio.create_task(worker_a.run("t1", "fp", handler))
+        await asyncio.sleep(0.02)
+        return await asyncio.gather(first, worker_b.run("t1", "fp", handler))
+
+    first, second = asyncio.run(scenario())
+
+    assert handler.calls == 1
+    assert first == second
+
+
+@pytest.mark.unit
+def test_run_that_lost_its_claim_does_not_overwrite_the_record():
+    collection, records = shared_collection()
+    store = IdempotencyStore(collection=collection)
+
+    async def scenario():
+        assert await store.begin("t1", "fp") is None
+        # The lease expired and another worker claimed the key
+        records.update_one({"_id": "t1"}, {"$set": {"owner": "other"}})
+        await store.complete("t1", {"AIMsgId": "late"})
+
+    asyncio.run(scenario())
+
+    record = records.find_one({"_id": "t1"})
+    assert record["status"] == "in_flight"
+    assert record["owner"] == "other"
@@ -0,0 +1,179 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import mongomock
+import pytest
+from tests.async_mongomock import AsyncMongomockClient
+from core.jobs import COMPLETED, FAILED, QUEUED, RUNNING, JobQueue, JobWorkerPool
+from llm.admission import AdmissionRejected
+from llm.resilience import LLMTransientError
+
+
+@pytest.fixture
+def queue():
+    client = mongomock.MongoClient()
+    return JobQueue(
+        lease_seconds=30,
+        max_attempts=2,
+        collection=client.db.jobs,
+        async_collection=AsyncMongomockClient(client)["db"]["jobs"],
+    )
+
+
+@pytest.mark.unit
+def test_claim_is_exclusive_and_oldest_first(queue):
+    first = queue.enqueue("writing_evaluation", {"title": "A"})
+    queue.enqueue("writing_evaluation", {"title": "B"})
+
+    job = queue.claim("worker-a", ["writing_evaluation"])
+    other = queue.claim("worker-b", ["writing_evaluation"])
+
+    assert str(job["_id"]) == first
+    assert job["status"] == RUNNING and job["attempts"] == 1
+    assert other["input"] == {"title": "B"}
+    assert queue.claim("worker-c", ["writing_evaluation"]) is None
+
+
+@pytest.mark.unit
+def test_expired_lease_is_reclaimed(queue):
+    """A crashed worker's job is picked up again once its lease expires"""
+    queue.enqueue("writing_evaluation", {})
+    job = queue.claim("crashed", ["writing_evaluation"])
+    queue.collection.update_one(
+        {"_id": job["_id"]},
+        {"$set": {"leaseExpiresAt": datetime.now(timezone.utc) - timedelta(seconds=1)}},
+    )
+
+    reclaimed = queue.claim("worker-b", ["writing_evaluation"])
+
+    assert reclaimed["_id"] == job["_id"]
+    assert reclaimed["attempts"] == 2
+    # The crashed worker no longer owns it
+    assert queue.complete(job["_id"], "crashed", {}) is False
+    assert queue.complete(job["_id"], "worker-b", {"writingId": "w1"}) is True
+
+
+@pytest.mark.unit
+def test_failed_job_is_retried_then_failed(queue):
+    queue.enqueue("writing_evaluation", {})
+
+    job = queue.claim("w", ["writing_evaluation"])
+    assert queue.fail(job["_id"], "w", "boom", job["attempts"]) == QUEUED
+    # The retry waits for its backoff
+    assert queue.claim("w", ["writing_evaluation"]) is None
+    queued = queue.get(str(job["_id"]))
+    assert queued["notBefore"] - queued["updatedAt"] == timedelta(seconds=30)
+    queue.collection.update_one(
+        {"_id": job["_id"]},
+        {"$set": {"notBefore": datetime.now(timezone.utc) - timedelta(seconds=1)}},
+    )
+    job = queue.claim("w", ["writing_evaluation"])
+    assert queue.fail(job["_id"], "w", "boom", job["attempts"]) == FAILED
+    assert queue.get(str(job["_id"]))["status"] == FAILED
+
+
+@pytest.mark.unit
+def test_worker_pool_runs_job_and_records_progress(queue):
+    async def handler(job_input, report):
+        await report("evaluate", {"node_timings": {"evaluate": 12.5}})
+        await report("save", {})
+        return {"writingId": "w1", "title": job_input["title"]}
+
+    pool = JobWorkerPool(queue, {"writing_evaluation": handler}, workers=2, poll_interval=0.01)
+
+    async def scenario():
+        await pool.start()
+        job_id = await pool.submit("writing_evaluation", {"title": "My Cat"})
+        for _ in range(200):
+            job = await queue.aget(job_id)
+            if job["status"] == COMPLETED:
+                break
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    public = JobQueue.to_public(job)
+
+    assert public["status"] == COMPLETED
+    assert public["result"] == {"writingId": "w1", "title": "My Cat"}
+    assert [(p["node"], p["ms"]) for p in public["progress"]] == [
+        ("evaluate", 12.5),
+        ("save", None),
+    ]
+
+
+@pytest.mark.unit
+def test_worker_survives_a_failure_to_record_the_outcome(queue, monkeypatch):
+    """A MongoDB error while failing a job does not stop the worker"""
+    attempts = []
+
+    async def handler(job_input, report):
+        attempts.append(job_input["title"])
+        if job_input["title"] == "broken":
+            raise ValueError("bad input")
+        return {}
+
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("MongoDB unreachable")
+
+    monkeypatch.setattr(queue, "fail", unreachable)
+    pool = JobWorkerPool(queue, {"writing_evaluation": handler}, workers=1, poll_interval=0.01)
+
+    async def scenario():
+        await pool.start()
+        await pool.submit("writing_evaluation", {"title": "broken"})
+        job_id = await pool.submit("writing_evaluation", {"title": "fine"})
+        for _ in range(200):
+            if queue.get(job_id)["status"] == COMPLETED:
+                break
+            await asyncio.sleep(0.01)
+        await pool.stop()
+        return queue.get(job_id)
+
+    job = asyncio.run(scenario())
+
+    assert attempts == ["broken", "fine"]
+    assert job["status"] == COMPLETED
+
+
+def run_once(queue, error):
+    """Claim the queued job and run it with a handler raising ``error``"""
+
+    async def handler(job_input, report):
+        raise error
+
+    pool = JobWorkerPool(queue, {"writing_evaluation": handler})
+    queue.collection.update_many({}, {"$unset": {"notBefore": ""}})
+    job = queue.claim(pool.owner, ["writing_evaluation"])
+    asyncio.run(pool.run_job(job))
+    return queue.get(str(job["_id"]))
+
+
+@pytest.mark.unit
+def test_provider_errors_use_up_attempts(queue):
+    """Exhausted LLM retries are a failed attempt, not an endless deferral"""
+    queue.enqueue("writing_evaluation", {})
+    error = LLMTransientError("provider kept failing", retry_after=1)
+
+    job = run_once(queue, error)
+    assert job["status"] == QUEUED and job["attempts"] == 1
+    assert "deferrals" not in job
+    job = run_once(queue, error)
+    assert job["status"] == FAILED and job["attempts"] == 2
+
+
+@pytest.mark.unit
+def test_deferrals_are_capped(queue):
+    """A job that keeps finding no capacity eventually fails"""
+    queue.max_deferrals = 2
+    queue.enqueue("writing_evaluation", {})
+    error = AdmissionRejected("queue_full", "writing_evaluation", 5)
+
+    for deferrals in (1, 2):
+        job = run_once(queue, error)
+        assert job["status"] == QUEUED and job["attempts"] == 0
+        assert job["deferrals"] == deferrals
+    job = run_once(queue, error)
+    assert job["status"] == QUEUED and job["attempts"] == 1
+    job = run_once(queue, error)
+    assert job["status"] == FAILED
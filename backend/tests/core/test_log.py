@@ -0,0 +1,67 @@
+import io
+import json
+import logging
+import logging.handlers
+import queue
+
+import pytest
+
+from core.log import JsonFormatter, SampledQueueHandler
+
+
+@pytest.fixture
+def pipeline():
+    """Logger -> SampledQueueHandler -> listener thread -> JSON lines in a buffer"""
+    records = queue.Queue()
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    listener = logging.handlers.QueueListener(records, output)
+    handler = SampledQueueHandler(records, debug_sample_rate=1.0, max_length=50)
+
+    logger = logging.getLogger("tests.core.test_log")
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    listener.start()
+
+    def lines():
+        listener.stop()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield logger, handler, lines
+    logger.removeHandler(handler)
+
+
+@pytest.mark.unit
+def test_large_payloads_are_truncated(pipeline):
+    logger, _, lines = pipeline
+    chats = [{"role": "user", "content": "x" * 1000, "n": i} for i in range(500)]
+
+    logger.debug("Chats %s", chats, extra={"tempId": "t1", "state": {"text": "y" * 1000}})
+
+    [entry] = lines()
+    assert entry["level"] == "DEBUG"
+    assert entry["tempId"] == "t1"
+    assert entry["message"].startswith("Chats [{'content': 'xxx")
+    assert entry["message"].endswith(", ...]")
+    assert len(entry["message"]) < 2000
+    assert len(entry["state"]) < 200
+
+
+@pytest.mark.unit
+def test_debug_records_are_sampled(pipeline):
+    logger, handler, lines = pipeline
+    handler.debug_sample_rate = 0.0
+
+    for i in range(20):
+        logger.debug("verbose %d", i)
+    logger.info("kept")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+
+    entries = lines()
+    assert [e["message"] for e in entries] == ["kept", "failed"]
+    assert "ValueError: boom" in entries[1]["exc"]
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+from typing import TypedDict
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+from prometheus_client import REGISTRY
+
+from core.metrics import GraphMetricsHandler, MongoCommandMetrics
+
+
+class State(TypedDict):
+    text: str
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def build_graphs():
+    llm = GenericFakeChatModel(
+        messages=iter(
+            [AIMessage(content="hi", usage_metadata={"input_tokens": 12, "output_tokens": 3, "total_tokens": 15})]
+        )
+    )
+
+    def answer(state):
+        return {"text": llm.invoke(state["text"]).content}
+
+    inner = StateGraph(State)
+    inner.add_node("answer", answer)
+    inner.add_edge(START, "answer")
+    inner.add_edge("answer", END)
+    inner = inner.compile(name="metrics_inner")
+
+    def fail(state):
+        raise ValueError("boom")
+
+    outer = StateGraph(State)
+    outer.add_node("delegate", lambda state: inner.invoke(state))
+    outer.add_node("fail", fail)
+    outer.add_edge(START, "delegate")
+    outer.add_edge("delegate", "fail")
+    outer.add_edge("fail", END)
+    return outer.compile(name="metrics_outer")
+
+
+@pytest.mark.unit
+def test_nodes_and_llm_calls_are_labelled_by_graph():
+    handler = GraphMetricsHandler(["metrics_outer", "metrics_inner"])
+    outer_labels = {"graph": "metrics_outer", "node": "delegate", "status": "ok"}
+    inner_labels = {"graph": "metrics_inner", "node": "answer", "status": "ok"}
+    llm_labels = {"graph": "metrics_inner", "node": "answer", "model": "unknown"}
+
+    with pytest.raises(ValueError):
+        build_graphs().invoke({"text": "hello"}, config={"callbacks": [handler]})
+
+    assert sample("graph_node_duration_seconds_count", **outer_labels) == 1
+    assert sample("graph_node_duration_seconds_count", **inner_labels) == 1
+    assert sample(
+        "graph_node_duration_seconds_count", graph="metrics_outer", node="fail", status="error"
+    ) == 1
+    assert sample("graph_node_errors_total", graph="metrics_outer", node="fail", error="ValueError") == 1
+    assert sample("llm_call_duration_seconds_count", **llm_labels, status="ok") == 1
+    assert sample("llm_tokens_sum", **llm_labels, kind="input") == 12
+    assert sample("llm_tokens_sum", **llm_labels, kind="output") == 3
+    # Every run that started has ended and been forgotten
+    assert handler._runs == {} and handler._llm_runs == {}
+
+
+@pytest.mark.unit
+def test_runs_outside_registered_graphs_are_ignored():
+    handler = GraphMetricsHandler(["metrics_other"])
+
+    with pytest.raises(ValueError):
+        build_graphs().invoke({"text": "hello"}, config={"callbacks": [handler]})
+
+    assert handler._runs == {}
+    assert sample(
+        "graph_node_duration_seconds_count", graph="metrics_other", node="delegate", status="ok"
+    ) == 0
+
+
+@pytest.mark.unit
+def test_mongo_command_listener_observes_duration_by_collection():
+    listener = MongoCommandMetrics()
+    labels = {"command": "find", "collection": "metrics_test", "status": "ok"}
+    before = sample("mongo_command_duration_seconds_count", **labels)
+
+    listener.started(
+        SimpleNamespace(command_name="find", request_id=7, command={"find": "metrics_test"})
+    )
+    listener.succeeded(SimpleNamespace(command_name="find", request_id=7, duration_micros=2500))
+
+    assert sample("mongo_command_duration_seconds_count", **labels) == before + 1
+    assert listener._collections == {}
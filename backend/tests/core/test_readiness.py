@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+import pytest
+
+from core.readiness import Readiness
+
+
+@pytest.mark.unit
+def test_failed_component_is_retried_by_the_probe():
+    calls = {"graphs": 0, "mongo": 0}
+
+    def graphs():
+        calls["graphs"] += 1
+
+    def mongo():
+        calls["mongo"] += 1
+        if calls["mongo"] == 1:
+            raise ConnectionError("no server")
+
+    readiness = Readiness({"graphs": graphs, "mongo": mongo})
+    report = asyncio.run(readiness.warmup())
+
+    assert report["ready"] is False
+    assert report["components"]["graphs"]["status"] == "ok"
+    assert report["components"]["mongo"]["error"] == "ConnectionError: no server"
+    assert "ms" in report["components"]["graphs"]
+
+    report = asyncio.run(readiness.check())
+    assert report["ready"] is True
+    # Only the failed component ran again
+    assert calls == {"graphs": 1, "mongo": 2}
+
+
+@pytest.mark.unit
+def test_slow_component_times_out():
+    readiness = Readiness({"llm": lambda: time.sleep(0.5)}, timeout=0.05)
+
+    report = asyncio.run(readiness.warmup())
+
+    assert report["ready"] is False
+    assert report["components"]["llm"]["error"] == "timed out after 0.05s"
@@ -0,0 +1,139 @@
+import asyncio
+from types import SimpleNamespace
+from typing import TypedDict
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+from core.tracing import (
+    MongoCommandTracer,
+    OTLPFileExporter,
+    Span,
+    Tracing,
+    TracingCallbackHandler,
+    load_spans,
+    waterfall,
+)
+
+
+class State(TypedDict):
+    text: str
+
+
+class MemoryExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    exporter = MemoryExporter()
+    handler = TracingCallbackHandler(["trace_outer", "trace_inner"])
+    monkeypatch.setattr(Tracing, "_exporter", exporter)
+    monkeypatch.setattr(Tracing, "_handler", handler)
+    return handler, exporter
+
+
+def build_graph(listener):
+    llm = GenericFakeChatModel(
+        messages=iter(
+            [AIMessage(content="hi", usage_metadata={"input_tokens": 9, "output_tokens": 2, "total_tokens": 11})]
+        )
+    )
+
+    def query_db():
+        listener.started(
+            SimpleNamespace(
+                command_name="find", request_id=1, database_name="kp", command={"find": "chatHistory"}
+            )
+        )
+        listener.succeeded(SimpleNamespace(command_name="find", request_id=1))
+
+    async def answer(state):
+        # Mongo runs on a worker thread, the LLM call in the node's task
+        await asyncio.to_thread(query_db)
+        return {"text": (await llm.ainvoke(state["text"])).content}
+
+    inner = StateGraph(State)
+    inner.add_node("answer", answer)
+    inner.add_edge(START, "answer")
+    inner.add_edge("answer", END)
+    inner = inner.compile(name="trace_inner")
+
+    async def delegate(state):
+        return await inner.ainvoke(state)
+
+    outer = StateGraph(State)
+    outer.add_node("delegate", delegate)
+    outer.add_edge(START, "delegate")
+    outer.add_edge("delegate", END)
+    return outer.compile(name="trace_outer")
+
+
+@pytest.mark.unit
+def test_spans_nest_from_request_to_llm_and_mongo(tracer):
+    handler, exporter = tracer
+    graph = build_graph(MongoCommandTracer())
+
+    async def request():
+        with Tracing.span("POST /chat") as span:
+            await graph.ainvoke({"text": "hello"}, config={"callbacks": [handler]})
+        return span
+
+    request_span = asyncio.run(request())
+
+    spans = {s.name: s for s in exporter.spans}
+    assert set(spans) == {
+        "POST /chat", "trace_outer", "delegate", "trace_inner", "answer",
+        "find chatHistory", "chat unknown",
+    }
+    parents = {s.name: s.parent_id for s in exporter.spans}
+    assert parents["trace_outer"] == request_span.span_id
+    assert parents["delegate"] == spans["trace_outer"].span_id
+    assert parents["trace_inner"] == spans["delegate"].span_id
+    assert parents["answer"] == spans["trace_inner"].span_id
+    assert parents["find chatHistory"] == spans["answer"].span_id
+    assert parents["chat unknown"] == spans["answer"].span_id
+    assert {s.trace_id for s in exporter.spans} == {request_span.trace_id}
+    assert spans["chat unknown"].attributes["gen_ai.usage.input_tokens"] == 9
+    assert spans["answer"].attributes["langgraph.graph"] == "trace_inner"
+    assert handler._runs == {}
+
+
+@pytest.mark.unit
+def test_span_records_exceptions(tracer):
+    _, exporter = tracer
+
+    with pytest.raises(ValueError):
+        with Tracing.span("failing"):
+            raise ValueError("boom")
+
+    [span] = exporter.spans
+    assert span.status == 2
+    assert span.events[0]["attributes"]["exception.type"] == "ValueError"
+    assert Tracing.current_span() is None
+
+
+@pytest.mark.unit
+def test_file_exporter_writes_otlp_json(tmp_path):
+    exporter = OTLPFileExporter(str(tmp_path), flush_interval=0.05)
+    root = Span("POST /chat")
+    child = Span("chat gemini", root, attributes={"gen_ai.usage.input_tokens": 12})
+    for span in (child, root):
+        span.end_ns = span.start_ns + 1_000_000
+        exporter.export(span)
+    exporter.shutdown()
+
+    spans = load_spans(exporter.path)
+    assert [s["name"] for s in spans] == ["chat gemini", "POST /chat"]
+    assert spans[0]["parentSpanId"] == root.span_id
+    assert spans[0]["attributes"] == [
+        {"key": "gen_ai.usage.input_tokens", "value": {"intValue": "12"}}
+    ]
+    lines = waterfall(spans)
+    assert lines[0].startswith("POST /chat") and lines[1].startswith("  chat gemini")
@@ -0,0 +1,24 @@
+import mongomock
+import pytest
+
+from db.indexes import INDEXES, ensure_indexes, missing_indexes
+
+
+@pytest.mark.unit
+def test_ensure_creates_then_verifies(monkeypatch):
+    db = mongomock.MongoClient().db
+
+    monkeypatch.setenv("MONGO_INDEXES", "verify")
+    with pytest.raises(RuntimeError, match="chatHistory"):
+        ensure_indexes(db)
+
+    monkeypatch.setenv("MONGO_INDEXES", "create")
+    names = ensure_indexes(db)
+
+    assert missing_indexes(db) == {}
+    assert "created_at_-1__id_-1" in names["chatHistory"]
+    assert db.englishWritings.index_information()["content_hash_1"]["unique"] is True
+    assert len(names) == len(INDEXES)
+
+    monkeypatch.setenv("MONGO_INDEXES", "verify")
+    assert ensure_indexes(db) == names
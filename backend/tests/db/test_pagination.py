@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from tests.async_mongomock import AsyncMongomockClient
+from db.pagination import AFTER, BEFORE, KeysetCursor, fetch_ordered_page, fetch_page
+
+
+@pytest.fixture
+def chats():
+    client = mongomock.MongoClient()
+    start = datetime(2024, 1, 1)
+    # Pairs of messages saved in the same millisecond, like a question and its reply
+    client.db.chats.insert_many(
+        [{"created_at": start + timedelta(seconds=i // 2), "n": i} for i in range(25)]
+    )
+    return AsyncMongomockClient(client)["db"]["chats"]
+
+
+@pytest.mark.unit
+def test_cursors_walk_every_message_once(chats):
+    async def walk():
+        pages = []
+        docs, next_cursor, prev_cursor = await fetch_page(chats, {}, 4)
+        pages.append(docs)
+        while next_cursor:
+            # Tokens go through the client as strings
+            cursor = KeysetCursor.decode(next_cursor.encode())
+            docs, next_cursor, _ = await fetch_page(chats, {}, 4, cursor)
+            pages.append(docs)
+        return pages, prev_cursor
+
+    pages, prev_cursor = asyncio.run(walk())
+
+    seen = [doc["n"] for page in reversed(pages) for doc in page]
+    assert seen == list(range(25))
+    assert [len(page) for page in pages] == [4] * 6 + [1]
+    assert prev_cursor.direction == AFTER
+
+
+@pytest.mark.unit
+def test_after_cursor_returns_newer_messages(chats):
+    first = asyncio.run(chats.find_one({"n": 20}))
+    cursor = KeysetCursor.from_document(first, AFTER)
+
+    docs, next_cursor, prev_cursor = asyncio.run(fetch_page(chats, {}, 10, cursor))
+    assert [doc["n"] for doc in docs] == [21, 22, 23, 24]
+    assert next_cursor.id == docs[0]["_id"]
+
+    # Caught up: the same cursor can be polled again
+    empty, _, poll = asyncio.run(fetch_page(chats, {}, 10, prev_cursor))
+    assert empty == [] and poll is prev_cursor
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("direction, expected", [(BEFORE, [24, 22, 20]), (AFTER, [0, 2, 4])])
+def test_ordered_pages_keep_their_direction(chats, direction, expected):
+    query = {"n": {"$in": list(range(0, 25, 2))}}
+
+    async def walk():
+        docs, cursor = await fetch_ordered_page(
+            chats, query, 3, direction=direction, projection={"n": 1, "created_at": 1}
+        )
+        pages = [docs]
+        while cursor:
+            # The cursor, not the argument, decides the order of later pages
+            docs, cursor = await fetch_ordered_page(chats, query, 3, cursor, direction=BEFORE)
+            pages.append(docs)
+        return pages
+
+    pages = asyncio.run(walk())
+
+    seen = [doc["n"] for page in pages for doc in page]
+    assert seen[:3] == expected
+    assert sorted(seen) == list(range(0, 25, 2))
+    assert "n" in pages[0][0] and "_id" in pages[0][0] and len(pages[0][0]) == 3
+    assert len(pages[-1]) == 1
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "eyJ0IjoxfQ"])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        KeysetCursor.decode(token)
@@ -0,0 +1,103 @@
+import asyncio
+
+import mongomock
+import pytest
+
+from tests.async_mongomock import AsyncMongomockClient
+from db.rollups import (
+    aaverage_score,
+    acommon_weaknesses,
+    aget_summary,
+    arecord_chats,
+    arecord_writing,
+    average_score,
+    common_weaknesses,
+    rebuild,
+    record_chats,
+    record_writing,
+    verify,
+)
+
+
+def writing(genre, score, criteria):
+    return {
+        "title": "t",
+        "genre": genre,
+        "overall_score": score,
+        "rubric_scores": [
+            {"dimension": "d", "criteria": [{"criterion": c, "score": s} for c, s in criteria]}
+        ],
+    }
+
+
+WRITINGS = [
+    writing("narrative", 8, [("spelling", 5), ("grammar", 9)]),
+    writing("narrative", 6, [("spelling", 3), ("grammar", 6)]),
+    writing("poem", None, [("spelling", 8)]),
+]
+
+
+def save(db, doc):
+    db.englishWritings.insert_one(dict(doc))
+    record_writing(db, doc)
+
+
+@pytest.mark.unit
+def test_saves_keep_rollups_equal_to_the_raw_data():
+    client = mongomock.MongoClient()
+    db = client.db
+    for doc in WRITINGS[:2]:
+        save(db, doc)
+    db.chatHistory.insert_many([{"n": 1}, {"n": 2}])
+    record_chats(db, 2)
+
+    # The async path updates the same documents
+    async def save_async():
+        adb = AsyncMongomockClient(client)["db"]
+        await adb.englishWritings.insert_one(dict(WRITINGS[2]))
+        await arecord_writing(adb, WRITINGS[2])
+        await adb.chatHistory.insert_many([{"n": 3}, {"n": 4}])
+        await arecord_chats(adb, 2)
+        return (
+            await aget_summary(adb),
+            await aaverage_score(adb, "narrative"),
+            await acommon_weaknesses(adb),
+        )
+
+    summary, narrative_average, weaknesses = asyncio.run(save_async())
+
+    assert verify(db) == {}
+    assert summary == {"total_writings": 3, "average_score": 7.0, "total_interactions": 4}
+    assert average_score(db, "narrative") == 7.0
+    assert average_score(db, "poem") == 0.0
+    assert common_weaknesses(db) == [
+        {"_id": "spelling", "count": 2, "avg_score": 4.0},
+        {"_id": "grammar", "count": 1, "avg_score": 6.0},
+    ]
+    assert narrative_average == 7.0
+    assert weaknesses == common_weaknesses(db)
+
+
+@pytest.mark.unit
+def test_rebuild_repairs_drift():
+    db = mongomock.MongoClient().db
+    save(db, WRITINGS[0])
+    # Saved without a rollup update, e.g. the update failed
+    db.englishWritings.insert_one(dict(WRITINGS[1]))
+    db.analyticsRollups.insert_one({"_id": "genre:stale", "kind": "genre", "count": 1})
+
+    mismatches = verify(db)
+    assert set(mismatches) == {
+        "writings",
+        "genre:narrative",
+        "genre:stale",
+        "criterion:spelling",
+        "criterion:grammar",
+    }
+
+    rebuild(db)
+    rebuild(db)
+
+    assert verify(db) == {}
+    assert db.analyticsRollups.find_one({"_id": "genre:stale"}) is None
+    assert db.analyticsRollups.find_one({"_id": "writings"})["count"] == 2
@@ -0,0 +1,138 @@
+import asyncio
+import time
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from llm.admission import (
+    BACKGROUND,
+    INTERACTIVE,
+    AdmissionController,
+    AdmissionRejected,
+    admission_scope,
+)
+from llm.guarded import GuardedChatModel
+from llm.resilience import LLMTimeoutError, ResiliencePolicy
+
+
+async def hold(controller, seconds, active, peak, route="chat", priority=INTERACTIVE):
+    with admission_scope(route, priority):
+        async with controller.aslot():
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            await asyncio.sleep(seconds)
+            active[0] -= 1
+
+
+@pytest.mark.unit
+def test_global_and_route_limits():
+    controller = AdmissionController(max_concurrency=3, route_limits={"writing": 1})
+    active, peak = [0], [0]
+    writing_active, writing_peak = [0], [0]
+
+    async def scenario():
+        await asyncio.gather(
+            *(hold(controller, 0.02, active, peak) for _ in range(6)),
+            *(hold(controller, 0.02, writing_active, writing_peak, "writing") for _ in range(3)),
+        )
+
+    asyncio.run(scenario())
+
+    assert peak[0] == 3
+    assert writing_peak[0] == 1
+    assert controller.stats()["admitted"] == 9
+    assert controller.stats()["in_use"] == {}
+
+
+@pytest.mark.unit
+def test_full_queue_fails_fast_with_retry_after():
+    controller = AdmissionController(max_concurrency=1, max_queue=1)
+
+    async def scenario():
+        first = asyncio.create_task(hold(controller, 0.1, [0], [0]))
+        second = asyncio.create_task(hold(controller, 0.1, [0], [0]))
+        await asyncio.sleep(0.01)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await hold(controller, 0.1, [0], [0])
+        with pytest.raises(AdmissionRejected):
+            controller.check_capacity()
+        await asyncio.gather(first, second)
+        return rejected.value
+
+    error = asyncio.run(scenario())
+
+    assert error.reason == "queue_full"
+    assert error.retry_after >= 1
+    assert controller.stats()["rejected"]["queue_full"] == 2
+
+
+@pytest.mark.unit
+def test_interactive_calls_are_served_first_and_evict_background():
+    controller = AdmissionController(max_concurrency=1, max_queue=2)
+    order = []
+
+    async def call(name, priority):
+        with admission_scope(name, priority):
+            async with controller.aslot():
+                order.append(name)
+                await asyncio.sleep(0.02)
+
+    async def scenario():
+        running = asyncio.create_task(call("first", INTERACTIVE))
+        await asyncio.sleep(0.005)
+        background = [asyncio.create_task(call(f"bg{i}", BACKGROUND)) for i in range(2)]
+        await asyncio.sleep(0.005)
+        chat = asyncio.create_task(call("chat", INTERACTIVE))
+        return await asyncio.gather(running, *background, chat, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    # The newest background call made room for the chat, which ran next
+    assert isinstance(results[2], AdmissionRejected) and results[2].reason == "evicted"
+    assert order == ["first", "chat", "bg0"]
+
+
+@pytest.mark.unit
+def test_sync_acquire_times_out():
+    controller = AdmissionController(max_concurrency=1, queue_timeout=0.05)
+
+    with controller.slot():
+        with pytest.raises(AdmissionRejected) as rejected:
+            controller.acquire()
+
+    assert rejected.value.reason == "timeout"
+    assert controller.stats()["in_use"] == {}
+
+
+@pytest.mark.unit
+def test_guarded_model_takes_a_slot_per_call():
+    controller = AdmissionController(max_concurrency=1)
+    llm = GuardedChatModel(
+        inner=FakeListChatModel(responses=["one", "two"]), admission=controller
+    )
+
+    assert llm.invoke("hi").content == "one"
+    assert asyncio.run(llm.ainvoke("hi")).content == "two"
+    assert controller.stats()["admitted"] == 2
+
+
+@pytest.mark.unit
+def test_timed_out_sync_call_releases_its_slot():
+    class SlowChatModel(FakeListChatModel):
+        def _call(self, *args, **kwargs):
+            time.sleep(0.3)
+            return super()._call(*args, **kwargs)
+
+    controller = AdmissionController(max_concurrency=1, queue_timeout=0.05)
+    llm = GuardedChatModel(
+        inner=SlowChatModel(responses=["late"]),
+        admission=controller,
+        resilience=ResiliencePolicy(timeout=0.05, max_attempts=1),
+    )
+
+    with pytest.raises(LLMTimeoutError):
+        llm.invoke("hi")
+
+    # The abandoned thread is still running, but no longer holds the slot
+    with controller.slot():
+        pass
+    time.sleep(0.35)
+    assert controller.stats()["in_use"] == {}
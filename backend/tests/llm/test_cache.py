@@ -0,0 +1,114 @@
+import asyncio
+from typing import TypedDict
+import mongomock
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langgraph.graph import StateGraph, START, END
+from llm.cache import LLMResponseCache, refresh_config
+from workflows.utils import graph_node
+
+
+def fake_llm(cache, responses=("first", "second", "third")):
+    return FakeListChatModel(responses=list(responses), cache=cache)
+
+
+@pytest.mark.unit
+def test_repeated_prompt_is_served_from_memory():
+    cache = LLMResponseCache(persistent=False)
+    llm = fake_llm(cache)
+
+    assert llm.invoke("How am I doing overall?").content == "first"
+    assert llm.invoke("How am I doing overall?  ").content == "first"
+    assert llm.invoke("Something else").content == "second"
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["bytes_served"] > 0
+
+
+@pytest.mark.unit
+def test_key_depends_on_model_string():
+    prompt = '[{"lc": 1, "kwargs": {"content": "hi", "id": "a"}}]'
+    same = '[{"lc": 1, "kwargs": {"content": "hi ", "id": "b"}}]'
+
+    assert LLMResponseCache.make_key(prompt, "m1") == LLMResponseCache.make_key(same, "m1")
+    assert LLMResponseCache.make_key(prompt, "m1") != LLMResponseCache.make_key(prompt, "m2")
+
+
+@pytest.mark.unit
+def test_persistent_tier_is_shared_between_instances():
+    collection = mongomock.MongoClient().db.llmCache
+    worker_a = LLMResponseCache(collection=collection)
+    worker_b = LLMResponseCache(collection=collection)
+
+    assert fake_llm(worker_a).invoke("hi").content == "first"
+    # A second worker with an empty LRU gets the stored response
+    assert fake_llm(worker_b).invoke("hi").content == "first"
+    assert worker_b.stats()["persistent_hits"] == 1
+    assert worker_b.stats()["misses"] == 0
+    assert collection.count_documents({}) == 1
+
+
+@pytest.mark.unit
+def test_node_ttls_and_opt_out():
+    """Opted-out nodes always reach the model, others are cached"""
+    cache = LLMResponseCache(persistent=False, node_ttls={"creative": None})
+    llm = fake_llm(cache, ["a", "b", "c", "d"])
+
+    class State(TypedDict, total=False):
+        answer: str
+
+    def node(state):
+        return {"answer": llm.invoke("tell me something").content}
+
+    async def anode(state):
+        return {"answer": (await llm.ainvoke("tell me something")).content}
+
+    builder = StateGraph(State)
+    builder.add_node("cached", graph_node(node, anode))
+    builder.add_node("creative", graph_node(node, anode))
+    builder.add_edge(START, "cached")
+    builder.add_edge("cached", "creative")
+    builder.add_edge("creative", END)
+    graph = builder.compile()
+
+    graph.invoke({})
+    asyncio.run(graph.ainvoke({}))
+
+    stats = cache.stats()
+    assert stats["bypassed"] == 2
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+
+
+@pytest.mark.unit
+def test_refresh_run_reaches_the_model_and_replaces_the_entry():
+    """A forced re-evaluation gets a fresh answer, which later runs reuse"""
+    cache = LLMResponseCache(persistent=False)
+    llm = fake_llm(cache, ["first", "second", "third"])
+
+    class State(TypedDict, total=False):
+        answer: str
+
+    def evaluate(state):
+        return {"answer": llm.invoke("evaluate this story").content}
+
+    async def aevaluate(state):
+        return {"answer": (await llm.ainvoke("evaluate this story")).content}
+
+    builder = StateGraph(State)
+    builder.add_node("evaluate", graph_node(evaluate, aevaluate))
+    builder.add_edge(START, "evaluate")
+    builder.add_edge("evaluate", END)
+    graph = builder.compile()
+
+    assert graph.invoke({})["answer"] == "first"
+    assert graph.invoke({})["answer"] == "first"
+    assert graph.invoke({}, config=refresh_config())["answer"] == "second"
+    assert graph.invoke({})["answer"] == "second"
+    assert asyncio.run(graph.ainvoke({}, config=refresh_config()))["answer"] == "third"
+
+    stats = cache.stats()
+    assert stats["refreshed"] == 2
+    assert stats["memory_hits"] == 2
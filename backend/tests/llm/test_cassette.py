@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from llm.cassette import RECORD, REPLAY, Cassette, CassetteChatModel, CassetteMiss
+from llm.fake import FakeChatModel
+from llm.guarded import GuardedChatModel
+from workflows.writing.base_nodes import WritingClassification
+
+
+@pytest.mark.unit
+def test_record_then_replay_without_the_model(tmp_path):
+    path = tmp_path / "model.jsonl.gz"
+    recorder = GuardedChatModel(
+        inner=CassetteChatModel(cassette=Cassette(path), mode=RECORD, inner=FakeChatModel(seed=3))
+    )
+    classification = recorder.with_structured_output(WritingClassification).invoke("My cat")
+    text = asyncio.run(recorder.ainvoke("Hello")).content
+
+    player = GuardedChatModel(
+        inner=CassetteChatModel(cassette=Cassette(path), mode=REPLAY, speed=0)
+    )
+
+    assert player.with_structured_output(WritingClassification).invoke("My cat") == classification
+    assert asyncio.run(player.ainvoke("Hello")).content == text
+    assert len(Cassette(path)) == 2
+    with pytest.raises(CassetteMiss):
+        player.invoke("Never recorded")
+
+
+@pytest.mark.unit
+def test_replay_miss_falls_back_to_inner(tmp_path):
+    player = CassetteChatModel(
+        cassette=Cassette(tmp_path / "empty.jsonl.gz"), mode=REPLAY, inner=FakeChatModel()
+    )
+
+    assert player.invoke("Hello").content == FakeChatModel().invoke("Hello").content
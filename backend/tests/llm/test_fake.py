@@ -0,0 +1,61 @@
+import asyncio
+import random
+import time
+import pytest
+from langchain_core.runnables import RunnableLambda
+from llm.fake import FakeChatModel, LatencyDistribution
+from llm.guarded import GuardedChatModel
+from workflows.supervisor import TextRoute
+from workflows.writing.base_nodes import WritingClassification, WritingEvaluation
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("schema", [WritingEvaluation, WritingClassification, TextRoute])
+def test_structured_output_is_schema_valid(schema):
+    llm = GuardedChatModel(inner=FakeChatModel())
+
+    result = llm.with_structured_output(schema).invoke("Evaluate: I like my cat.")
+
+    assert isinstance(result, schema)
+    if schema is WritingEvaluation:
+        assert 1 <= result.overall_score <= 10
+        assert all(1 <= c.score <= 10 for d in result.rubric_scores for c in d.criteria)
+
+
+@pytest.mark.unit
+def test_answers_are_deterministic_per_input():
+    llm = FakeChatModel(seed=7)
+
+    first = llm.invoke("Tell me a story").content
+    assert llm.invoke("Tell me a story").content == first
+    assert asyncio.run(llm.ainvoke("Tell me a story")).content == first
+    assert llm.invoke("Something else").content != first
+    assert FakeChatModel(seed=8).invoke("Tell me a story").content != first
+
+
+@pytest.mark.unit
+def test_latency_distributions():
+    rng = random.Random(0)
+
+    assert LatencyDistribution("fixed:0.2").sample(rng) == 0.2
+    assert all(0.1 <= LatencyDistribution("uniform:0.1,0.3").sample(rng) <= 0.3 for _ in range(50))
+    samples = sorted(LatencyDistribution("lognormal:0.5,0.4").sample(rng) for _ in range(500))
+    assert 0.4 < samples[250] < 0.6
+    with pytest.raises(ValueError):
+        LatencyDistribution("gamma:1")
+
+
+@pytest.mark.unit
+def test_node_latency_is_applied():
+    llm = FakeChatModel(latency="fixed:0", node_latency={"evaluate": "fixed:0.05"})
+    # A runnable step makes its metadata visible to the calls inside it, as
+    # a LangGraph node does
+    node = RunnableLambda(lambda message: llm.invoke(message))
+
+    def call_as(name):
+        start = time.perf_counter()
+        node.invoke("hi", config={"metadata": {"langgraph_node": name}})
+        return time.perf_counter() - start
+
+    assert call_as("evaluate") >= 0.05
+    assert call_as("classify") < 0.05
@@ -0,0 +1,76 @@
+import io
+import threading
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from llm.provider import LLMProvider
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Empty model registry whose models are fakes"""
+    created = []
+
+    def fake_init_chat_model(model, model_provider=None, **params):
+        created.append((model_provider, model, params))
+        return FakeListChatModel(responses=[model])
+
+    monkeypatch.setattr("llm.provider.init_chat_model", fake_init_chat_model)
+    monkeypatch.setattr(LLMProvider, "_llmInstance", None)
+    monkeypatch.setattr(LLMProvider, "_models", {})
+    monkeypatch.setattr(LLMProvider, "_admission", None)
+    monkeypatch.setattr(LLMProvider, "_cache", None)
+    monkeypatch.setenv("GOOGLE_API_KEY", "test")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    return created
+
+
+@pytest.mark.unit
+def test_nodes_share_models_by_tier(registry):
+    router = LLMProvider.get_llm(node="supervisor_router")
+    classifier = LLMProvider.get_llm(node="WritingClassificationNode")
+    evaluator = LLMProvider.get_llm(node="EvaluationNode")
+
+    assert router is classifier
+    assert evaluator is LLMProvider.get_llm()
+    assert router is not evaluator
+    assert router.invoke("hi").content == "gemini-2.5-flash-lite"
+    assert ("google_genai", "gemini-2.5-flash-lite", {"max_retries": 0, "temperature": 0}) in registry
+    assert len(registry) == 2
+
+
+@pytest.mark.unit
+def test_node_models_and_limits_from_env(registry, monkeypatch):
+    monkeypatch.setenv("LLM_NODE_MODELS", '{"EvaluationNode": {"model": "gemini-2.5-pro"}}')
+    monkeypatch.setenv("LLM_MODEL_LIMITS", '{"gemini-2.5-pro": 2}')
+
+    evaluator = LLMProvider.get_llm(node="EvaluationNode")
+
+    assert evaluator.invoke("hi").content == "gemini-2.5-pro"
+    assert evaluator.admission_buckets == ["model:gemini-2.5-pro"]
+    assert LLMProvider.get_admission().limits["model:gemini-2.5-pro"] == 2
+
+
+@pytest.mark.unit
+def test_concurrent_lookups_create_one_model(registry):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(LLMProvider.get_llm(node="EvaluationNode")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(registry) == 1
+    assert all(llm is results[0] for llm in results)
+
+
+@pytest.mark.unit
+def test_missing_api_key_fails_instead_of_prompting(registry, monkeypatch, tmp_path):
+    monkeypatch.delenv("GOOGLE_API_KEY")
+    monkeypatch.chdir(tmp_path)  # no config.ini
+    monkeypatch.setattr("sys.stdin", io.StringIO(""))
+
+    with pytest.raises(RuntimeError, match="GOOGLE_API_KEY is not set"):
+        LLMProvider.get_llm()
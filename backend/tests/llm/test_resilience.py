@@ -0,0 +1,190 @@
+import asyncio
+import time
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from llm.errors import LLMUnavailableError
+from llm.guarded import GuardedChatModel
+from llm.resilience import (
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMTimeoutError,
+    LLMTransientError,
+    ResiliencePolicy,
+)
+
+
+class ServiceUnavailable(Exception):
+    code = 503
+
+
+def make_policy(**kwargs):
+    defaults = dict(timeout=1.0, max_attempts=3, backoff_base=0.001, backoff_max=0.01)
+    return ResiliencePolicy(**{**defaults, **kwargs})
+
+
+def flaky(failures, error=ServiceUnavailable, result="ok"):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= failures:
+            raise error("provider hiccup")
+        return result
+
+    return func, calls
+
+
+@pytest.mark.unit
+def test_transient_errors_are_retried():
+    func, calls = flaky(2)
+
+    assert make_policy().call(func) == "ok"
+    assert len(calls) == 3
+
+
+@pytest.mark.unit
+def test_exhausted_retries_raise_llm_unavailable():
+    func, calls = flaky(5)
+
+    with pytest.raises(LLMTransientError) as error:
+        make_policy().call(func)
+
+    assert len(calls) == 3
+    assert isinstance(error.value, LLMUnavailableError)
+
+
+@pytest.mark.unit
+def test_other_errors_are_not_retried():
+    func, calls = flaky(1, error=ValueError)
+
+    with pytest.raises(ValueError):
+        make_policy().call(func)
+
+    assert len(calls) == 1
+
+
+@pytest.mark.unit
+def test_slow_async_call_times_out():
+    policy = make_policy(timeout=0.02, max_attempts=2)
+
+    async def slow():
+        await asyncio.sleep(1)
+
+    started = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        asyncio.run(policy.acall(slow))
+
+    assert time.monotonic() - started < 0.5
+    assert policy.stats()["counters"]["timeouts"] == 2
+
+
+@pytest.mark.unit
+def test_circuit_opens_then_lets_a_trial_call_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    policy = make_policy(max_attempts=1, breaker=breaker)
+    func, calls = flaky(2)
+
+    for _ in range(2):
+        with pytest.raises(LLMTransientError):
+            policy.call(func)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        policy.call(func)
+    assert len(calls) == 2
+
+    time.sleep(0.06)
+    assert policy.call(func) == "ok"
+    assert breaker.stats()["state"] == "closed"
+
+
+def open_breaker(policy, breaker):
+    func, _ = flaky(breaker.failure_threshold)
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(LLMTransientError):
+            policy.call(func)
+    assert breaker.state == OPEN
+    time.sleep(breaker.reset_timeout + 0.01)
+
+
+@pytest.mark.unit
+def test_trial_call_with_other_error_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    policy = make_policy(max_attempts=1, breaker=breaker)
+    open_breaker(policy, breaker)
+
+    def bad_output():
+        raise ValueError("unparseable response")
+
+    with pytest.raises(ValueError):
+        policy.call(bad_output)
+    assert breaker.state == OPEN
+
+    # Not stuck half-open: the next trial goes through once the reset elapses
+    time.sleep(0.21)
+    assert policy.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.unit
+def test_cancelled_trial_call_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    policy = make_policy(max_attempts=1, breaker=breaker)
+    open_breaker(policy, breaker)
+
+    async def hang():
+        await asyncio.sleep(1)
+
+    async def cancel_trial():
+        task = asyncio.ensure_future(policy.acall(hang))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    assert breaker.state == OPEN
+
+    time.sleep(0.21)
+
+    async def ok():
+        return "ok"
+
+    assert asyncio.run(policy.acall(ok)) == "ok"
+
+
+@pytest.mark.unit
+def test_hedged_request_returns_the_faster_attempt():
+    policy = make_policy(hedge=True, hedge_min_samples=5)
+    for _ in range(5):
+        policy._record("evaluate", time.monotonic() - 0.01)
+    delays = iter([1.0, 0.0])
+
+    async def call():
+        delay = next(delays)
+        await asyncio.sleep(delay)
+        return delay
+
+    started = time.monotonic()
+    assert asyncio.run(policy.acall(call, "evaluate")) == 0.0
+    assert time.monotonic() - started < 0.5
+    assert policy.stats()["counters"]["hedge_wins"] == 1
+
+
+@pytest.mark.unit
+def test_guarded_model_retries_through_the_policy():
+    class FlakyChatModel(FakeListChatModel):
+        failures: int = 1
+
+        def _call(self, *args, **kwargs):
+            if self.failures:
+                self.failures -= 1
+                raise ServiceUnavailable("busy")
+            return super()._call(*args, **kwargs)
+
+    llm = GuardedChatModel(
+        inner=FlakyChatModel(responses=["hello"]), resilience=make_policy()
+    )
+
+    assert llm.invoke("hi").content == "hello"
+    assert llm.resilience.stats()["counters"]["retries"] == 1
@@ -0,0 +1,39 @@
+import pytest
+
+from scripts.explain_queries import describe, is_collscan, winning_plan
+
+
+@pytest.mark.unit
+def test_plans_are_walked_for_collection_scans():
+    indexed = {
+        "queryPlanner": {
+            "winningPlan": {
+                "stage": "LIMIT",
+                "inputStage": {
+                    "stage": "FETCH",
+                    "inputStage": {"stage": "IXSCAN", "indexName": "created_at_-1"},
+                },
+            }
+        }
+    }
+    # Slot-based engine layout, with the scan under an $or
+    scanned = {
+        "queryPlanner": {
+            "winningPlan": {
+                "queryPlan": {
+                    "stage": "SUBPLAN",
+                    "inputStage": {
+                        "stage": "OR",
+                        "inputStages": [
+                            {"stage": "IXSCAN", "indexName": "status_1"},
+                            {"stage": "COLLSCAN"},
+                        ],
+                    },
+                }
+            }
+        }
+    }
+
+    assert describe(winning_plan(indexed)) == "LIMIT > FETCH > IXSCAN(created_at_-1)"
+    assert not is_collscan(winning_plan(indexed))
+    assert is_collscan(winning_plan(scanned))
@@ -1,6 +1,8 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from bson import ObjectId
+from core.idempotency import IdempotencyStore
+from llm.admission import AdmissionRejected
 
 @pytest.mark.unit
 def test_get_chat_history_success(client, mock_mongodb):
@@ -103,4 +105,65 @@ def test_supervisor_workflow_error_handling(mock_supervisor, client, sample_chat
     response = client.post("/api/chat/message", json=sample_chat_message)
     
     assert response.status_code == 500
-    assert "Internal server error" in response.json()["detail"]
\ No newline at end of file
+    assert "Internal server error" in response.json()["detail"]
+
+@pytest.mark.unit
+@patch("main.GraphRegistry")
+def test_chat_retry_with_same_temp_id_runs_once(mock_registry, client):
+    """A retried /chat request replays the stored response"""
+
+    mock_registry.get.return_value.ainvoke = AsyncMock(
+        return_value={"AIContent": "Hi!", "userMsgId": "u1", "AIMsgId": "a1", "type": "text"}
+    )
+    body = {"tempId": "temp-1", "role": "user", "content": "Hello!", "type": "text"}
+
+    with patch("main.chat_idempotency", IdempotencyStore(persistent=False)):
+        first = client.post("/chat", json=body)
+        second = client.post("/chat", json=body)
+        reused = client.post("/chat", json={**body, "content": "Something else"})
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert first.json()["AIMsgId"] == "a1"
+    mock_registry.get.return_value.ainvoke.assert_awaited_once()
+    assert reused.status_code == 422
+
+@pytest.mark.unit
+@patch("main.GraphRegistry")
+def test_chat_overload_returns_429_with_retry_after(mock_registry, client):
+    """An LLM overload is reported as 429 so the frontend can retry later"""
+
+    mock_registry.get.return_value.ainvoke = AsyncMock(
+        side_effect=AdmissionRejected("queue_full", "chat", 7)
+    )
+    body = {"tempId": "temp-2", "role": "user", "content": "Hello!", "type": "text"}
+
+    with patch("main.chat_idempotency", IdempotencyStore(persistent=False)):
+        response = client.post("/chat", json=body)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert response.json()["detail"]["retryAfter"] == 7
+
+@pytest.mark.unit
+@patch("main.GraphRegistry")
+def test_chat_retry_is_answered_while_overloaded(mock_registry, client):
+    """A completed tempId replays its response even when capacity is exhausted"""
+
+    mock_registry.get.return_value.ainvoke = AsyncMock(
+        return_value={"AIContent": "Hi!", "userMsgId": "u1", "AIMsgId": "a1", "type": "text"}
+    )
+    body = {"tempId": "temp-3", "role": "user", "content": "Hello!", "type": "text"}
+    overloaded = AdmissionRejected("queue_full", "chat", 5)
+
+    with patch("main.chat_idempotency", IdempotencyStore(persistent=False)):
+        first = client.post("/chat", json=body)
+        with patch("main.LLMProvider.get_admission") as get_admission:
+            get_admission.return_value.check_capacity.side_effect = overloaded
+            retry = client.post("/chat", json=body)
+            fresh = client.post("/chat", json={**body, "tempId": "temp-4"})
+
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert fresh.status_code == 429
+    mock_registry.get.return_value.ainvoke.assert_awaited_once()
@@ -0,0 +1,131 @@
+import os
+import threading
+import pytest
+from llm.provider import LLMProvider
+from workflows.registry import GraphRegistry
+from workflows.utils import LazySingleton
+
+build_calls = []
+settings = LazySingleton(lambda: os.environ["DUMMY_GRAPH_SETTING"])
+
+
+def build_configured_graph():
+    """Graph that captures the shared settings and model it was built with"""
+    return {"setting": settings.get(), "llm": LLMProvider.get_llm()}
+
+
+def build_dummy_graph():
+    build_calls.append(1)
+    return object()
+
+
+@pytest.fixture
+def dummy_graph():
+    build_calls.clear()
+    GraphRegistry.register("dummy", "tests.workflows.test_registry:build_dummy_graph")
+    yield "dummy"
+    GraphRegistry._builders.pop("dummy", None)
+    GraphRegistry._graphs.pop("dummy", None)
+
+
+@pytest.mark.unit
+def test_registry_compiles_once(dummy_graph):
+    """The same compiled graph is returned on every call"""
+    first = GraphRegistry.get(dummy_graph)
+    second = GraphRegistry.get(dummy_graph)
+
+    assert first is second
+    assert len(build_calls) == 1
+
+
+@pytest.mark.unit
+def test_registry_compiles_once_across_threads(dummy_graph):
+    """Concurrent first access still compiles a single instance"""
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(GraphRegistry.get(dummy_graph)))
+        for _ in range(16)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(build_calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+@pytest.mark.unit
+def test_registry_rebuild_swaps_instance(dummy_graph):
+    """rebuild() compiles a fresh instance for subsequent callers"""
+    before = GraphRegistry.get(dummy_graph)
+    GraphRegistry.rebuild(dummy_graph)
+    after = GraphRegistry.get(dummy_graph)
+
+    assert before is not after
+    assert len(build_calls) == 2
+
+
+@pytest.fixture
+def configured_graph(monkeypatch):
+    """Registry holding only a graph built from config, with the real reset hook"""
+    monkeypatch.setattr(GraphRegistry, "_builders", {})
+    monkeypatch.setattr(GraphRegistry, "_graphs", {})
+    monkeypatch.setattr(
+        GraphRegistry, "_singletons", ["tests.workflows.test_registry:settings"]
+    )
+    monkeypatch.setattr(
+        GraphRegistry, "_reset_hooks", ["llm.provider:LLMProvider.reset"]
+    )
+    monkeypatch.setattr(LLMProvider, "_llmInstance", None)
+    monkeypatch.setattr(LLMProvider, "_models", {})
+    monkeypatch.setattr(LLMProvider, "_cache", None)
+    monkeypatch.setenv("LLM_PROVIDER_MODE", "fake")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    settings.reset()
+    GraphRegistry.register(
+        "configured", "tests.workflows.test_registry:build_configured_graph"
+    )
+    yield "configured"
+    settings.reset()
+
+
+@pytest.mark.unit
+def test_registry_rebuild_picks_up_changed_config(configured_graph, monkeypatch):
+    """A full rebuild rebuilds the shared instances and models from the new config"""
+    monkeypatch.setenv("DUMMY_GRAPH_SETTING", "before")
+    monkeypatch.setenv("LLM_TIMEOUT", "30")
+    GraphRegistry.warmup()
+    before = GraphRegistry.get(configured_graph)
+
+    monkeypatch.setenv("DUMMY_GRAPH_SETTING", "after")
+    monkeypatch.setenv("LLM_TIMEOUT", "5")
+    GraphRegistry.rebuild()
+    after = GraphRegistry.get(configured_graph)
+
+    assert before["setting"] == "before"
+    assert after["setting"] == "after"
+    assert after["llm"] is not before["llm"]
+    assert before["llm"].resilience.timeout == 30
+    assert after["llm"].resilience.timeout == 5
+
+
+@pytest.mark.unit
+def test_registry_rebuild_one_graph_keeps_shared_instances(configured_graph, monkeypatch):
+    """Rebuilding a single graph recompiles it around the existing instances"""
+    monkeypatch.setenv("DUMMY_GRAPH_SETTING", "before")
+    before = GraphRegistry.get(configured_graph)
+
+    monkeypatch.setenv("DUMMY_GRAPH_SETTING", "after")
+    GraphRegistry.rebuild(configured_graph)
+    after = GraphRegistry.get(configured_graph)
+
+    assert after is not before
+    assert after["setting"] == "before"
+    assert after["llm"] is before["llm"]
+
+
+@pytest.mark.unit
+def test_registry_unknown_graph():
+    with pytest.raises(ValueError):
+        GraphRegistry.get("does_not_exist")
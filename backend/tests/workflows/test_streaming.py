@@ -0,0 +1,100 @@
+import json
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+from workflows.streaming import ChatStreamTranslator, format_sse
+
+
+@pytest.mark.unit
+def test_translator_route_and_saved_events():
+    """Supervisor updates become route and saved events"""
+    translator = ChatStreamTranslator()
+
+    route = translator.translate((), "updates", {"route": {"route": "writing_workflow"}})
+    saved = translator.translate(
+        (), "updates", {"save_message": {"userMsgId": "u1", "AIMsgId": "a1"}}
+    )
+
+    assert route == [("route", {"route": "writing_workflow"})]
+    assert saved == [("saved", {"userMsgId": "u1", "AIMsgId": "a1"})]
+
+
+@pytest.mark.unit
+def test_translator_writing_progress_events():
+    """Writing sub-graph updates become metadata, score and writing_saved events"""
+    translator = ChatStreamTranslator()
+    ns = ("writing_workflow:abc",)
+
+    metadata = translator.translate(
+        ns, "updates", {"extract_metadata": {"genre": "narrative", "subjects": ["cats"]}}
+    )
+    score = translator.translate(
+        ns,
+        "updates",
+        {"evaluate": {"overall_score": 8, "rubric_scores": [], "feedback_student": "Nice!"}},
+    )
+    saved = translator.translate(ns, "updates", {"save": {"writingId": "w1"}})
+
+    assert metadata == [("metadata", {"genre": "narrative", "subjects": ["cats"]})]
+    assert score[0] == ("score", {"overallScore": 8, "rubricScores": []})
+    assert score[1] == ("feedback", {"delta": "Nice!"})
+    assert saved == [("writing_saved", {"writingId": "w1"})]
+
+
+@pytest.mark.unit
+def test_translator_streams_feedback_from_partial_tool_call():
+    """feedback_student is streamed out of partial structured-output arguments"""
+    translator = ChatStreamTranslator()
+    metadata = {"langgraph_node": "evaluate"}
+    pieces = ['{"overall_score": 8, "feedback_student": "Gre', "at job", '!", "feedback_parent": ""}']
+
+    deltas = []
+    for piece in pieces:
+        chunk = AIMessageChunk(
+            content="",
+            tool_call_chunks=[{"name": None, "args": piece, "id": None, "index": 0}],
+        )
+        deltas.extend(translator.translate((), "messages", (chunk, metadata)))
+
+    assert "".join(d[1]["delta"] for d in deltas) == "Great job!"
+
+    # The final node update must not repeat text that was already streamed
+    final = translator.translate(
+        (), "updates", {"evaluate": {"overall_score": 8, "feedback_student": "Great job!"}}
+    )
+    assert [e for e in final if e[0] == "feedback"] == []
+
+
+@pytest.mark.unit
+def test_translator_only_streams_answer_nodes():
+    """Routing/classification LLM output is not streamed as tokens"""
+    translator = ChatStreamTranslator()
+
+    routed = translator.translate(
+        (), "messages", (AIMessage(content="general"), {"langgraph_node": "route"})
+    )
+    answer = translator.translate(
+        ("general_workflow:x",),
+        "messages",
+        (AIMessageChunk(content="Hi"), {"langgraph_node": "ask_general_question"}),
+    )
+
+    assert routed == []
+    assert answer == [("token", {"node": "ask_general_question", "delta": "Hi"})]
+
+
+@pytest.mark.unit
+def test_translator_keeps_top_level_final_state():
+    translator = ChatStreamTranslator()
+    translator.translate(("general_workflow:x",), "values", {"AIContent": "inner"})
+    translator.translate((), "values", {"AIContent": "outer"})
+
+    assert translator.final_state == {"AIContent": "outer"}
+
+
+@pytest.mark.unit
+def test_format_sse():
+    frame = format_sse("route", {"route": "general_workflow"})
+
+    assert frame.startswith("event: route\ndata: ")
+    assert frame.endswith("\n\n")
+    assert json.loads(frame.split("data: ", 1)[1]) == {"route": "general_workflow"}
@@ -1,8 +1,35 @@
+import asyncio
+import threading
 import pytest
-from unittest.mock import Mock, patch
-from workflows.supervisor import supervisor_router, writing_workflow, general_workflow, analysis_workflow
+from unittest.mock import AsyncMock, Mock, patch
+from workflows.supervisor import (
+    analysis_workflow,
+    asupervisor_router,
+    awriting_workflow,
+    general_workflow,
+    get_supervisor_workflow,
+    supervisor_router,
+    writing_workflow,
+)
+from workflows.text_router import TextRouteClassifier
 from workflows.states import SupervisorState
 from db.constants import ChatHistoryType, ChatHistoryFormType
+from llm.cache import refresh_config
+
+
+@pytest.fixture
+def writing_db():
+    """Writing store without recently evaluated duplicates"""
+    with patch("workflows.supervisor._supervisor_workflow.writing_db") as mock_db:
+        mock_db.find_duplicate.return_value = None
+        mock_db.afind_duplicate = AsyncMock(return_value=None)
+
+        async def evaluate_once(title, text, evaluate):
+            return await evaluate(), False
+
+        mock_db.aevaluate_once = evaluate_once
+        yield mock_db
+
 
 @pytest.mark.unit
 def test_supervisor_router_form_writing():
@@ -60,7 +87,7 @@ def test_supervisor_router_text_general(mock_llm):
 
 @pytest.mark.unit
 @patch('workflows.workflow_writing.build_writing_workflow')
-def test_writing_workflow_execution(mock_build_workflow):
+def test_writing_workflow_execution(mock_build_workflow, writing_db):
     """Test writing workflow execution"""
     # Mock the writing workflow
     mock_workflow = Mock()
@@ -154,4 +181,146 @@ def test_save_message_to_db(mock_mongodb):
     
     assert result["userMsgId"] == str(mock_user_id)
     assert result["AIMsgId"] == str(mock_ai_id)
-    assert mock_mongodb.__getitem__.return_value.insert_one.call_count == 2
\ No newline at end of file
+    assert mock_mongodb.__getitem__.return_value.insert_one.call_count == 2
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_async_supervisor_router_text_general():
+    """Async router classifies text with llm.ainvoke"""
+    with patch.object(get_supervisor_workflow(), "llm") as mock_llm:
+        mock_llm.ainvoke = AsyncMock(return_value=Mock(content="general"))
+        state = SupervisorState(
+            type=ChatHistoryType.TEXT, userContent="Why is the sky blue?"
+        )
+
+        result = await asupervisor_router(state)
+
+    assert result == "general_workflow"
+    mock_llm.ainvoke.assert_awaited_once()
+    mock_llm.invoke.assert_not_called()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+@patch("workflows.supervisor.GraphRegistry")
+async def test_async_writing_workflow_execution(mock_registry, writing_db):
+    """Async writing node awaits the writing sub-graph"""
+
+    mock_registry.get.return_value.ainvoke = AsyncMock(
+        return_value={
+            "overall_score": 8,
+            "writingId": "test_id",
+            "feedback_student": "Great story!",
+        }
+    )
+    state = SupervisorState(
+        type=ChatHistoryType.FORM,
+        formType=ChatHistoryFormType.WRITING,
+        userContent="",
+        payload={"title": "Test Story", "text": "This is a test story."},
+    )
+
+    result = await awriting_workflow(state)
+
+    mock_registry.get.assert_called_with("writing")
+    assert result["workflowResult"]["overallScore"] == 8
+    assert result["workflowResult"]["writingId"] == "test_id"
+
+
+@pytest.mark.unit
+@patch("workflows.supervisor.GraphRegistry")
+def test_duplicate_writing_skips_evaluation(mock_registry, writing_db):
+    """A recent identical submission is answered from the stored evaluation"""
+    writing_db.find_duplicate.return_value = {
+        "_id": "existing_id",
+        "overall_score": 7,
+        "feedback_student": "Well done!",
+    }
+    state = SupervisorState(
+        type=ChatHistoryType.FORM,
+        formType=ChatHistoryFormType.WRITING,
+        userContent="",
+        payload={"title": "Test Story", "text": "This is a test story."},
+    )
+
+    result = writing_workflow(state)
+
+    mock_registry.get.assert_not_called()
+    assert result["workflowResult"] == {
+        "overallScore": 7,
+        "writingId": "existing_id",
+        "feedback": "Well done!",
+        "duplicate": True,
+    }
+
+
+@pytest.mark.unit
+@patch("workflows.supervisor.GraphRegistry")
+def test_forced_writing_is_reevaluated(mock_registry, writing_db):
+    mock_registry.get.return_value.invoke.return_value = {"writingId": "new_id"}
+    state = SupervisorState(
+        type=ChatHistoryType.FORM,
+        formType=ChatHistoryFormType.WRITING,
+        userContent="",
+        payload={"title": "Test Story", "text": "This is a test story.", "force": True},
+    )
+
+    result = writing_workflow(state)
+
+    writing_db.find_duplicate.assert_not_called()
+    call = mock_registry.get.return_value.invoke.call_args
+    assert call.args[0]["force"] is True
+    # The LLM response cache is bypassed, so the evaluation reaches the model
+    assert call.kwargs["config"] == refresh_config()
+    assert result["workflowResult"]["writingId"] == "new_id"
+
+
+@pytest.fixture
+def shadowed_supervisor():
+    """Supervisor whose text classifier shadow-checks every local decision"""
+    supervisor = get_supervisor_workflow()
+    classifier = TextRouteClassifier(model=None, shadow_rate=1.0)
+    with patch.object(supervisor, "text_classifier", classifier):
+        yield supervisor, classifier
+
+
+@pytest.mark.unit
+def test_shadow_check_does_not_delay_the_route(shadowed_supervisor):
+    """A locally routed message returns before its shadow LLM call finishes"""
+    supervisor, classifier = shadowed_supervisor
+    release, recorded = threading.Event(), threading.Event()
+
+    def slow_route(user_content):
+        release.wait(5)
+        return "analysis_workflow", None
+
+    def record(local_label, llm_label):
+        recorded.set()
+
+    with patch.object(supervisor, "llm_route", side_effect=slow_route), \
+            patch.object(classifier, "record_shadow", side_effect=record):
+        route, source, _ = supervisor.route_text("How did I do?")
+        assert (route, source) == ("analysis_workflow", "rule")
+        assert not recorded.is_set()
+        release.set()
+        assert recorded.wait(5)
+
+
+@pytest.mark.unit
+def test_async_shadow_check_runs_after_the_route(shadowed_supervisor):
+    """The async shadow call runs as a task; a failing one is not counted"""
+    supervisor, classifier = shadowed_supervisor
+
+    async def scenario():
+        with patch.object(supervisor, "allm_route", AsyncMock(side_effect=RuntimeError("down"))):
+            route, source, _ = await supervisor.aroute_text("How did I do?")
+            assert (route, source) == ("analysis_workflow", "rule")
+            await asyncio.gather(*supervisor._shadow_tasks)
+        with patch.object(supervisor, "allm_route", AsyncMock(return_value=("general_workflow", None))):
+            await supervisor.aroute_text("How did I do?")
+            await asyncio.gather(*supervisor._shadow_tasks)
+
+    asyncio.run(scenario())
+    stats = classifier.stats()
+    assert stats["shadow_checked"] == 1
+    assert stats["shadow_accuracy"] == 0.0
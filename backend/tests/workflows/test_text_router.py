@@ -0,0 +1,187 @@
+import pytest
+from unittest.mock import Mock, patch
+from db.constants import ChatHistoryType
+from workflows.text_router import (
+    GENERAL,
+    SYSTEM_RELATED,
+    TextRouteClassifier,
+    TfidfLogisticModel,
+    evaluate,
+)
+from workflows.supervisor import TextRoute
+
+TRAINING = [
+    ("how is my writing going", SYSTEM_RELATED),
+    ("what score did my story get", SYSTEM_RELATED),
+    ("help me get better at spelling", SYSTEM_RELATED),
+    ("did my essay get better", SYSTEM_RELATED),
+    ("why do cats purr", GENERAL),
+    ("what is the biggest dinosaur", GENERAL),
+    ("how many legs does a spider have", GENERAL),
+    ("what do dinosaurs eat", GENERAL),
+]
+
+
+def trained_model():
+    return TfidfLogisticModel.train(
+        [t for t, _ in TRAINING], [1 if l == SYSTEM_RELATED else 0 for _, l in TRAINING]
+    )
+
+
+@pytest.mark.unit
+def test_rules_decide_clear_cases():
+    classifier = TextRouteClassifier(model=None, threshold=0.85)
+
+    assert classifier.classify("How can I improve my writing?") == (SYSTEM_RELATED, "rule")
+    assert classifier.classify("Hello!") == (GENERAL, "rule")
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "text",
+    [
+        "tell me the story of the three little pigs",
+        "what's the score of the football game",
+        "how can I improve at basketball",
+        "what are the strengths of a lion",
+    ],
+)
+def test_everyday_keyword_use_is_not_decided_by_rules(text):
+    classifier = TextRouteClassifier(model=None, threshold=0.85)
+
+    assert classifier.classify(text) is None
+
+
+@pytest.mark.unit
+def test_rules_are_right_on_the_labelled_samples():
+    from pathlib import Path
+    from scripts.text_router import load_jsonl
+
+    samples = load_jsonl(Path(__file__).parents[2] / "scripts" / "text_router_samples.jsonl")
+    result = evaluate(TextRouteClassifier(model=None, threshold=0.85), samples)
+
+    assert result["accuracy_on_covered"] == 1.0
+    assert result["coverage"] > 0.5
+
+
+@pytest.mark.unit
+def test_unsure_messages_fall_back_to_llm():
+    classifier = TextRouteClassifier(model=None, threshold=0.85)
+
+    assert classifier.classify("why is the sky blue") is None
+    stats = classifier.stats()
+    assert stats["llm_fallbacks"] == 1
+    assert stats["hit_rate"] == 0.0
+
+
+@pytest.mark.unit
+def test_model_separates_training_data_and_round_trips(tmp_path):
+    model = trained_model()
+    path = tmp_path / "model.json"
+    model.save(str(path))
+    loaded = TfidfLogisticModel.load(str(path))
+
+    assert loaded.predict_proba("how is my writing going") > 0.5
+    assert loaded.predict_proba("what do dinosaurs eat") < 0.5
+
+
+@pytest.mark.unit
+def test_evaluate_reports_coverage_and_accuracy():
+    classifier = TextRouteClassifier(model=trained_model(), threshold=0.5, use_rules=False)
+
+    result = evaluate(classifier, TRAINING)
+
+    assert result["samples"] == len(TRAINING)
+    assert result["coverage"] == 1.0
+    assert result["accuracy_on_covered"] == 1.0
+
+
+@pytest.mark.unit
+def test_shadow_checks_count_agreement():
+    classifier = TextRouteClassifier(model=None, shadow_rate=1.0)
+    classifier.record_shadow("analysis_workflow", "analysis_workflow")
+    classifier.record_shadow("analysis_workflow", "general_workflow")
+
+    stats = classifier.stats()
+    assert classifier.sample_shadow() is True
+    assert stats["shadow_checked"] == 2
+    assert stats["shadow_accuracy"] == 0.5
+
+
+@pytest.mark.unit
+def test_supervisor_skips_llm_for_confident_messages():
+    """A rule hit routes without calling the routing LLM"""
+    from workflows.supervisor import _supervisor_workflow
+
+    with patch.object(_supervisor_workflow, "llm") as mock_llm, patch.object(
+        _supervisor_workflow, "text_classifier", TextRouteClassifier(model=None)
+    ):
+        route, source, analysis_type = _supervisor_workflow.route_text(
+            "How can I improve my writing?"
+        )
+
+    assert (route, source, analysis_type) == ("analysis_workflow", "rule", None)
+    mock_llm.invoke.assert_not_called()
+    mock_llm.with_structured_output.assert_not_called()
+
+
+@pytest.mark.unit
+def test_supervisor_falls_back_to_llm_when_unsure():
+    from workflows.supervisor import _supervisor_workflow
+
+    with patch.object(_supervisor_workflow, "llm") as mock_llm, patch.object(
+        _supervisor_workflow, "text_classifier", TextRouteClassifier(model=None)
+    ):
+        mock_llm.with_structured_output.return_value.invoke.return_value = TextRoute(
+            category="general"
+        )
+        route, source, analysis_type = _supervisor_workflow.route_text("why is the sky blue")
+
+    assert (route, source, analysis_type) == ("general_workflow", "llm", None)
+    mock_llm.with_structured_output.return_value.invoke.assert_called_once()
+    mock_llm.invoke.assert_not_called()
+
+
+@pytest.mark.unit
+def test_supervisor_llm_route_includes_analysis_type():
+    """One LLM call picks both the workflow and the analysis sub-type"""
+    from workflows.supervisor import _supervisor_workflow
+
+    with patch.object(_supervisor_workflow, "llm") as mock_llm, patch.object(
+        _supervisor_workflow, "text_classifier", TextRouteClassifier(model=None)
+    ):
+        mock_llm.with_structured_output.return_value.invoke.return_value = TextRoute(
+            category="system_related", analysis_type="Data Query"
+        )
+        update = _supervisor_workflow.resolve_route(
+            {"type": ChatHistoryType.TEXT, "userContent": "can you look that up for me"}
+        )
+
+    assert update == {
+        "route": "analysis_workflow",
+        "routeSource": "llm",
+        "analysisType": "Data Query",
+    }
+
+
+@pytest.mark.unit
+def test_supervisor_llm_route_falls_back_to_plain_classification():
+    from workflows.supervisor import _supervisor_workflow
+
+    with patch.object(_supervisor_workflow, "llm") as mock_llm, patch.object(
+        _supervisor_workflow, "text_classifier", TextRouteClassifier(model=None)
+    ):
+        mock_llm.with_structured_output.side_effect = ValueError("no tool calling")
+        mock_llm.invoke.return_value = Mock(content="system_related")
+        result = _supervisor_workflow.route_text("why is the sky blue")
+
+    assert result == ("analysis_workflow", "llm", None)
+
+
+@pytest.mark.unit
+def test_analysis_entry_skips_classification_when_type_known():
+    from workflows.workflow_analysis import route_analysis_entry
+
+    assert route_analysis_entry({"analysis_type": "Learning Advice"}) == "learning_advice"
+    assert route_analysis_entry({"analysis_type": "General"}) == "general_response"
+    assert route_analysis_entry({"analysis_type": ""}) == "classify"
@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+from workflows.utils import LazySingleton
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.mark.unit
+def test_lazy_singleton_builds_once_across_threads():
+    built = []
+
+    def factory():
+        time.sleep(0.01)
+        built.append(object())
+        return built[-1]
+
+    lazy = LazySingleton(factory)
+    assert not lazy.ready
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lazy.get())) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(built) == 1
+    assert all(r is built[0] for r in results)
+    lazy.reset()
+    assert lazy.get() is not built[0]
+
+
+@pytest.mark.unit
+def test_importing_the_app_creates_no_llm_or_mongo_client():
+    """No API key and no terminal: importing must neither prompt nor connect"""
+    env = {k: v for k, v in os.environ.items() if k != "GOOGLE_API_KEY"}
+    script = (
+        "import main\n"
+        "from db.client import MongoDBClient\n"
+        "from llm.provider import LLMProvider\n"
+        "from workflows import supervisor, workflow_general, workflow_writing\n"
+        "assert MongoDBClient._client is None and not LLMProvider._models\n"
+        "assert not supervisor._supervisor.ready and not workflow_writing._writing.ready\n"
+        "assert not workflow_general._general.ready\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
@@ -0,0 +1,59 @@
+import asyncio
+
+import mongomock
+import pytest
+from unittest.mock import MagicMock, patch
+from tests.async_mongomock import AsyncMongomockClient
+from db.rollups import rebuild
+from workflows.workflow_analysis import AnalysisWorkflow
+
+QUESTIONS = {
+    "macro_analysis": "How am I doing overall? What should I improve?",
+    "single_analysis": "How was my last story?",
+    "learning_advice": "What should I practice?",
+    "data_query": "Which genre do I write most?",
+}
+
+
+@pytest.fixture
+def workflow():
+    """AnalysisWorkflow over one in-memory database; the sync client is unreachable"""
+    client = mongomock.MongoClient()
+    client.db.englishWritings.insert_one(
+        {
+            "title": "My Cat",
+            "genre": "narrative",
+            "overall_score": 6,
+            "feedback_student": "Nice!",
+            "rubric_scores": [
+                {
+                    "dimension": "Conventions",
+                    "criteria": [{"criterion": "spelling", "score": 4, "reason": "typos"}],
+                }
+            ],
+        }
+    )
+    rebuild(client.db)
+    with patch("workflows.writing.tools.MongoDBClient") as mongo, patch(
+        "workflows.workflow_analysis.LLMProvider"
+    ):
+        mongo.get_db.return_value = client.db
+        mongo.get_async_db.return_value = AsyncMongomockClient(client)["db"]
+        workflow = AnalysisWorkflow()
+        yield workflow, client
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("analysis", sorted(QUESTIONS))
+def test_async_data_gathering_matches_sync(workflow, analysis):
+    workflow, client = workflow
+    question = QUESTIONS[analysis]
+    expected = getattr(workflow, f"_prepare_{analysis}")(question)
+
+    # The async path reads through the async client only
+    sync_db = MagicMock()
+    sync_db.__getitem__.side_effect = AssertionError("sync client used")
+    workflow.db_manager.mongodb = workflow.analysis_tools.db.mongodb = sync_db
+    actual = asyncio.run(getattr(workflow, f"_aprepare_{analysis}")(question))
+
+    assert actual == expected
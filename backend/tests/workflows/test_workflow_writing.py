@@ -0,0 +1,179 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from core.idempotency import IdempotencyStore
+from workflows.workflow_writing import build_writing_workflow, get_writing_workflow
+from workflows.writing.tools import WritingDatabaseManager
+
+LLM_DELAY = 0.2
+
+
+def slow_classification(state):
+    time.sleep(LLM_DELAY)
+    return {"genre": "narrative", "subjects": ["cats"]}
+
+
+def slow_evaluation(state):
+    time.sleep(LLM_DELAY)
+    assert state.get("criteria") == "rubric"
+    return {"overall_score": 8, "feedback_student": "Nice!"}
+
+
+async def aslow_classification(state):
+    await asyncio.sleep(LLM_DELAY)
+    return {"genre": "narrative", "subjects": ["cats"]}
+
+
+async def aslow_evaluation(state):
+    await asyncio.sleep(LLM_DELAY)
+    assert state.get("criteria") == "rubric"
+    return {"overall_score": 8, "feedback_student": "Nice!"}
+
+
+@pytest.fixture
+def writing_workflow():
+    """Shared WritingWorkflow, built on first use rather than at collection"""
+    return get_writing_workflow()
+
+
+@pytest.fixture
+def fake_nodes(writing_workflow):
+    """Replace LLM and database work with fixed-latency fakes"""
+    with patch.object(
+        writing_workflow.classification_node, "execute", slow_classification
+    ), patch.object(
+        writing_workflow.classification_node, "aexecute", aslow_classification
+    ), patch.object(
+        writing_workflow.evaluation_node, "execute", slow_evaluation
+    ), patch.object(
+        writing_workflow.evaluation_node, "aexecute", aslow_evaluation
+    ), patch.object(
+        writing_workflow.db_manager, "execute", return_value="rubric"
+    ), patch.object(
+        writing_workflow.db_manager, "aexecute", AsyncMock(return_value="rubric")
+    ), patch.object(
+        writing_workflow.database_save_node, "execute", return_value={"writingId": "w1"}
+    ), patch.object(
+        writing_workflow.database_save_node, "aexecute", AsyncMock(return_value={"writingId": "w1"})
+    ), patch.object(
+        WritingDatabaseManager, "_evaluations", IdempotencyStore(ttl=60, persistent=False)
+    ):
+        yield
+
+
+@pytest.mark.unit
+def test_writing_workflow_runs_llm_calls_in_parallel(fake_nodes):
+    """Classification and evaluation overlap; save sees both results"""
+    graph = build_writing_workflow()
+
+    start = time.perf_counter()
+    result = asyncio.run(graph.ainvoke({"title": "My cat", "text": "I like my cat."}))
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2 * LLM_DELAY
+    assert result["genre"] == "narrative"
+    assert result["overall_score"] == 8
+    assert result["writingId"] == "w1"
+    assert set(result["node_timings"]) == {
+        "extract_metadata",
+        "fetch_criteria",
+        "evaluate",
+        "save",
+        "respond",
+    }
+    assert result["node_timings"]["evaluate"] >= LLM_DELAY * 1000
+
+
+@pytest.mark.unit
+def test_writing_workflow_sync_invoke_runs_in_parallel(fake_nodes):
+    graph = build_writing_workflow()
+
+    start = time.perf_counter()
+    result = graph.invoke({"title": "My cat", "text": "I like my cat."})
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 2 * LLM_DELAY
+    assert result["writingId"] == "w1"
+    assert result["node_timings"]["extract_metadata"] >= LLM_DELAY * 1000
+
+
+@pytest.mark.unit
+def test_evaluate_writing_job_reports_each_node(fake_nodes, writing_workflow):
+    from workflows.workflow_writing import evaluate_writing_job
+
+    reported = []
+
+    async def report(node, update):
+        reported.append(node)
+
+    # A fresh graph, in case an earlier test registered a mock one
+    with patch.object(
+        writing_workflow.db_manager, "afind_duplicate", AsyncMock(return_value=None)
+    ), patch("workflows.registry.GraphRegistry.get", return_value=build_writing_workflow()):
+        result = asyncio.run(
+            evaluate_writing_job({"title": "My cat", "text": "I like my cat."}, report)
+        )
+
+    assert reported[0] == "fetch_criteria"
+    assert set(reported) == {"fetch_criteria", "extract_metadata", "evaluate", "save", "respond"}
+    assert result["writingId"] == "w1"
+    assert result["overallScore"] == 8
+    assert result["duplicate"] is False
+
+
+@pytest.mark.unit
+def test_forced_job_bypasses_the_llm_cache(fake_nodes, writing_workflow):
+    """LLM calls of a forced re-evaluation run without cached responses"""
+    from llm.cache import LLMResponseCache
+    from workflows.workflow_writing import evaluate_writing_job
+
+    refreshed = []
+
+    async def evaluation(state):
+        refreshed.append(LLMResponseCache.refresh_requested())
+        return await aslow_evaluation(state)
+
+    async def report(node, update):
+        pass
+
+    with patch.object(writing_workflow.evaluation_node, "aexecute", evaluation), patch(
+        "workflows.registry.GraphRegistry.get", return_value=build_writing_workflow()
+    ):
+        job = {"title": "My cat", "text": "I like my cat.", "force": True}
+        asyncio.run(evaluate_writing_job(job, report))
+
+    assert refreshed == [True]
+
+
+@pytest.mark.unit
+def test_identical_jobs_share_one_evaluation(fake_nodes, writing_workflow):
+    """A job for content already being evaluated gets that evaluation's writing"""
+    from workflows.workflow_writing import evaluate_writing_job
+
+    evaluations = []
+
+    async def evaluation(state):
+        evaluations.append(1)
+        return await aslow_evaluation(state)
+
+    async def report(node, update):
+        pass
+
+    async def run():
+        job = {"title": "My cat", "text": "I like my cat."}
+        return await asyncio.gather(
+            evaluate_writing_job(job, report), evaluate_writing_job(job, report)
+        )
+
+    with patch.object(writing_workflow.evaluation_node, "aexecute", evaluation), patch.object(
+        writing_workflow.db_manager, "afind_duplicate", AsyncMock(return_value=None)
+    ), patch("workflows.registry.GraphRegistry.get", return_value=build_writing_workflow()):
+        first, second = asyncio.run(run())
+
+    assert len(evaluations) == 1
+    assert first["duplicate"] is False
+    assert second["duplicate"] is True
+    assert second["writingId"] == first["writingId"] == "w1"
+    assert second["overallScore"] == first["overallScore"] == 8
+    assert second["feedback"] == "Nice!"
@@ -0,0 +1,118 @@
+import asyncio
+
+import mongomock
+import pytest
+from unittest.mock import patch
+from core.idempotency import IdempotencyStore
+from db.models import EnglishWriting
+from tests.async_mongomock import AsyncMongomockClient
+from workflows.writing.tools import WritingDatabaseManager
+
+
+@pytest.fixture
+def db_manager():
+    with patch("workflows.writing.tools.MongoDBClient") as mock_client:
+        client = mongomock.MongoClient()
+        mock_client.get_db.return_value = client.db
+        # Async methods see the same in-memory collections
+        mock_client.get_async_db.return_value = AsyncMongomockClient(client)["db"]
+        WritingDatabaseManager._indexes_ready = False
+        with patch.object(
+            WritingDatabaseManager, "_evaluations", IdempotencyStore(ttl=60, persistent=False)
+        ):
+            yield WritingDatabaseManager()
+    WritingDatabaseManager._indexes_ready = False
+
+
+def writing_state(**extra):
+    return {"title": "My Cat", "text": "I like my cat.", "overall_score": 8, **extra}
+
+
+@pytest.mark.unit
+def test_content_hash_ignores_whitespace_but_not_case():
+    base = EnglishWriting.compute_content_hash("My Cat", "I like my cat.")
+
+    assert EnglishWriting.compute_content_hash(" My Cat ", "I like\r\n my  cat.\n") == base
+    assert EnglishWriting.compute_content_hash("My Cat", "i like my cat.") != base
+
+
+@pytest.mark.unit
+def test_find_duplicate_within_window(db_manager, monkeypatch):
+    writing_id = db_manager.save_writing(writing_state())["writingId"]
+
+    assert str(db_manager.find_duplicate("My Cat", " I like my cat. ")["_id"]) == writing_id
+
+    monkeypatch.setenv("WRITING_DEDUP_WINDOW_SECONDS", "0")
+    assert db_manager.find_duplicate("My Cat", "I like my cat.") is None
+
+
+@pytest.mark.unit
+def test_concurrent_duplicate_save_returns_first_writing(db_manager):
+    first = db_manager.save_writing(writing_state(feedback_student="Nice!"))
+    second = db_manager.save_writing(writing_state(overall_score=5, feedback_student="Hmm."))
+
+    # The losing run reports the stored evaluation, not its own
+    assert second["writingId"] == first["writingId"]
+    assert second["overall_score"] == 8
+    assert second["feedback_student"] == "Nice!"
+    assert db_manager.mongodb.englishWritings.count_documents({}) == 1
+
+
+@pytest.mark.unit
+def test_forced_save_keeps_history(db_manager):
+    first = db_manager.save_writing(writing_state())["writingId"]
+    second = db_manager.save_writing(writing_state(overall_score=9, force=True))["writingId"]
+
+    collection = db_manager.mongodb.englishWritings
+    assert second != first
+    assert collection.count_documents({}) == 2
+    # Only the latest evaluation carries the hash
+    assert str(collection.find_one({"content_hash": {"$exists": True}})["_id"]) == second
+
+
+@pytest.mark.unit
+def test_async_methods_match_sync(db_manager):
+    db_manager.mongodb.writingCriteria.insert_one({"dimension": "Ideas", "criteria": "Clear topic"})
+    WritingDatabaseManager._criteria = None
+
+    async def run():
+        first = await db_manager.asave_writing(writing_state())
+        second = await db_manager.asave_writing(writing_state(overall_score=5))
+        duplicate = await db_manager.afind_duplicate("My Cat", "I like my cat.")
+        criteria = await db_manager.aget_writing_criteria()
+        return first, second, duplicate, criteria
+
+    first, second, duplicate, criteria = asyncio.run(run())
+    WritingDatabaseManager._criteria = None
+
+    assert second == {**first, **db_manager._stored_evaluation(duplicate)}
+    assert second["overall_score"] == 8
+    assert str(duplicate["_id"]) == first["writingId"]
+    assert db_manager.find_duplicate("My Cat", "I like my cat.")["_id"] == duplicate["_id"]
+    assert criteria == {"dimensions": [{"dimension": "Ideas", "criteria": [{"criteria": "Clear topic"}]}]}
+
+
+@pytest.mark.unit
+def test_evaluate_once_runs_identical_submissions_once(db_manager):
+    """A submission arriving while the same content is evaluated awaits that evaluation"""
+    calls = []
+
+    async def evaluate():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"writingId": "w1", "overall_score": 8, "feedback_student": "Nice!"}
+
+    async def run():
+        return await asyncio.gather(
+            db_manager.aevaluate_once("My Cat", "I like my cat.", evaluate),
+            db_manager.aevaluate_once("My Cat", " I like my cat.", evaluate),
+        )
+
+    (first, first_duplicate), (second, second_duplicate) = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert (first_duplicate, second_duplicate) == (False, True)
+    assert first["writingId"] == "w1"
+    assert second["_id"] == "w1"
+    assert second["overall_score"] == 8
+    assert second["feedback_student"] == "Nice!"
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any, TypeVar, Generic
 
@@ -16,6 +17,10 @@ class BaseWorkflowNode(ABC, Generic[StateType]):
         """Execute the node logic with strongly typed state"""
         pass
 
+    async def aexecute(self, state: StateType) -> Dict[str, Any]:
+        """Async node logic; defaults to running execute() in a worker thread"""
+        return await asyncio.to_thread(self.execute, state)
+
 class BaseWorkflowTool(ABC):
     """Base class for workflow tools that can be used across different workflows"""
     
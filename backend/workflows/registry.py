@@ -0,0 +1,141 @@
+import functools
+import importlib
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+
+class GraphRegistry:
+    """
+    Process-wide registry of compiled LangGraph workflows.
+
+    Each graph is built and compiled once, on first use or during startup warmup,
+    and the same compiled runnable is handed out to every request afterwards.
+    Compiled graphs without a checkpointer keep no per-run state, so a single
+    instance can be shared safely between threads and asyncio tasks.
+
+    Builders are referenced by "module:function" path and resolved lazily, which
+    keeps this module free of import cycles with the workflows it builds.
+
+    A full rebuild (after a config reload) also drops the shared workflow
+    instances and runs the reset hooks (by default, LLMProvider.reset), so the
+    new graphs get LLM clients and handles built from the current config.
+
+    Usage:
+        graph = GraphRegistry.get("supervisor")
+        GraphRegistry.warmup()      # compile everything at startup
+        GraphRegistry.rebuild()     # recompile after a config reload
+    """
+
+    _builders: Dict[str, str] = {
+        "supervisor": "workflows.supervisor:build_supervisor",
+        "writing": "workflows.workflow_writing:build_writing_workflow",
+        "analysis": "workflows.workflow_analysis:build_analysis_workflow",
+        "general": "workflows.workflow_general:build_general_workflow",
+    }
+    # Shared workflow instances (LLM and MongoDB handles, LazySingleton):
+    # built during warmup, dropped by a full rebuild
+    _singletons: List[str] = [
+        "workflows.supervisor:_supervisor",
+        "workflows.workflow_writing:_writing",
+        "workflows.workflow_general:_general",
+    ]
+    # Called by a full rebuild before the singletons are dropped
+    _reset_hooks: List[str] = ["llm.provider:LLMProvider.reset"]
+    _graphs: Dict[str, Any] = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def register(cls, name: str, builder: str):
+        """Register (or replace) the builder path for a named graph"""
+        with cls._lock:
+            cls._builders[name] = builder
+            cls._graphs.pop(name, None)
+
+    @classmethod
+    def add_reset_hook(cls, hook: str):
+        """Run the callable at "module:attribute" on every full rebuild"""
+        with cls._lock:
+            if hook not in cls._reset_hooks:
+                cls._reset_hooks.append(hook)
+
+    @classmethod
+    def _resolve_builder(cls, name: str) -> Callable[[], Any]:
+        if name not in cls._builders:
+            raise ValueError(f"Unknown graph: {name}")
+        return cls._resolve(cls._builders[name])
+
+    @classmethod
+    def _build(cls, name: str):
+        graph = cls._resolve_builder(name)()
+        # The root run of every invocation is named after the graph, which is
+        # how metrics and traces tell the graphs apart
+        if hasattr(graph, "name"):
+            graph.name = name
+        return graph
+
+    @classmethod
+    def names(cls) -> List[str]:
+        return list(cls._builders.keys())
+
+    @classmethod
+    def get(cls, name: str):
+        """Return the compiled graph for ``name``, compiling it on first use"""
+        graph = cls._graphs.get(name)
+        if graph is not None:
+            return graph
+
+        with cls._lock:
+            # Another thread may have compiled it while we waited for the lock
+            graph = cls._graphs.get(name)
+            if graph is None:
+                graph = cls._build(name)
+                cls._graphs[name] = graph
+        return graph
+
+    @staticmethod
+    def _resolve(path: str) -> Any:
+        module_path, attribute = path.split(":")
+        return functools.reduce(
+            getattr, attribute.split("."), importlib.import_module(module_path)
+        )
+
+    @classmethod
+    def warmup(cls) -> List[str]:
+        """
+        Compile every registered graph that is not compiled yet and build the
+        shared workflow instances, so the first request pays for neither
+        """
+        names = list(cls._builders.keys())
+        for name in names:
+            cls.get(name)
+        for path in cls._singletons:
+            cls._resolve(path).get()
+        return names
+
+    @classmethod
+    def rebuild(cls, name: Optional[str] = None) -> List[str]:
+        """
+        Recompile one graph (or all of them) and swap in the new instances.
+
+        Rebuilding all of them is the config reload: the reset hooks run and
+        the shared workflow instances are dropped first, so models, clients
+        and settings are created again from the current configuration.
+        Requests already running keep the graph (and objects) they started
+        with; new requests pick up the rebuilt ones.
+        """
+        names = [name] if name else list(cls._builders.keys())
+        with cls._lock:
+            if name is None:
+                for hook in cls._reset_hooks:
+                    cls._resolve(hook)()
+                for path in cls._singletons:
+                    cls._resolve(path).reset()
+            rebuilt = {n: cls._build(n) for n in names}
+            cls._graphs.update(rebuilt)
+        return names
+
+    @classmethod
+    def clear(cls):
+        """Drop all compiled graphs; they are rebuilt lazily on next access"""
+        with cls._lock:
+            cls._graphs.clear()
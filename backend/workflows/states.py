@@ -1,9 +1,14 @@
-from typing import Annotated, List, Optional, TypedDict
+from typing import Annotated, Dict, List, Optional, TypedDict
 from db.constants import ChatHistoryType, ChatHistoryFormType
 from langchain_core.messages import AnyMessage
 from langgraph.graph.message import add_messages
 
 
+def merge_timings(left: Dict[str, float], right: Dict[str, float]) -> Dict[str, float]:
+    """Reducer for per-node timings written by nodes running in parallel"""
+    return {**(left or {}), **(right or {})}
+
+
 class SupervisorState(TypedDict, total=False):
     """Supervisor workflow state for routing user requests to appropriate workflows.
     
@@ -16,6 +21,9 @@ class SupervisorState(TypedDict, total=False):
     - userMsgId: str - Unique identifier for the user message
     - AIMsgId: str - Unique identifier for the AI message
     - workflowResult: dict - Results from the executed workflow
+    - route: str - Sub-workflow chosen by the supervisor router
+    - routeSource: str - How the route was decided (form, rule, model or llm)
+    - analysisType: str - Analysis sub-type chosen together with the route, if any
     """
     type: ChatHistoryType
     formType: ChatHistoryFormType
@@ -25,6 +33,9 @@ class SupervisorState(TypedDict, total=False):
     userMsgId: str
     AIMsgId: str
     workflowResult: dict
+    route: str
+    routeSource: str
+    analysisType: str
 
 
 class WritingWorkflowState(TypedDict, total=False):
@@ -44,6 +55,8 @@ class WritingWorkflowState(TypedDict, total=False):
     - improved_text: str - AI-suggested improved version of the text
     - writingId: str - Database ID after saving the writing
     - messages: List[AnyMessage] - LangGraph message history for the workflow
+    - node_timings: Dict[str, float] - Wall time in milliseconds per workflow node
+    - force: bool - Re-evaluate even if the same content was evaluated recently
     """
     id: str
     title: str
@@ -58,6 +71,8 @@ class WritingWorkflowState(TypedDict, total=False):
     improved_text: str
     writingId: str
     messages: Annotated[List[AnyMessage], add_messages]
+    node_timings: Annotated[Dict[str, float], merge_timings]
+    force: bool
 
 
 class GeneralWorkflowState(TypedDict, total=False):
@@ -0,0 +1,133 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from langchain_core.utils.json import parse_partial_json
+
+# Stream modes requested from graph.astream(..., subgraphs=True)
+STREAM_MODES = ["updates", "messages", "values"]
+
+# Nodes whose free-text LLM output is the answer shown to the child.
+# Routing/classification calls also produce messages but are never streamed.
+TOKEN_NODES = {
+    "ask_general_question",
+    "macro_analysis",
+    "single_analysis",
+    "learning_advice",
+    "data_query",
+    "general_response",
+}
+
+# Node producing the structured writing evaluation; its feedback_student field
+# is streamed out of the partial tool-call arguments as it arrives
+EVALUATION_NODE = "evaluate"
+
+
+class ChatStreamTranslator:
+    """
+    Translate supervisor graph stream chunks into chat stream events.
+
+    Events (name → payload):
+    - route:         {"route"}                       sub-workflow chosen
+    - metadata:      {"genre", "subjects"}           writing classified
+    - score:         {"overallScore", "rubricScores"} writing evaluated
+    - feedback:      {"delta"}                       feedback_student text
+    - token:         {"node", "delta"}               answer text
+    - writing_saved: {"writingId"}                   writing stored
+    - saved:         {"userMsgId", "AIMsgId"}        chat messages stored
+
+    The final top-level graph state is kept in ``final_state`` so the caller
+    can build the same response body as the non-streaming endpoint.
+    """
+
+    def __init__(self):
+        self.final_state: Dict[str, Any] = {}
+        self._evaluation_args = ""
+        self._feedback_sent = ""
+
+    def translate(
+        self, namespace: Tuple[str, ...], mode: str, data: Any
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        if mode == "values":
+            if not namespace:
+                self.final_state = data
+            return []
+        if mode == "messages":
+            message, metadata = data
+            return self._from_message(message, metadata.get("langgraph_node"))
+        if mode == "updates":
+            events = []
+            for node, update in (data or {}).items():
+                events.extend(self._from_update(node, update or {}))
+            return events
+        return []
+
+    def _from_update(self, node: str, update: Dict[str, Any]):
+        if node == "route":
+            return [("route", {"route": update.get("route")})]
+        if node == "extract_metadata":
+            return [
+                (
+                    "metadata",
+                    {"genre": update.get("genre"), "subjects": update.get("subjects")},
+                )
+            ]
+        if node == EVALUATION_NODE:
+            events = [
+                (
+                    "score",
+                    {
+                        "overallScore": update.get("overall_score"),
+                        "rubricScores": update.get("rubric_scores"),
+                    },
+                )
+            ]
+            # Flush whatever part of the feedback was not streamed token-wise
+            events.extend(self._feedback_delta(update.get("feedback_student")))
+            return events
+        if node == "save":
+            return [("writing_saved", {"writingId": update.get("writingId")})]
+        if node == "save_message":
+            return [
+                (
+                    "saved",
+                    {
+                        "userMsgId": update.get("userMsgId"),
+                        "AIMsgId": update.get("AIMsgId"),
+                    },
+                )
+            ]
+        return []
+
+    def _from_message(self, message: Any, node: str):
+        if node in TOKEN_NODES:
+            delta = message.content if isinstance(message.content, str) else ""
+            return [("token", {"node": node, "delta": delta})] if delta else []
+
+        if node == EVALUATION_NODE:
+            # Streaming chunks carry partial JSON arguments, complete messages
+            # carry the parsed tool call
+            for chunk in getattr(message, "tool_call_chunks", None) or []:
+                self._evaluation_args += chunk.get("args") or ""
+            if self._evaluation_args:
+                args = parse_partial_json(self._evaluation_args) or {}
+            else:
+                calls = getattr(message, "tool_calls", None) or []
+                args = calls[0].get("args", {}) if calls else {}
+            return self._feedback_delta(args.get("feedback_student"))
+
+        return []
+
+    def _feedback_delta(self, feedback: Any):
+        if not isinstance(feedback, str) or not feedback.startswith(self._feedback_sent):
+            return []
+        delta = feedback[len(self._feedback_sent) :]
+        self._feedback_sent = feedback
+        return [("feedback", {"delta": delta})] if delta else []
+
+
+def format_sse(event: str, payload: Any) -> str:
+    """Serialize one Server-Sent Event"""
+    data = jsonable_encoder(payload, custom_encoder={ObjectId: str})
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
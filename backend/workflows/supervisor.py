@@ -1,7 +1,10 @@
-from typing import Dict, Any
-from workflows.workflow_general import build_general_workflow
-from workflows.workflow_writing import build_writing_workflow
-from workflows.workflow_analysis import build_analysis_workflow
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Literal, Optional, Tuple
+from pydantic import BaseModel, Field
+from workflows.registry import GraphRegistry
 from workflows.workflow_math import math_workflow_placeholder
 from db.constants import (
     ChatHistoryRole,
@@ -11,10 +14,44 @@ from db.constants import (
 )
 from db.models import ChatHistory
 from db.client import MongoDBClient
+from db.rollups import arecord_chats, record_chats
 from workflows.states import GeneralWorkflowState, SupervisorState, WritingWorkflowState
 from workflows.workflow_analysis import AnalysisWorkflowState
 from langgraph.graph import StateGraph, END, START
+from llm.admission import BACKGROUND, admission_scope
+from llm.cache import refresh_config
+from llm.errors import LLMUnavailableError
 from llm.provider import LLMProvider
+from workflows.utils import LazySingleton, graph_node
+from workflows.text_router import SYSTEM_RELATED, TextRouteClassifier
+from workflows.writing.tools import WritingDatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class TextRoute(BaseModel):
+    """Combined routing decision for a text message, made in one LLM call"""
+
+    category: Literal["system_related", "general"] = Field(
+        description=(
+            "system_related: questions about writing skills, analysis, improvement, "
+            "or anything related to this learning system. "
+            "general: general conversation, greetings, or unrelated topics."
+        )
+    )
+    analysis_type: Optional[
+        Literal[
+            "Macro Analysis", "Single Analysis", "Learning Advice", "Data Query", "General"
+        ]
+    ] = Field(
+        default=None,
+        description=(
+            "Only for system_related messages. Macro Analysis: overall writing "
+            "performance, trends, general skills. Single Analysis: a specific writing "
+            "piece or recent work. Learning Advice: how to improve or what to practice. "
+            "Data Query: searching or finding specific writings. General: none of these."
+        ),
+    )
 
 
 class SupervisorWorkflow:
@@ -23,7 +60,7 @@ class SupervisorWorkflow:
 
     Features:
     - Intelligent routing based on content type (FORM vs TEXT)
-    - LLM-powered classification for text messages
+    - Local fast-path classification for text messages, LLM fallback when unsure
     - Integration with all sub-workflows (writing, math, analysis, general)
     - Comprehensive message logging and database operations
     - Error handling and fallback routing
@@ -41,9 +78,21 @@ class SupervisorWorkflow:
     def __init__(self):
         """Initialize the supervisor workflow with shared resources."""
         self.mongodb = MongoDBClient.get_db()
-        self.llm = LLMProvider.get_llm()
+        self.llm = LLMProvider.get_llm(node="supervisor_router")
+        self.writing_db = WritingDatabaseManager()
+        # Rules + small local model; only low-confidence messages reach the LLM
+        self.text_classifier = TextRouteClassifier()
+        # Running async shadow checks, referenced so they are not collected
+        self._shadow_tasks = set()
+
+        # Combined prompt: top-level route and analysis sub-type in one call
+        self.routing_prompt_template = (
+            "Classify this message from a young student using the learning system. "
+            "Choose the category and, for system_related messages, the analysis type.\n\n"
+            "User message: {user_content}"
+        )
 
-        # Classification prompt template for text messages
+        # Plain-text classification prompt, fallback when structured output fails
         self.classification_prompt_template = """
         Classify this user message into one of these categories:
         1. "system_related" - Questions about writing skills, analysis, improvement, or anything related to this learning system
@@ -54,55 +103,215 @@ class SupervisorWorkflow:
         Return only "system_related" or "general".
         """
 
-    def supervisor_router(self, state: SupervisorState) -> str:
-        """Main supervisor routing logic to determine which workflow to use."""
-        print(">>>>>>>>>>enter supervisor router")
+    @staticmethod
+    def route_form(state: SupervisorState) -> str:
+        """Route form submissions based on form type."""
+        match state.get("formType"):
+            case ChatHistoryFormType.WRITING:
+                return "writing_workflow"
+            case ChatHistoryFormType.MATH:
+                return "math_workflow"
+            case _:
+                return "error"
+
+    @staticmethod
+    def route_classification(response) -> str:
+        """Map the LLM classification of a text message to a workflow."""
+        classification = str(response.content).strip().lower()
+
+        if "system_related" in classification:
+            return "analysis_workflow"
+        else:
+            return "general_workflow"
+
+    @staticmethod
+    def route_label(label: str) -> str:
+        """Map a local classifier label to a workflow."""
+        return "analysis_workflow" if label == SYSTEM_RELATED else "general_workflow"
+
+    def _text_route(self, decision: TextRoute) -> Tuple[str, Optional[str]]:
+        route = self.route_label(decision.category)
+        analysis_type = decision.analysis_type if route == "analysis_workflow" else None
+        return route, analysis_type
+
+    def llm_route(self, user_content: str) -> Tuple[str, Optional[str]]:
+        """Classify with the LLM; returns (route, analysis sub-type or None)."""
+        try:
+            structured_llm = self.llm.with_structured_output(TextRoute)
+            decision = structured_llm.invoke(
+                self.routing_prompt_template.format(user_content=user_content)
+            )
+            return self._text_route(decision)
+        except LLMUnavailableError:
+            # Overload or outage: a fallback call would fail the same way
+            raise
+        except Exception as e:
+            logger.warning("Structured routing failed, falling back to text classification: %s", e)
+            response = self.llm.invoke(
+                self.classification_prompt_template.format(user_content=user_content)
+            )
+            return self.route_classification(response), None
+
+    async def allm_route(self, user_content: str) -> Tuple[str, Optional[str]]:
+        """Async variant of llm_route."""
+        try:
+            structured_llm = self.llm.with_structured_output(TextRoute)
+            decision = await structured_llm.ainvoke(
+                self.routing_prompt_template.format(user_content=user_content)
+            )
+            return self._text_route(decision)
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            logger.warning("Structured routing failed, falling back to text classification: %s", e)
+            response = await self.llm.ainvoke(
+                self.classification_prompt_template.format(user_content=user_content)
+            )
+            return self.route_classification(response), None
+
+    # Shadow checks compare a local routing decision with the LLM's to measure
+    # accuracy online. Nobody waits for them: they run after the response, at
+    # background priority, and a failed check is simply not counted.
+    _shadow_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="route-shadow")
+
+    def _shadow_check(self, route: str, user_content: str):
+        try:
+            with admission_scope("route_shadow", BACKGROUND):
+                llm_route, _ = self.llm_route(user_content)
+        except Exception as e:
+            logger.debug("Shadow routing check failed: %s", e)
+            return
+        self.text_classifier.record_shadow(route, llm_route)
+
+    async def _ashadow_check(self, route: str, user_content: str):
+        try:
+            with admission_scope("route_shadow", BACKGROUND):
+                llm_route, _ = await self.allm_route(user_content)
+        except Exception as e:
+            logger.debug("Shadow routing check failed: %s", e)
+            return
+        self.text_classifier.record_shadow(route, llm_route)
+
+    def route_text(self, user_content: str) -> Tuple[str, str, Optional[str]]:
+        """
+        Route a text message.
 
+        Returns (route, source of the decision, analysis sub-type). The sub-type
+        is only known when the LLM made the decision; local decisions leave it
+        to the analysis workflow's own classifier.
+        """
+        decision = self.text_classifier.classify(user_content)
+        if decision is not None:
+            label, source = decision
+            route = self.route_label(label)
+            if self.text_classifier.sample_shadow():
+                self._shadow_executor.submit(
+                    contextvars.copy_context().run, self._shadow_check, route, user_content
+                )
+            return route, source, None
+
+        route, analysis_type = self.llm_route(user_content)
+        return route, "llm", analysis_type
+
+    async def aroute_text(self, user_content: str) -> Tuple[str, str, Optional[str]]:
+        """Async variant of route_text."""
+        decision = self.text_classifier.classify(user_content)
+        if decision is not None:
+            label, source = decision
+            route = self.route_label(label)
+            if self.text_classifier.sample_shadow():
+                task = asyncio.create_task(self._ashadow_check(route, user_content))
+                self._shadow_tasks.add(task)
+                task.add_done_callback(self._shadow_tasks.discard)
+            return route, source, None
+
+        route, analysis_type = await self.allm_route(user_content)
+        return route, "llm", analysis_type
+
+    @staticmethod
+    def _text_route_update(route: str, source: str, analysis_type: Optional[str]):
+        update = {"route": route, "routeSource": source}
+        if analysis_type:
+            update["analysisType"] = analysis_type
+        return update
+
+    def resolve_route(self, state: SupervisorState) -> Dict[str, str]:
+        """Determine the workflow and record how the decision was made."""
         if state.get("type") == ChatHistoryType.FORM:
             # Handle form submissions based on form type
-            match state.get("formType"):
-                case ChatHistoryFormType.WRITING:
-                    return "writing_workflow"
-                case ChatHistoryFormType.MATH:
-                    return "math_workflow"
-                case _:
-                    return "error"
+            return {"route": self.route_form(state), "routeSource": "form"}
 
         if state.get("type") == ChatHistoryType.TEXT:
-            # Handle text input with LLM classification
-            user_content = state.get("userContent", "")
+            return self._text_route_update(*self.route_text(state.get("userContent", "")))
+
+        return {"route": "error"}
 
-            # Use LLM to classify the message
-            classification_prompt = self.classification_prompt_template.format(
-                user_content=user_content
+    async def aresolve_route(self, state: SupervisorState) -> Dict[str, str]:
+        """Async variant of resolve_route."""
+        if state.get("type") == ChatHistoryType.FORM:
+            return {"route": self.route_form(state), "routeSource": "form"}
+
+        if state.get("type") == ChatHistoryType.TEXT:
+            return self._text_route_update(
+                *(await self.aroute_text(state.get("userContent", "")))
             )
 
-            response = self.llm.invoke(classification_prompt)
-            classification = str(response.content).strip().lower()
+        return {"route": "error"}
 
-            if "system_related" in classification:
-                return "analysis_workflow"
-            else:
-                return "general_workflow"
+    def supervisor_router(self, state: SupervisorState) -> str:
+        """Main supervisor routing logic to determine which workflow to use."""
+        logger.debug("Supervisor router")
+        return self.resolve_route(state)["route"]
 
-        return "error"
+    async def asupervisor_router(self, state: SupervisorState) -> str:
+        """Async variant of supervisor_router."""
+        logger.debug("Supervisor router (async)")
+        return (await self.aresolve_route(state))["route"]
 
-    def writing_workflow(self, state: SupervisorState) -> Dict[str, Any]:
-        """Handle writing form submissions and evaluation."""
-        print(">>>>>writing workflow entry point")
+    @staticmethod
+    def _writing_state(state: SupervisorState) -> WritingWorkflowState:
         # if it's submitted writing, the payload should contains title and text.
         payload = state.get("payload", {})
 
         title = payload.get("title", "")
         text = payload.get("text", "")
-        print(payload)
+        logger.debug("Writing payload %s", payload)
+
+        return WritingWorkflowState(title=title, text=text, force=bool(payload.get("force")))
+
+    @staticmethod
+    def _duplicate_result(writing: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info("Duplicate writing submission, reusing %s", writing["_id"])
+        return {
+            "AIContent": "",
+            "workflowResult": {
+                "overallScore": writing.get("overall_score"),
+                "writingId": str(writing["_id"]),
+                "feedback": writing.get("feedback_student"),
+                "duplicate": True,
+            },
+        }
+
+    def find_duplicate_writing(self, state: SupervisorState) -> Optional[Dict[str, Any]]:
+        """Recently evaluated writing with the same content, unless forced"""
+        payload = state.get("payload", {})
+        if payload.get("force"):
+            return None
+        return self.writing_db.find_duplicate(payload.get("title", ""), payload.get("text", ""))
 
-        writingState = WritingWorkflowState(title=title, text=text)
+    async def afind_duplicate_writing(self, state: SupervisorState) -> Optional[Dict[str, Any]]:
+        """Async variant of find_duplicate_writing."""
+        payload = state.get("payload", {})
+        if payload.get("force"):
+            return None
+        return await self.writing_db.afind_duplicate(
+            payload.get("title", ""), payload.get("text", "")
+        )
 
-        subgraph = build_writing_workflow()
-        writingWorkflowResult = subgraph.invoke(writingState)
-        print(">>>>> writing work flow result")
-        print(writingWorkflowResult)
+    @staticmethod
+    def _writing_result(writingWorkflowResult: Dict[str, Any]) -> Dict[str, Any]:
+        logger.debug("Writing workflow result %s", writingWorkflowResult)
+        logger.debug("Writing node timings (ms) %s", writingWorkflowResult.get("node_timings"))
 
         return {
             "AIContent": "",
@@ -113,21 +322,62 @@ class SupervisorWorkflow:
             },
         }
 
-    def analysis_workflow(self, state: SupervisorState) -> Dict[str, Any]:
-        """Handle system-related questions with analysis workflows."""
-        print(">>>>>analysis workflow entry point")
-        analysisState = AnalysisWorkflowState(
+    def writing_workflow(self, state: SupervisorState) -> Dict[str, Any]:
+        """Handle writing form submissions and evaluation."""
+        logger.debug("Writing workflow")
+        duplicate = self.find_duplicate_writing(state)
+        if duplicate is not None:
+            return self._duplicate_result(duplicate)
+
+        subgraph = GraphRegistry.get("writing")
+        writing_state = self._writing_state(state)
+        # A forced re-evaluation must reach the model, not the response cache
+        writingWorkflowResult = subgraph.invoke(
+            writing_state, config=refresh_config(writing_state["force"])
+        )
+        return self._writing_result(writingWorkflowResult)
+
+    async def awriting_workflow(self, state: SupervisorState) -> Dict[str, Any]:
+        """Async variant of writing_workflow."""
+        logger.debug("Writing workflow (async)")
+        duplicate = await self.afind_duplicate_writing(state)
+        if duplicate is not None:
+            return self._duplicate_result(duplicate)
+
+        subgraph = GraphRegistry.get("writing")
+        writing_state = self._writing_state(state)
+
+        async def evaluate() -> Dict[str, Any]:
+            return await subgraph.ainvoke(
+                writing_state, config=refresh_config(writing_state["force"])
+            )
+
+        if writing_state["force"]:
+            return self._writing_result(await evaluate())
+        # An identical submission still being evaluated is awaited, not re-run
+        writingWorkflowResult, duplicate = await self.writing_db.aevaluate_once(
+            writing_state["title"], writing_state["text"], evaluate
+        )
+        if duplicate:
+            return self._duplicate_result(writingWorkflowResult)
+        return self._writing_result(writingWorkflowResult)
+
+    @staticmethod
+    def _analysis_state(state: SupervisorState) -> AnalysisWorkflowState:
+        # A sub-type from the combined router lets the analysis graph skip its
+        # own classification call
+        return AnalysisWorkflowState(
             userContent=state.get("userContent", ""),
             AIContent="",
-            analysis_type="",
-            question="",
+            analysis_type=state.get("analysisType", ""),
+            question=state.get("userContent", ""),
             tools_used=[],
             analysis_result={},
             suggestions=[],
         )
-        subgraph = build_analysis_workflow()
-        analysisResult = subgraph.invoke(analysisState)
 
+    @staticmethod
+    def _analysis_result(analysisResult: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "AIContent": analysisResult.get("AIContent"),
             "workflowResult": {
@@ -137,23 +387,48 @@ class SupervisorWorkflow:
             },
         }
 
+    def analysis_workflow(self, state: SupervisorState) -> Dict[str, Any]:
+        """Handle system-related questions with analysis workflows."""
+        logger.debug("Analysis workflow")
+        subgraph = GraphRegistry.get("analysis")
+        analysisResult = subgraph.invoke(self._analysis_state(state))
+        return self._analysis_result(analysisResult)
+
+    async def aanalysis_workflow(self, state: SupervisorState) -> Dict[str, Any]:
+        """Async variant of analysis_workflow."""
+        logger.debug("Analysis workflow (async)")
+        subgraph = GraphRegistry.get("analysis")
+        analysisResult = await subgraph.ainvoke(self._analysis_state(state))
+        return self._analysis_result(analysisResult)
+
     def math_workflow(self, state: SupervisorState) -> Dict[str, Any]:
         """Handle math form submissions - placeholder implementation."""
-        print(">>>>>math workflow entry point")
+        logger.debug("Math workflow")
         return math_workflow_placeholder(state)
 
+    async def amath_workflow(self, state: SupervisorState) -> Dict[str, Any]:
+        """Async variant of math_workflow."""
+        return self.math_workflow(state)
+
     def general_workflow(self, state: SupervisorState) -> Dict[str, Any]:
         """Handle general conversation and Q&A."""
-        print(">>>>>general workflow entry point")
+        logger.debug("General workflow")
         generalState = GeneralWorkflowState(userContent=state.get("userContent", ""))
-        subgraph = build_general_workflow()
+        subgraph = GraphRegistry.get("general")
         generalWorkflowResult = subgraph.invoke(generalState)
         return {"AIContent": generalWorkflowResult.get("AIContent")}
 
-    def save_message_to_db(self, state: SupervisorState) -> Dict[str, Any]:
-        """Save both user and AI messages to the database with metadata."""
-        print(">>>>>>>>>>save message to db")
+    async def ageneral_workflow(self, state: SupervisorState) -> Dict[str, Any]:
+        """Async variant of general_workflow."""
+        logger.debug("General workflow (async)")
+        generalState = GeneralWorkflowState(userContent=state.get("userContent", ""))
+        subgraph = GraphRegistry.get("general")
+        generalWorkflowResult = await subgraph.ainvoke(generalState)
+        return {"AIContent": generalWorkflowResult.get("AIContent")}
 
+    @staticmethod
+    def _chat_records(state: SupervisorState) -> Tuple[ChatHistory, ChatHistory]:
+        """User and AI chat history records for a finished exchange."""
         workflow_result = state.get("workflowResult")
 
         # Create user message record
@@ -163,10 +438,11 @@ class SupervisorWorkflow:
             formType=state.get("formType"),
             content=state.get("userContent", ""),
             payload=state.get("payload"),
+            route=state.get("route"),
+            routeSource=state.get("routeSource"),
         )
 
-        print(">>>>user message")
-        print(messageData_User)
+        logger.debug("User message %s", messageData_User)
 
         # Create AI message record
         messageDate_AI = ChatHistory(
@@ -180,6 +456,13 @@ class SupervisorWorkflow:
         if state.get("type") == ChatHistoryType.FORM:
             messageDate_AI.payload = workflow_result
 
+        return messageData_User, messageDate_AI
+
+    def save_message_to_db(self, state: SupervisorState) -> Dict[str, Any]:
+        """Save both user and AI messages to the database with metadata."""
+        logger.debug("Saving messages")
+        messageData_User, messageDate_AI = self._chat_records(state)
+
         # Insert both messages and return their IDs
         userMsgId = (
             self.mongodb[CollectionName.CHATHISTORY.value]
@@ -191,54 +474,133 @@ class SupervisorWorkflow:
             .insert_one(messageDate_AI.model_dump())
             .inserted_id
         )
+        record_chats(self.mongodb, 2)
         return {"userMsgId": str(userMsgId), "AIMsgId": str(AIMsgId)}
 
+    async def asave_message_to_db(self, state: SupervisorState) -> Dict[str, Any]:
+        """Async variant of save_message_to_db, on the async Mongo client."""
+        logger.debug("Saving messages (async)")
+        messageData_User, messageDate_AI = self._chat_records(state)
+
+        db = MongoDBClient.get_async_db()
+        collection = db[CollectionName.CHATHISTORY.value]
+        userMsgId = (await collection.insert_one(messageData_User.model_dump())).inserted_id
+        AIMsgId = (await collection.insert_one(messageDate_AI.model_dump())).inserted_id
+        await arecord_chats(db, 2)
+        return {"userMsgId": str(userMsgId), "AIMsgId": str(AIMsgId)}
+
+
+# Shared workflow instance, built on first use
+_supervisor = LazySingleton(SupervisorWorkflow)
+
+
+def get_supervisor_workflow() -> SupervisorWorkflow:
+    """Shared SupervisorWorkflow, built on first use or during warmup"""
+    return _supervisor.get()
 
-# Create shared workflow instance
-_supervisor_workflow = SupervisorWorkflow()
+
+def __getattr__(name: str):
+    # The instance used to be a module attribute built at import
+    if name == "_supervisor_workflow":
+        return get_supervisor_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Function wrappers for LangGraph compatibility
 def supervisor_router(state: SupervisorState) -> str:
-    return _supervisor_workflow.supervisor_router(state)
+    return get_supervisor_workflow().supervisor_router(state)
+
+
+def route_request(state: SupervisorState) -> Dict[str, Any]:
+    return get_supervisor_workflow().resolve_route(state)
+
+
+def route_from_state(state: SupervisorState) -> str:
+    return state.get("route", "error")
 
 
 def writing_workflow(state: SupervisorState) -> Dict[str, Any]:
-    return _supervisor_workflow.writing_workflow(state)
+    return get_supervisor_workflow().writing_workflow(state)
 
 
 def analysis_workflow(state: SupervisorState) -> Dict[str, Any]:
-    return _supervisor_workflow.analysis_workflow(state)
+    return get_supervisor_workflow().analysis_workflow(state)
 
 
 def math_workflow(state: SupervisorState) -> Dict[str, Any]:
-    return _supervisor_workflow.math_workflow(state)
+    return get_supervisor_workflow().math_workflow(state)
 
 
 def general_workflow(state: SupervisorState) -> Dict[str, Any]:
-    return _supervisor_workflow.general_workflow(state)
+    return get_supervisor_workflow().general_workflow(state)
 
 
 def save_message_to_db(state: SupervisorState) -> Dict[str, Any]:
-    return _supervisor_workflow.save_message_to_db(state)
+    return get_supervisor_workflow().save_message_to_db(state)
+
+
+async def asupervisor_router(state: SupervisorState) -> str:
+    return await get_supervisor_workflow().asupervisor_router(state)
+
+
+async def aroute_request(state: SupervisorState) -> Dict[str, Any]:
+    return await get_supervisor_workflow().aresolve_route(state)
+
+
+async def awriting_workflow(state: SupervisorState) -> Dict[str, Any]:
+    return await get_supervisor_workflow().awriting_workflow(state)
+
+
+async def aanalysis_workflow(state: SupervisorState) -> Dict[str, Any]:
+    return await get_supervisor_workflow().aanalysis_workflow(state)
+
+
+async def amath_workflow(state: SupervisorState) -> Dict[str, Any]:
+    return await get_supervisor_workflow().amath_workflow(state)
+
+
+async def ageneral_workflow(state: SupervisorState) -> Dict[str, Any]:
+    return await get_supervisor_workflow().ageneral_workflow(state)
+
+
+async def asave_message_to_db(state: SupervisorState) -> Dict[str, Any]:
+    return await get_supervisor_workflow().asave_message_to_db(state)
 
 
 def build_supervisor():
-    """Build the main supervisor workflow"""
-    print(">>>>>>>>>>>enter build supervisor")
+    """
+    Build the main supervisor workflow.
+
+    Compiling is comparatively expensive; request handlers should use
+    GraphRegistry.get("supervisor") instead of calling this directly.
+    """
+    logger.debug("Building supervisor workflow")
     builder = StateGraph(SupervisorState)
 
+    # Routing runs as its own node so the decision is recorded in the state
+    # (and shows up as a separate update when the graph is streamed)
+    builder.add_node("route", graph_node(route_request, aroute_request))
+
     # Add all workflow nodes
-    builder.add_node("writing_workflow", writing_workflow)
-    builder.add_node("math_workflow", math_workflow)
-    builder.add_node("analysis_workflow", analysis_workflow)
-    builder.add_node("general_workflow", general_workflow)
-    builder.add_node("save_message", save_message_to_db)
+    builder.add_node(
+        "writing_workflow", graph_node(writing_workflow, awriting_workflow)
+    )
+    builder.add_node("math_workflow", graph_node(math_workflow, amath_workflow))
+    builder.add_node(
+        "analysis_workflow", graph_node(analysis_workflow, aanalysis_workflow)
+    )
+    builder.add_node(
+        "general_workflow", graph_node(general_workflow, ageneral_workflow)
+    )
+    builder.add_node(
+        "save_message", graph_node(save_message_to_db, asave_message_to_db)
+    )
 
-    # Main routing from START
+    # Main routing
+    builder.add_edge(START, "route")
     builder.add_conditional_edges(
-        START,
-        supervisor_router,
+        "route",
+        route_from_state,
         {
             "writing_workflow": "writing_workflow",
             "math_workflow": "math_workflow",
@@ -0,0 +1,277 @@
+import json
+import math
+import os
+import random
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Labels used by the supervisor's text classification prompt
+SYSTEM_RELATED = "system_related"
+GENERAL = "general"
+
+# Keyword rules: each list only decides a message when the other list does not
+# also match. Rules are deliberately narrow: a system rule needs first-person
+# context about the child's own work ("my story", "my spelling", "how did I
+# do"), since the same words are everyday English ("the story of the three
+# little pigs", "the score of the game", "improve at basketball"). Anything
+# else goes to the trained model or the LLM.
+_SUBJECTS = (
+    r"writing|writings|story|stories|essay|essays|poem|poems|"
+    r"grammar|spelling|punctuation|vocabulary|sentence structure"
+)
+SYSTEM_PATTERNS = [
+    re.compile(p)
+    for p in (
+        rf"\bmy ((last|latest|recent|new|first) )?({_SUBJECTS})\b",
+        r"\bmy (score|scores|grade|grades|rubric|feedback|results|progress|mistakes)\b",
+        r"\bmy (weakness|weaknesses|strengths?)\b",
+        rf"\b(improve|get better at|work on|practi[cs]e) (my )?({_SUBJECTS})\b",
+        r"^how (am i|did i|have i been) (doing|do|done)( so far)?[\s!.?]*$",
+        r"^what should i (practice|practise|work on)( next)?[\s!.?]*$",
+    )
+]
+GENERAL_PATTERNS = [
+    re.compile(p)
+    for p in (
+        r"^(hi|hello|hey|yo|good (morning|afternoon|evening|night)|bye|goodbye|thanks|thank you)( there)?[\s!.?]*$",
+        r"\b(tell me a joke|a funny joke)\b",
+        r"^(how are you|what'?s your name|who are you)[\s!.?]*$",
+    )
+]
+RULE_CONFIDENCE = 0.95
+
+
+class TfidfLogisticModel:
+    """
+    Tiny TF-IDF + logistic regression text classifier in pure Python.
+
+    Features are lower-cased unigrams and bigrams, weighted by TF-IDF and
+    L2-normalised. The model predicts P(system_related). It is small enough to
+    train in seconds on a few thousand logged messages and is stored as JSON.
+    """
+
+    def __init__(
+        self,
+        vocab: Optional[Dict[str, int]] = None,
+        idf: Optional[List[float]] = None,
+        weights: Optional[List[float]] = None,
+        bias: float = 0.0,
+    ):
+        self.vocab = vocab or {}
+        self.idf = idf or []
+        self.weights = weights or [0.0] * len(self.vocab)
+        self.bias = bias
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def vectorize(self, text: str) -> Dict[int, float]:
+        counts = Counter(t for t in self.tokenize(text) if t in self.vocab)
+        vector = {self.vocab[t]: c * self.idf[self.vocab[t]] for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {i: v / norm for i, v in vector.items()}
+
+    def _score(self, vector: Dict[int, float]) -> float:
+        z = self.bias + sum(self.weights[i] * v for i, v in vector.items())
+        # Numerically stable sigmoid
+        if z >= 0:
+            return 1.0 / (1.0 + math.exp(-z))
+        ez = math.exp(z)
+        return ez / (1.0 + ez)
+
+    def predict_proba(self, text: str) -> float:
+        """Probability that ``text`` is system_related"""
+        return self._score(self.vectorize(text))
+
+    @classmethod
+    def train(
+        cls,
+        texts: List[str],
+        labels: List[int],
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 1e-4,
+        min_df: int = 1,
+        seed: int = 0,
+    ) -> "TfidfLogisticModel":
+        """Fit the model; ``labels`` are 1 for system_related, 0 for general"""
+        document_frequency = Counter()
+        for text in texts:
+            document_frequency.update(set(cls.tokenize(text)))
+        terms = sorted(t for t, df in document_frequency.items() if df >= min_df)
+        vocab = {t: i for i, t in enumerate(terms)}
+        n_docs = len(texts)
+        idf = [math.log((1 + n_docs) / (1 + document_frequency[t])) + 1 for t in terms]
+
+        model = cls(vocab=vocab, idf=idf)
+        samples = [(model.vectorize(t), y) for t, y in zip(texts, labels)]
+        rng = random.Random(seed)
+        for _ in range(epochs):
+            rng.shuffle(samples)
+            for vector, y in samples:
+                error = model._score(vector) - y
+                for i, v in vector.items():
+                    model.weights[i] -= learning_rate * (error * v + l2 * model.weights[i])
+                model.bias -= learning_rate * error
+        return model
+
+    def to_dict(self) -> dict:
+        return {
+            "vocab": self.vocab,
+            "idf": self.idf,
+            "weights": self.weights,
+            "bias": self.bias,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TfidfLogisticModel":
+        return cls(data["vocab"], data["idf"], data["weights"], data["bias"])
+
+    def save(self, path: str):
+        Path(path).write_text(json.dumps(self.to_dict()))
+
+    @classmethod
+    def load(cls, path: str) -> "TfidfLogisticModel":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+class TextRouteClassifier:
+    """
+    Local fast path for the supervisor's system_related/general decision.
+
+    Keyword rules are tried first, then the trained TF-IDF model if one is
+    available. A decision is only returned when its confidence reaches the
+    threshold; otherwise classify() returns None and the caller asks the LLM.
+
+    Configuration (environment):
+    - TEXT_ROUTER_MODEL_PATH: trained model file (default text_router_model.json)
+    - TEXT_ROUTER_THRESHOLD: minimum confidence for a local decision (default 0.85)
+    - TEXT_ROUTER_SHADOW_RATE: share of local decisions that are also sent to
+      the LLM to measure agreement online (default 0, i.e. never)
+    """
+
+    def __init__(
+        self,
+        model: Optional[TfidfLogisticModel] = None,
+        threshold: Optional[float] = None,
+        shadow_rate: Optional[float] = None,
+        use_rules: bool = True,
+    ):
+        if model is None:
+            model_path = os.getenv("TEXT_ROUTER_MODEL_PATH", "text_router_model.json")
+            if Path(model_path).exists():
+                model = TfidfLogisticModel.load(model_path)
+        self.model = model
+        self.threshold = (
+            threshold
+            if threshold is not None
+            else float(os.getenv("TEXT_ROUTER_THRESHOLD", "0.85"))
+        )
+        self.shadow_rate = (
+            shadow_rate
+            if shadow_rate is not None
+            else float(os.getenv("TEXT_ROUTER_SHADOW_RATE", "0"))
+        )
+        self.use_rules = use_rules
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def _rule_label(self, text: str) -> Optional[str]:
+        lowered = text.strip().lower()
+        system = any(p.search(lowered) for p in SYSTEM_PATTERNS)
+        general = any(p.search(lowered) for p in GENERAL_PATTERNS)
+        if system and not general:
+            return SYSTEM_RELATED
+        if general and not system:
+            return GENERAL
+        return None
+
+    def predict(self, text: str) -> Tuple[Optional[str], float, str]:
+        """Best local guess as (label, confidence, source), without counting it"""
+        if self.use_rules:
+            label = self._rule_label(text)
+            if label is not None:
+                return label, RULE_CONFIDENCE, "rule"
+
+        if self.model is not None:
+            p = self.model.predict_proba(text)
+            if p >= 0.5:
+                return SYSTEM_RELATED, p, "model"
+            return GENERAL, 1.0 - p, "model"
+
+        return None, 0.0, "none"
+
+    def classify(self, text: str) -> Optional[Tuple[str, str]]:
+        """
+        Return (label, source) for a confident local decision, or None when
+        the caller should fall back to the LLM.
+        """
+        label, confidence, source = self.predict(text)
+        with self._lock:
+            self._counters["decisions"] += 1
+            if label is not None and confidence >= self.threshold:
+                self._counters[f"{source}_hits"] += 1
+                self._counters[f"local_{label}"] += 1
+                return label, source
+            self._counters["llm_fallbacks"] += 1
+        return None
+
+    def sample_shadow(self) -> bool:
+        """Whether a local decision should also be checked against the LLM"""
+        return self.shadow_rate > 0 and random.random() < self.shadow_rate
+
+    def record_shadow(self, local_label: str, llm_label: str):
+        with self._lock:
+            self._counters["shadow_checked"] += 1
+            if local_label == llm_label:
+                self._counters["shadow_agreed"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            counters = dict(self._counters)
+        decisions = counters.get("decisions", 0)
+        local = counters.get("rule_hits", 0) + counters.get("model_hits", 0)
+        checked = counters.get("shadow_checked", 0)
+        return {
+            "decisions": decisions,
+            "rule_hits": counters.get("rule_hits", 0),
+            "model_hits": counters.get("model_hits", 0),
+            "llm_fallbacks": counters.get("llm_fallbacks", 0),
+            "hit_rate": local / decisions if decisions else 0.0,
+            "shadow_checked": checked,
+            "shadow_agreed": counters.get("shadow_agreed", 0),
+            "shadow_accuracy": (
+                counters.get("shadow_agreed", 0) / checked if checked else None
+            ),
+            "model_loaded": self.model is not None,
+        }
+
+
+def evaluate(
+    classifier: TextRouteClassifier, samples: Iterable[Tuple[str, str]]
+) -> Dict[str, float]:
+    """
+    Measure a classifier against labelled (text, label) samples.
+
+    coverage is the share of samples decided locally; accuracy_on_covered is
+    the accuracy of those local decisions; overall_accuracy assumes the LLM
+    fallback is always right and is therefore an upper bound.
+    """
+    total = covered = correct = 0
+    for text, label in samples:
+        total += 1
+        local_label, confidence, _ = classifier.predict(text)
+        if local_label is not None and confidence >= classifier.threshold:
+            covered += 1
+            correct += local_label == label
+    return {
+        "samples": total,
+        "coverage": covered / total if total else 0.0,
+        "accuracy_on_covered": correct / covered if covered else 0.0,
+        "overall_accuracy": (correct + total - covered) / total if total else 0.0,
+    }
@@ -1,3 +1,86 @@
+import functools
+import threading
+import time
+from typing import Any, Awaitable, Callable, Generic, Optional, TypeVar
+from langchain_core.runnables import RunnableLambda
+
+T = TypeVar("T")
+
+
+def graph_node(
+    func: Callable[..., Any], afunc: Callable[..., Awaitable[Any]]
+) -> RunnableLambda:
+    """
+    Pair a sync and an async implementation of the same node or router.
+
+    The resulting runnable is used for graph.invoke() through ``func`` and for
+    graph.ainvoke()/astream() through ``afunc``, so one compiled graph serves
+    both execution paths.
+    """
+    return RunnableLambda(func, afunc=afunc, name=func.__name__)
+
+
+def timed_graph_node(
+    name: str, func: Callable[..., Any], afunc: Callable[..., Awaitable[Any]]
+) -> RunnableLambda:
+    """
+    Like graph_node, but adds the node's wall time in milliseconds to its
+    update as ``{"node_timings": {name: ms}}``.
+
+    The state must declare ``node_timings`` with a merging reducer so that
+    nodes running in parallel can report their timings in the same step.
+    """
+
+    @functools.wraps(func)
+    def timed(state):
+        start = time.perf_counter()
+        update = func(state) or {}
+        elapsed = (time.perf_counter() - start) * 1000
+        return {**update, "node_timings": {name: round(elapsed, 1)}}
+
+    @functools.wraps(afunc)
+    async def atimed(state):
+        start = time.perf_counter()
+        update = await afunc(state) or {}
+        elapsed = (time.perf_counter() - start) * 1000
+        return {**update, "node_timings": {name: round(elapsed, 1)}}
+
+    return graph_node(timed, atimed)
+
+
+class LazySingleton(Generic[T]):
+    """
+    Shared instance built by ``factory`` on first get() instead of at import.
+
+    Workflow classes create their LLM and MongoDB handles in __init__; building
+    them lazily keeps imports (app startup, test collection, worker forks)
+    free of that work. Concurrent first calls build a single instance.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                self._instance = self._factory()
+            return self._instance
+
+    @property
+    def ready(self) -> bool:
+        return self._instance is not None
+
+    def reset(self):
+        """Drop the instance; the next get() builds a new one"""
+        with self._lock:
+            self._instance = None
+
+
 
 
 class FormHandler:
@@ -3,7 +3,8 @@ from langgraph.graph import StateGraph, END
 from workflows.states import AnalysisWorkflowState as AnalysisState
 from workflows.writing.tools import WritingAnalysisTools, WritingDatabaseManager
 from llm.provider import LLMProvider
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+from workflows.utils import graph_node
 
 
 # AnalysisWorkflowState is now defined in workflows/states.py
@@ -16,14 +17,13 @@ class AnalysisWorkflow:
 
     def __init__(self):
         self.llm = LLMProvider.get_llm()
+        self.classifier_llm = LLMProvider.get_llm(node="classify_question")
         self.analysis_tools = WritingAnalysisTools()
         self.db_manager = WritingDatabaseManager()
 
-    def classify_question(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
-        """Classify the user question into analysis type"""
-        question = state.get("userContent", "")
-
-        classification_prompt = f"""
+    @staticmethod
+    def _classification_prompt(question: str) -> str:
+        return f"""
         Classify this question about writing skills into one of these categories:
         1. Macro Analysis - questions about overall writing performance, trends, general skills
         2. Single Analysis - questions about a specific writing piece or recent work
@@ -36,31 +36,64 @@ class AnalysisWorkflow:
         If the question doesn't fit any category, return "General".
         """
 
-        response = self.llm.invoke(classification_prompt)
+    def classify_question(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        """Classify the user question into analysis type"""
+        question = state.get("userContent", "")
+
+        response = self.classifier_llm.invoke(self._classification_prompt(question))
         analysis_type = str(response.content).strip()
 
         return {"analysis_type": analysis_type, "question": question}
 
-    def macro_analysis_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
-        """Handle macro analysis questions"""
-        question = state.get("question", "")
+    async def aclassify_question(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        """Async variant of classify_question"""
+        question = state.get("userContent", "")
 
+        response = await self.classifier_llm.ainvoke(self._classification_prompt(question))
+        analysis_type = str(response.content).strip()
+
+        return {"analysis_type": analysis_type, "question": question}
+
+    # Each analysis type is split into a data-gathering step that reads MongoDB,
+    # with a sync (blocking client) and an async (async client) variant, and a
+    # shared step that builds the prompt from the data; the LLM call follows.
+
+    @staticmethod
+    def _wants_overview(question: str) -> bool:
+        return "overall" in question.lower() or "general" in question.lower()
+
+    @staticmethod
+    def _wants_weaknesses(question: str) -> bool:
+        return "weakness" in question.lower() or "improve" in question.lower()
+
+    def _prepare_macro_analysis(self, question: str) -> Tuple[str, Dict[str, Any]]:
         # Determine which tools to use based on question
-        tools_to_use = []
         results = {}
-
-        if "overall" in question.lower() or "general" in question.lower():
+        if self._wants_overview(question):
             # Get recent writings and average scores
-            recent_writings = self.db_manager.get_recent_writings(10)
-            avg_score = self.analysis_tools.execute(operation='avg_score_by_type')
-            tools_to_use.extend(["get_recent_writings", "get_avg_score_by_type"])
-            results.update({"recent_writings": recent_writings, "avg_score": avg_score})
-
-        if "weakness" in question.lower() or "improve" in question.lower():
+            results["recent_writings"] = self.db_manager.get_recent_writings(10)
+            results["avg_score"] = self.analysis_tools.execute(operation='avg_score_by_type')
+        if self._wants_weaknesses(question):
             # Get common weaknesses
-            weaknesses = self.analysis_tools.execute(operation='common_weaknesses')
+            results["common_weaknesses"] = self.analysis_tools.execute(operation='common_weaknesses')
+        return self._macro_analysis_prompt(question, results)
+
+    async def _aprepare_macro_analysis(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        results = {}
+        if self._wants_overview(question):
+            results["recent_writings"] = await self.db_manager.aget_recent_writings(10)
+            results["avg_score"] = await self.analysis_tools.aexecute(operation='avg_score_by_type')
+        if self._wants_weaknesses(question):
+            results["common_weaknesses"] = await self.analysis_tools.aexecute(operation='common_weaknesses')
+        return self._macro_analysis_prompt(question, results)
+
+    @staticmethod
+    def _macro_analysis_prompt(question: str, results: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        tools_to_use = []
+        if "recent_writings" in results:
+            tools_to_use.extend(["get_recent_writings", "get_avg_score_by_type"])
+        if "common_weaknesses" in results:
             tools_to_use.append("get_common_weaknesses")
-            results["common_weaknesses"] = weaknesses
 
         # Generate AI response using results
         analysis_prompt = f"""
@@ -74,26 +107,35 @@ class AnalysisWorkflow:
         Provide a helpful, encouraging response suitable for a child and their parents.
         """
 
-        response = self.llm.invoke(analysis_prompt)
-
-        return {
-            "tools_used": tools_to_use,
-            "analysis_result": results,
-            "AIContent": str(response.content),
-        }
-
-    def single_analysis_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
-        """Handle single writing analysis questions"""
-        question = state.get("question", "")
+        return analysis_prompt, {"tools_used": tools_to_use, "analysis_result": results}
 
+    def _prepare_single_analysis(self, question: str) -> Tuple[str, Dict[str, Any]]:
         # Get most recent writing for analysis
         recent_writings = self.db_manager.get_recent_writings(1)
+        writing_details = None
+        if recent_writings:
+            writing_details = self.analysis_tools.execute(
+                operation='single_writing_details', writing_id=str(recent_writings[0]["_id"])
+            )
+        return self._single_analysis_prompt(question, recent_writings, writing_details)
+
+    async def _aprepare_single_analysis(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        recent_writings = await self.db_manager.aget_recent_writings(1)
+        writing_details = None
+        if recent_writings:
+            writing_details = await self.analysis_tools.aexecute(
+                operation='single_writing_details', writing_id=str(recent_writings[0]["_id"])
+            )
+        return self._single_analysis_prompt(question, recent_writings, writing_details)
+
+    @staticmethod
+    def _single_analysis_prompt(
+        question: str, recent_writings: List[Dict], writing_details: Optional[Dict]
+    ) -> Tuple[str, Dict[str, Any]]:
         tools_used = ["get_recent_writings"]
 
         if recent_writings:
-            writing_id = str(recent_writings[0]["_id"])
-            recent_writings[0]["_id"] = writing_id
-            writing_details = self.analysis_tools.execute(operation='single_writing_details', writing_id=writing_id)
+            recent_writings[0]["_id"] = str(recent_writings[0]["_id"])
             tools_used.append("get_single_writing_details")
 
             analysis_prompt = f"""
@@ -111,22 +153,22 @@ class AnalysisWorkflow:
         else:
             analysis_prompt = f"I don't see any writings to analyze yet. Please submit a writing first, and then I can help analyze it!"
 
-        response = self.llm.invoke(analysis_prompt)
-
-        return {
+        return analysis_prompt, {
             "tools_used": tools_used,
             "analysis_result": {
                 "recent_writing": recent_writings[0] if recent_writings else None
             },
-            "AIContent": str(response.content),
         }
 
-    def learning_advice_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
-        """Handle learning advice questions"""
-        question = state.get("question", "")
-
+    def _prepare_learning_advice(self, question: str) -> Tuple[str, Dict[str, Any]]:
         # Get top weakness and generate advice
-        top_weakness = self.analysis_tools.get_top_weakness()
+        return self._learning_advice_prompt(question, self.analysis_tools.get_top_weakness())
+
+    async def _aprepare_learning_advice(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        return self._learning_advice_prompt(question, await self.analysis_tools.aget_top_weakness())
+
+    @staticmethod
+    def _learning_advice_prompt(question: str, top_weakness: str) -> Tuple[str, Dict[str, Any]]:
         # Simplified learning advice - would need dedicated learning tools module
         practice_topics = ["Grammar and sentence structure", "Vocabulary expansion", "Organization and flow"]
         writing_prompt = f"Write a short story about {top_weakness.replace('_', ' ')}"
@@ -148,41 +190,45 @@ class AnalysisWorkflow:
         Give encouraging, specific advice suitable for a child, including the practice topics and writing prompt.
         """
 
-        response = self.llm.invoke(advice_prompt)
-
-        return {
+        return advice_prompt, {
             "tools_used": tools_used,
             "analysis_result": {
                 "top_weakness": top_weakness,
                 "practice_topics": practice_topics,
                 "writing_prompt": writing_prompt,
             },
-            "AIContent": str(response.content),
         }
 
-    def data_query_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
-        """Handle data query questions"""
-        question = state.get("question", "")
-
+    @staticmethod
+    def _data_query_plan(question: str) -> Tuple[List[str], int]:
+        """Tools a data query uses and how many recent writings it reads (0: none)"""
         # Simple keyword-based routing for data queries
-        tools_used = []
-        results = {}
-
         if "date" in question.lower() or "when" in question.lower():
             # This would need date extraction logic in a real implementation
-            tools_used.append("search_writings_by_date")
-            results["message"] = "Please specify the date range you'd like to search."
-
-        elif "type" in question.lower() or "genre" in question.lower():
+            return ["search_writings_by_date"], 0
+        if "type" in question.lower() or "genre" in question.lower():
             # Get all writings for now, in real implementation would extract type
-            recent_writings = self.db_manager.get_recent_writings(20)
-            tools_used.extend(["get_recent_writings", "search_writings_by_type"])
-            results["writings"] = recent_writings
-
+            return ["get_recent_writings", "search_writings_by_type"], 20
+        return ["get_recent_writings"], 10
+
+    def _prepare_data_query(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        tools_used, n = self._data_query_plan(question)
+        writings = self.db_manager.get_recent_writings(n) if n else None
+        return self._data_query_prompt(question, tools_used, writings)
+
+    async def _aprepare_data_query(self, question: str) -> Tuple[str, Dict[str, Any]]:
+        tools_used, n = self._data_query_plan(question)
+        writings = await self.db_manager.aget_recent_writings(n) if n else None
+        return self._data_query_prompt(question, tools_used, writings)
+
+    @staticmethod
+    def _data_query_prompt(
+        question: str, tools_used: List[str], writings: Optional[List[Dict]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        if writings is None:
+            results = {"message": "Please specify the date range you'd like to search."}
         else:
-            recent_writings = self.db_manager.get_recent_writings(10)
-            tools_used.append("get_recent_writings")
-            results["writings"] = recent_writings
+            results = {"writings": writings}
 
         query_prompt = f"""
         Answer this data query about writings: {question}
@@ -192,13 +238,58 @@ class AnalysisWorkflow:
         Provide a helpful summary of the data found.
         """
 
-        response = self.llm.invoke(query_prompt)
+        return query_prompt, {"tools_used": tools_used, "analysis_result": results}
 
-        return {
-            "tools_used": tools_used,
-            "analysis_result": results,
-            "AIContent": str(response.content),
-        }
+    def _run(self, prepare, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        prompt, result = prepare(state.get("question", ""))
+        response = self.llm.invoke(prompt)
+        return {**result, "AIContent": str(response.content)}
+
+    async def _arun(self, aprepare, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        prompt, result = await aprepare(state.get("question", ""))
+        response = await self.llm.ainvoke(prompt)
+        return {**result, "AIContent": str(response.content)}
+
+    def macro_analysis_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        """Handle macro analysis questions"""
+        return self._run(self._prepare_macro_analysis, state)
+
+    async def amacro_analysis_workflow(
+        self, state: AnalysisWorkflowState
+    ) -> Dict[str, Any]:
+        return await self._arun(self._aprepare_macro_analysis, state)
+
+    def single_analysis_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        """Handle single writing analysis questions"""
+        return self._run(self._prepare_single_analysis, state)
+
+    async def asingle_analysis_workflow(
+        self, state: AnalysisWorkflowState
+    ) -> Dict[str, Any]:
+        return await self._arun(self._aprepare_single_analysis, state)
+
+    def learning_advice_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        """Handle learning advice questions"""
+        return self._run(self._prepare_learning_advice, state)
+
+    async def alearning_advice_workflow(
+        self, state: AnalysisWorkflowState
+    ) -> Dict[str, Any]:
+        return await self._arun(self._aprepare_learning_advice, state)
+
+    def data_query_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        """Handle data query questions"""
+        return self._run(self._prepare_data_query, state)
+
+    async def adata_query_workflow(self, state: AnalysisWorkflowState) -> Dict[str, Any]:
+        return await self._arun(self._aprepare_data_query, state)
+
+
+def route_analysis_entry(state: AnalysisWorkflowState) -> str:
+    """Skip classification when the supervisor already chose the analysis type"""
+    if state.get("analysis_type"):
+        return route_analysis_type(state)
+    return "classify"
 
 
 def route_analysis_type(state: AnalysisWorkflowState) -> str:
@@ -221,7 +312,7 @@ def general_response_node(state: AnalysisWorkflowState) -> Dict[str, Any]:
     """Handle general questions not fitting other categories"""
     question = state.get("question", "")
 
-    llm = LLMProvider.get_llm()
+    llm = LLMProvider.get_llm(node="general_response_node")
     response = llm.invoke(
         f"Please provide a helpful response to this question about writing: {question}"
     )
@@ -229,21 +320,64 @@ def general_response_node(state: AnalysisWorkflowState) -> Dict[str, Any]:
     return {"AIContent": str(response.content), "tools_used": [], "analysis_result": {}}
 
 
+async def ageneral_response_node(state: AnalysisWorkflowState) -> Dict[str, Any]:
+    """Async variant of general_response_node"""
+    question = state.get("question", "")
+
+    llm = LLMProvider.get_llm(node="general_response_node")
+    response = await llm.ainvoke(
+        f"Please provide a helpful response to this question about writing: {question}"
+    )
+
+    return {"AIContent": str(response.content), "tools_used": [], "analysis_result": {}}
+
+
 def build_analysis_workflow():
     """Build the analysis workflow graph"""
     workflow = AnalysisWorkflow()
     builder = StateGraph(AnalysisWorkflowState)
 
     # Add nodes
-    builder.add_node("classify", workflow.classify_question)
-    builder.add_node("macro_analysis", workflow.macro_analysis_workflow)
-    builder.add_node("single_analysis", workflow.single_analysis_workflow)
-    builder.add_node("learning_advice", workflow.learning_advice_workflow)
-    builder.add_node("data_query", workflow.data_query_workflow)
-    builder.add_node("general_response", general_response_node)
-
-    # Set entry point and routing
-    builder.set_entry_point("classify")
+    builder.add_node(
+        "classify", graph_node(workflow.classify_question, workflow.aclassify_question)
+    )
+    builder.add_node(
+        "macro_analysis",
+        graph_node(workflow.macro_analysis_workflow, workflow.amacro_analysis_workflow),
+    )
+    builder.add_node(
+        "single_analysis",
+        graph_node(
+            workflow.single_analysis_workflow, workflow.asingle_analysis_workflow
+        ),
+    )
+    builder.add_node(
+        "learning_advice",
+        graph_node(
+            workflow.learning_advice_workflow, workflow.alearning_advice_workflow
+        ),
+    )
+    builder.add_node(
+        "data_query",
+        graph_node(workflow.data_query_workflow, workflow.adata_query_workflow),
+    )
+    builder.add_node(
+        "general_response", graph_node(general_response_node, ageneral_response_node)
+    )
+
+    # Set entry point and routing; "classify" only runs when the supervisor's
+    # combined router did not already provide the analysis type
+    builder.set_conditional_entry_point(
+        route_analysis_entry,
+        {
+            "classify": "classify",
+            "macro_analysis": "macro_analysis",
+            "single_analysis": "single_analysis",
+            "learning_advice": "learning_advice",
+            "data_query": "data_query",
+            "general_response": "general_response",
+        },
+    )
     builder.add_conditional_edges(
         "classify",
         route_analysis_type,
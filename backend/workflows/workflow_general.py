@@ -3,6 +3,7 @@ from workflows.states import GeneralWorkflowState
 from db.client import MongoDBClient
 from llm.provider import LLMProvider
 from langgraph.graph import StateGraph, END
+from workflows.utils import LazySingleton, graph_node
 
 
 class GeneralWorkflow:
@@ -29,17 +30,23 @@ class GeneralWorkflow:
             "in a friendly tone. Otherwise, respond to him in a way that he can accept."
         )
     
-    def ask_general_question(self, state: GeneralWorkflowState) -> Dict[str, Any]:
-        """Process general questions with child-appropriate responses."""
-        prompt = [
+    def _general_prompt(self, state: GeneralWorkflowState):
+        return [
             {
                 "role": "system",
                 "content": self.system_prompt,
             },
             {"role": "user", "content": state.get("userContent", "")},
         ]
-        
-        msg = self.llm.invoke(prompt)
+
+    def ask_general_question(self, state: GeneralWorkflowState) -> Dict[str, Any]:
+        """Process general questions with child-appropriate responses."""
+        msg = self.llm.invoke(self._general_prompt(state))
+        return {"AIContent": msg.content}
+
+    async def aask_general_question(self, state: GeneralWorkflowState) -> Dict[str, Any]:
+        """Async variant of ask_general_question."""
+        msg = await self.llm.ainvoke(self._general_prompt(state))
         return {"AIContent": msg.content}
     
     def handle_educational_query(self, state: GeneralWorkflowState) -> Dict[str, Any]:
@@ -60,17 +67,37 @@ class GeneralWorkflow:
         return {"AIContent": msg.content}
 
 
-# Create shared workflow instance
-_general_workflow = GeneralWorkflow()
+# Shared workflow instance, built on first use
+_general = LazySingleton(GeneralWorkflow)
+
+
+def get_general_workflow() -> GeneralWorkflow:
+    """Shared GeneralWorkflow, built on first use or during warmup"""
+    return _general.get()
+
+
+def __getattr__(name: str):
+    # The instance used to be a module attribute built at import
+    if name == "_general_workflow":
+        return get_general_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Function wrapper for LangGraph compatibility
 def ask_general_question(state: GeneralWorkflowState) -> Dict[str, Any]:
-    return _general_workflow.ask_general_question(state)
+    return get_general_workflow().ask_general_question(state)
+
+
+async def aask_general_question(state: GeneralWorkflowState) -> Dict[str, Any]:
+    return await get_general_workflow().aask_general_question(state)
 
 
 def build_general_workflow():
     builder = StateGraph(GeneralWorkflowState)
-    builder.add_node("ask_general_question", ask_general_question)
+    builder.add_node(
+        "ask_general_question",
+        graph_node(ask_general_question, aask_general_question),
+    )
     builder.set_entry_point("ask_general_question")
 
     builder.add_edge("ask_general_question", END)
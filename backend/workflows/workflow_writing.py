@@ -1,6 +1,7 @@
+import logging
 from typing import Dict, Any
 from langchain_core.messages import AIMessage
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from workflows.states import WritingWorkflowState
 from workflows.writing.base_nodes import (
     WritingClassificationNode,
@@ -9,6 +10,11 @@ from workflows.writing.base_nodes import (
     ResponsePreparationNode,
 )
 from workflows.writing.tools import WritingDatabaseManager
+from workflows.utils import LazySingleton, timed_graph_node
+from llm.admission import BACKGROUND, admission_scope
+from llm.cache import refresh_config
+
+logger = logging.getLogger(__name__)
 
 
 class WritingWorkflow:
@@ -16,19 +22,26 @@ class WritingWorkflow:
     Class-based writing workflow for processing and evaluating student writing.
 
     Workflow Pipeline:
-        [START]
-            ↓
-        [Extract Metadata]  (Genre and Subjects identification, using LLM)
-            ↓
-        [Fetch Criterion]  (Read the rateable dimensions from MongoDB)
-            ↓
-        [Evaluate and improve Writing] (By LLM)
-            ↓
-        [Save to DB]
-            ↓
-        [Prepare Response]
-            ↓
-        [END]
+                    [START]
+                       ↓
+              [Fetch Criterion]  (Read the rateable dimensions from MongoDB)
+                 ↙          ↘
+    [Extract Metadata]    [Evaluate and improve Writing]
+    (Genre and Subjects,   (By LLM)
+     using LLM)
+                 ↘          ↙
+                  [Save to DB]  (waits for both branches)
+                        ↓
+                [Prepare Response]
+                        ↓
+                      [END]
+
+    Evaluation does not depend on the genre/subjects, so the two LLM calls run
+    in the same step; the submission takes roughly as long as the slower call
+    instead of the sum of both. The criteria fetch goes first because
+    LangGraph steps are synchronous: a fetch→evaluate chain alongside
+    classification would still wait for classification between its two
+    nodes. Each node records its wall time in ``node_timings``.
     """
 
     def __init__(self):
@@ -61,45 +74,166 @@ class WritingWorkflow:
         """Prepare the final response with feedback for student and parent."""
         return self.response_node.execute(state)
 
+    # Async variants used by graph.ainvoke()
+
+    async def aextract_metadata(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        return await self.classification_node.aexecute(state)
+
+    async def afetch_criteria(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        criteria = await self.db_manager.aexecute(operation="get_criteria")
+        return {"criteria": str(criteria)}
+
+    async def aevaluate_writing(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        return await self.evaluation_node.aexecute(state)
+
+    async def asave_to_db(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        return await self.database_save_node.aexecute(state)
+
+    async def aprepare_response(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        return await self.response_node.aexecute(state)
+
 
-# Create shared workflow instance
-_writing_workflow = WritingWorkflow()
+# Shared workflow instance, built on first use
+_writing = LazySingleton(WritingWorkflow)
+
+
+def get_writing_workflow() -> WritingWorkflow:
+    """Shared WritingWorkflow, built on first use or during warmup"""
+    return _writing.get()
+
+
+def __getattr__(name: str):
+    # The instance used to be a module attribute built at import
+    if name == "_writing_workflow":
+        return get_writing_workflow()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Function wrappers for LangGraph compatibility
 def extract_metadata(state: WritingWorkflowState) -> Dict[str, Any]:
-    return _writing_workflow.extract_metadata(state)
+    return get_writing_workflow().extract_metadata(state)
 
 
 def fetch_criteria(state: WritingWorkflowState) -> Dict[str, Any]:
-    return _writing_workflow.fetch_criteria(state)
+    return get_writing_workflow().fetch_criteria(state)
 
 
 def evaluate_writing(state: WritingWorkflowState) -> Dict[str, Any]:
-    return _writing_workflow.evaluate_writing(state)
+    return get_writing_workflow().evaluate_writing(state)
 
 
 def save_to_db(state: WritingWorkflowState) -> Dict[str, Any]:
-    return _writing_workflow.save_to_db(state)
+    return get_writing_workflow().save_to_db(state)
 
 
 def prepare_response(state: WritingWorkflowState) -> Dict[str, Any]:
-    return _writing_workflow.prepare_response(state)
+    return get_writing_workflow().prepare_response(state)
+
+
+async def aextract_metadata(state: WritingWorkflowState) -> Dict[str, Any]:
+    return await get_writing_workflow().aextract_metadata(state)
+
+
+async def afetch_criteria(state: WritingWorkflowState) -> Dict[str, Any]:
+    return await get_writing_workflow().afetch_criteria(state)
+
+
+async def aevaluate_writing(state: WritingWorkflowState) -> Dict[str, Any]:
+    return await get_writing_workflow().aevaluate_writing(state)
+
+
+async def asave_to_db(state: WritingWorkflowState) -> Dict[str, Any]:
+    return await get_writing_workflow().asave_to_db(state)
+
+
+async def aprepare_response(state: WritingWorkflowState) -> Dict[str, Any]:
+    return await get_writing_workflow().aprepare_response(state)
+
+
+def _job_result(writing: Dict[str, Any], duplicate: bool = False) -> Dict[str, Any]:
+    return {
+        "writingId": str(writing.get("writingId") or writing.get("_id")),
+        "overallScore": writing.get("overall_score"),
+        "feedback": writing.get("feedback_student"),
+        "feedbackParent": writing.get("feedback_parent"),
+        "genre": writing.get("genre"),
+        "subjects": writing.get("subjects"),
+        "rubricScores": writing.get("rubric_scores"),
+        "improvedText": writing.get("improved_text"),
+        "nodeTimings": writing.get("node_timings"),
+        "duplicate": duplicate,
+    }
+
+
+async def evaluate_writing_job(job_input: Dict[str, Any], report) -> Dict[str, Any]:
+    """
+    Job handler for POST /writings/evaluate.
+
+    Runs the writing graph and reports every finished node, so GET /jobs/{id}
+    shows progress. Recently evaluated identical writings are returned as is
+    unless ``force`` is set, and so are identical writings still being
+    evaluated; a forced run bypasses the LLM response cache.
+    LLM calls run in the background priority class.
+    """
+    from workflows.registry import GraphRegistry
+
+    title = job_input.get("title", "")
+    text = job_input.get("text", "")
+    force = bool(job_input.get("force"))
+
+    db_manager = get_writing_workflow().db_manager
+    if not force:
+        duplicate = await db_manager.afind_duplicate(title, text)
+        if duplicate is not None:
+            return _job_result(duplicate, duplicate=True)
+
+    graph = GraphRegistry.get("writing")
+
+    async def evaluate() -> Dict[str, Any]:
+        final_state: Dict[str, Any] = {}
+        with admission_scope("writing_evaluation", BACKGROUND):
+            async for mode, data in graph.astream(
+                WritingWorkflowState(title=title, text=text, force=force),
+                config=refresh_config(force),
+                stream_mode=["updates", "values"],
+            ):
+                if mode == "updates":
+                    for node, update in (data or {}).items():
+                        await report(node, update or {})
+                else:
+                    final_state = data
+        return final_state
+
+    if force:
+        return _job_result(await evaluate())
+    writing, duplicate = await db_manager.aevaluate_once(title, text, evaluate)
+    return _job_result(writing, duplicate=duplicate)
 
 
 def build_writing_workflow():
-    print(">>>>>>>>>>build writing workflow")
+    logger.debug("Building writing workflow")
     builder = StateGraph(WritingWorkflowState)
-    builder.add_node("extract_metadata", extract_metadata)
-    builder.add_node("fetch_criteria", fetch_criteria)
-    builder.add_node("evaluate", evaluate_writing)
-    builder.add_node("save", save_to_db)
-    builder.add_node("respond", prepare_response)
-
-    builder.set_entry_point("extract_metadata")
-    builder.add_edge("extract_metadata", "fetch_criteria")
+    builder.add_node(
+        "extract_metadata",
+        timed_graph_node("extract_metadata", extract_metadata, aextract_metadata),
+    )
+    builder.add_node(
+        "fetch_criteria", timed_graph_node("fetch_criteria", fetch_criteria, afetch_criteria)
+    )
+    builder.add_node(
+        "evaluate", timed_graph_node("evaluate", evaluate_writing, aevaluate_writing)
+    )
+    builder.add_node("save", timed_graph_node("save", save_to_db, asave_to_db))
+    builder.add_node(
+        "respond", timed_graph_node("respond", prepare_response, aprepare_response)
+    )
+
+    # Fan out: classification runs alongside evaluation
+    builder.add_edge(START, "fetch_criteria")
+    builder.add_edge("fetch_criteria", "extract_metadata")
     builder.add_edge("fetch_criteria", "evaluate")
-    builder.add_edge("evaluate", "save")
+    # Join: save only runs once both branches have finished
+    builder.add_edge(["extract_metadata", "evaluate"], "save")
     builder.add_edge("save", "respond")
     builder.add_edge("respond", END)
 
@@ -1,10 +1,14 @@
+import logging
 from typing import Dict, Any, Optional, List, cast
 from langchain_core.messages import AIMessage
 from workflows.interfaces import BaseWorkflowNode
 from workflows.states import WritingWorkflowState
+from llm.errors import LLMUnavailableError
 from llm.provider import LLMProvider
 from pydantic import BaseModel, Field
 
+logger = logging.getLogger(__name__)
+
 
 # Pydantic models for structured LLM output
 class WritingClassification(BaseModel):
@@ -60,7 +64,8 @@ class WritingWorkflowNode(BaseWorkflowNode[WritingWorkflowState]):
 
     def __init__(self, llm=None):
         super().__init__()
-        self.llm = llm or LLMProvider.get_llm()
+        # Each node class gets the model configured for it in NODE_MODELS
+        self.llm = llm or LLMProvider.get_llm(node=type(self).__name__)
 
 
 class WritingLLMNode(WritingWorkflowNode):
@@ -70,17 +75,17 @@ class WritingLLMNode(WritingWorkflowNode):
         super().__init__(llm)
         self.system_prompt = system_prompt
 
-    def invoke_llm(self, prompt: str, use_system_prompt: bool = True) -> AIMessage:
-        """Invoke LLM with optional system prompt"""
+    def build_messages(self, prompt: str, use_system_prompt: bool = True):
+        """Prepend the system prompt to a user prompt when one is configured"""
         if use_system_prompt and self.system_prompt:
-            messages = [
+            return [
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": prompt},
             ]
-            result = self.llm.invoke(messages)
-        else:
-            result = self.llm.invoke(prompt)
+        return prompt
 
+    @staticmethod
+    def _as_ai_message(result) -> AIMessage:
         # Ensure we return an AIMessage
         if isinstance(result, AIMessage):
             return result
@@ -89,54 +94,98 @@ class WritingLLMNode(WritingWorkflowNode):
         else:
             return AIMessage(content=str(result))
 
+    def invoke_llm(self, prompt: str, use_system_prompt: bool = True) -> AIMessage:
+        """Invoke LLM with optional system prompt"""
+        result = self.llm.invoke(self.build_messages(prompt, use_system_prompt))
+        return self._as_ai_message(result)
+
+    async def ainvoke_llm(
+        self, prompt: str, use_system_prompt: bool = True
+    ) -> AIMessage:
+        """Async variant of invoke_llm"""
+        result = await self.llm.ainvoke(self.build_messages(prompt, use_system_prompt))
+        return self._as_ai_message(result)
+
 
 class WritingClassificationNode(WritingLLMNode):
     """Node for classifying writing genre and subjects using structured output"""
 
+    @staticmethod
+    def build_prompt(state: WritingWorkflowState) -> str:
+        return (
+            f"Analyze the following writing and classify it:\n\n"
+            f"Title: {state.get('title')}\n"
+            f"Text: {state.get('text')}\n\n"
+            f"Please identify:\n"
+            f"1. The genre of the writing\n"
+            f"2. The main subjects or topics covered in the writing\n"
+        )
+
+    @staticmethod
+    def build_legacy_prompt(state: WritingWorkflowState) -> str:
+        return f"Please identify the genre and subject, return a json string (not quote in code block) like {{\"genre\":\"genre of the writing\", \"subjects\":[\"subject1\",\"subject2\"]}} \nTitle: {state.get('title')}\n Text: {state.get('text')}"
+
+    @staticmethod
+    def parse_legacy(content: str) -> Dict[str, Any]:
+        from workflows.writing.tools import WritingJSONParser
+
+        parser = WritingJSONParser()
+        genre, subjects = parser.parse_genre_subject(content)
+
+        return {"genre": genre, "subjects": subjects}
+
     def execute(self, state: WritingWorkflowState) -> Dict[str, Any]:
         """New implementation using Pydantic structured output"""
-        print(">>>>>>>>>>Enter WritingClassificationNode>>>>>>>>")
+        logger.debug("WritingClassificationNode")
         try:
-            prompt = (
-                f"Analyze the following writing and classify it:\n\n"
-                f"Title: {state.get('title')}\n"
-                f"Text: {state.get('text')}\n\n"
-                f"Please identify:\n"
-                f"1. The genre of the writing\n"
-                f"2. The main subjects or topics covered in the writing\n"
-            )
-
             # Use structured output with Pydantic model
             structured_llm = self.llm.with_structured_output(WritingClassification)
-            result = cast(WritingClassification, structured_llm.invoke(prompt))
+            result = cast(
+                WritingClassification, structured_llm.invoke(self.build_prompt(state))
+            )
 
             return result.model_dump()
-            # Handle both Pydantic model and dict responses
-            # if hasattr(result, 'model_dump'):
-            #     return result.model_dump()
-            # elif isinstance(result, dict):
-            #     return result
-            # else:
-            #     # Convert to dict if it's a Pydantic model with dict() method
-            #     return result.dict() if hasattr(result, 'dict') else dict(result)
+
+        except LLMUnavailableError:
+            # Overload or outage: a fallback call would fail the same way
+            raise
 
         except Exception as e:
-            print(
-                f"Structured classification failed, falling back to legacy method: {e}"
+            logger.warning(
+                "Structured classification failed, falling back to legacy method: %s", e
             )
             return self.execute_legacy(state)
 
-    def execute_legacy(self, state: WritingWorkflowState) -> Dict[str, Any]:
-        """Legacy implementation using JSON parsing (kept for rollback)"""
-        prompt = f"Please identify the genre and subject, return a json string (not quote in code block) like {{\"genre\":\"genre of the writing\", \"subjects\":[\"subject1\",\"subject2\"]}} \nTitle: {state.get('title')}\n Text: {state.get('text')}"
-        msg = self.llm.invoke(prompt)
+    async def aexecute(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        """Async variant of execute"""
+        logger.debug("WritingClassificationNode (async)")
+        try:
+            structured_llm = self.llm.with_structured_output(WritingClassification)
+            result = cast(
+                WritingClassification,
+                await structured_llm.ainvoke(self.build_prompt(state)),
+            )
 
-        from workflows.writing.tools import WritingJSONParser
+            return result.model_dump()
 
-        parser = WritingJSONParser()
-        genre, subjects = parser.parse_genre_subject(str(msg.content))
+        except LLMUnavailableError:
+            raise
 
-        return {"genre": genre, "subjects": subjects}
+        except Exception as e:
+            logger.warning(
+                "Structured classification failed, falling back to legacy method: %s", e
+            )
+            return await self.aexecute_legacy(state)
+
+    def execute_legacy(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        """Legacy implementation using JSON parsing (kept for rollback)"""
+        msg = self.llm.invoke(self.build_legacy_prompt(state))
+        return self.parse_legacy(str(msg.content))
+
+    async def aexecute_legacy(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        """Async variant of execute_legacy"""
+        msg = await self.llm.ainvoke(self.build_legacy_prompt(state))
+        return self.parse_legacy(str(msg.content))
 
 
 class EvaluationNode(WritingLLMNode):
@@ -146,52 +195,23 @@ class EvaluationNode(WritingLLMNode):
         system_prompt = "You are a kind, friendly and professional teacher of a 6-year-old boy. Your task is to improve the student's skills."
         super().__init__(system_prompt, llm)
 
-    def execute(self, state: WritingWorkflowState) -> Dict[str, Any]:
-        """New implementation using Pydantic structured output"""
-        print(">>>>>>>>>>>>>Enter EvaluatingNode>>>>>>>>")
-        try:
-            prompt = (
-                f"Evaluate the following writing based on these criteria (use applicable ones): {state.get('criteria')}\n\n"
-                f"Title: {state.get('title')}\n"
-                f"Text: {state.get('text')}\n\n"
-                f"Provide:\n"
-                f"1. Overall score (1-10)\n"
-                f"2. Detailed rubric scores with dimensions and criteria\n"
-                f"3. Evaluation and Feedback for the student (strengths, suggestions, encouragement), use necessary markdown symbols\n"
-                f"4. Informative feedback for parents about the student's capability\n"
-                f"5. An improved sample writing, a better one with not only correct the mistakes"
-            )
-
-            # Use structured output with Pydantic model
-            structured_llm = self.llm.with_structured_output(WritingEvaluation)
-
-            if self.system_prompt:
-                messages = [
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": prompt},
-                ]
-                result = cast(WritingEvaluation, structured_llm.invoke(messages))
-            else:
-                result = cast(WritingEvaluation, structured_llm.invoke(prompt))
-
-            return result.model_dump()
-
-            # Handle both Pydantic model and dict responses
-            # if hasattr(result, "model_dump"):
-            #     return result.model_dump()
-            # elif isinstance(result, dict):
-            #     return result
-            # else:
-            #     # Convert to dict if it's a Pydantic model with dict() method
-            #     return result.dict() if hasattr(result, "dict") else dict(result)
-
-        except Exception as e:
-            print(f"Structured output failed, falling back to legacy method: {e}")
-            return self.execute_legacy(state)
+    @staticmethod
+    def build_prompt(state: WritingWorkflowState) -> str:
+        return (
+            f"Evaluate the following writing based on these criteria (use applicable ones): {state.get('criteria')}\n\n"
+            f"Title: {state.get('title')}\n"
+            f"Text: {state.get('text')}\n\n"
+            f"Provide:\n"
+            f"1. Overall score (1-10)\n"
+            f"2. Detailed rubric scores with dimensions and criteria\n"
+            f"3. Evaluation and Feedback for the student (strengths, suggestions, encouragement), use necessary markdown symbols\n"
+            f"4. Informative feedback for parents about the student's capability\n"
+            f"5. An improved sample writing, a better one with not only correct the mistakes"
+        )
 
-    def execute_legacy(self, state: WritingWorkflowState) -> Dict[str, Any]:
-        """Legacy implementation using JSON parsing (kept for rollback)"""
-        prompt = (
+    @staticmethod
+    def build_legacy_prompt(state: WritingWorkflowState) -> str:
+        return (
             f"Evaluate the following writing based on these criteria (No need to use all, use applicable ones):{state.get('criteria')}.\n"
             f"Title: {state.get('title')}"
             f"Text: {state.get('text')}"
@@ -200,12 +220,12 @@ class EvaluationNode(WritingLLMNode):
             f"(literally, do not quote in code block and no other words before and after, be careful of the quotation marks in the return text, don't break the json format)"
         )
 
-        msg = self.invoke_llm(prompt)
-
+    @staticmethod
+    def parse_legacy(content: str) -> Dict[str, Any]:
         from workflows.writing.tools import WritingJSONParser
 
         parser = WritingJSONParser()
-        evaluation_result = parser.parse_evaluation(str(msg.content))
+        evaluation_result = parser.parse_evaluation(content)
 
         return {
             "overall_score": evaluation_result[0],
@@ -215,6 +235,57 @@ class EvaluationNode(WritingLLMNode):
             "improved_text": evaluation_result[4],
         }
 
+    def execute(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        """New implementation using Pydantic structured output"""
+        logger.debug("EvaluationNode")
+        try:
+            # Use structured output with Pydantic model
+            structured_llm = self.llm.with_structured_output(WritingEvaluation)
+            result = cast(
+                WritingEvaluation,
+                structured_llm.invoke(self.build_messages(self.build_prompt(state))),
+            )
+
+            return result.model_dump()
+
+        except LLMUnavailableError:
+            raise
+
+        except Exception as e:
+            logger.warning("Structured output failed, falling back to legacy method: %s", e)
+            return self.execute_legacy(state)
+
+    async def aexecute(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        """Async variant of execute"""
+        logger.debug("EvaluationNode (async)")
+        try:
+            structured_llm = self.llm.with_structured_output(WritingEvaluation)
+            result = cast(
+                WritingEvaluation,
+                await structured_llm.ainvoke(
+                    self.build_messages(self.build_prompt(state))
+                ),
+            )
+
+            return result.model_dump()
+
+        except LLMUnavailableError:
+            raise
+
+        except Exception as e:
+            logger.warning("Structured output failed, falling back to legacy method: %s", e)
+            return await self.aexecute_legacy(state)
+
+    def execute_legacy(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        """Legacy implementation using JSON parsing (kept for rollback)"""
+        msg = self.invoke_llm(self.build_legacy_prompt(state))
+        return self.parse_legacy(str(msg.content))
+
+    async def aexecute_legacy(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        """Async variant of execute_legacy"""
+        msg = await self.ainvoke_llm(self.build_legacy_prompt(state))
+        return self.parse_legacy(str(msg.content))
+
 
 class DatabaseSaveNode(WritingWorkflowNode):
     """Node for saving writing data to database"""
@@ -223,8 +294,12 @@ class DatabaseSaveNode(WritingWorkflowNode):
         from workflows.writing.tools import WritingDatabaseManager
 
         db_manager = WritingDatabaseManager()
-        writing_id = db_manager.save_writing(state)
-        return {"writingId": writing_id}
+        return db_manager.save_writing(state)
+
+    async def aexecute(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        from workflows.writing.tools import WritingDatabaseManager
+
+        return await WritingDatabaseManager().asave_writing(state)
 
 
 class ResponsePreparationNode(WritingWorkflowNode):
@@ -233,3 +308,6 @@ class ResponsePreparationNode(WritingWorkflowNode):
     def execute(self, state: WritingWorkflowState) -> Dict[str, Any]:
         # Convert WritingWorkflowState to dict for final response
         return dict(state)
+
+    async def aexecute(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        return self.execute(state)
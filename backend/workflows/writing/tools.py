@@ -1,10 +1,24 @@
 import json
+import os
 import re
-from typing import Tuple, List, Optional, Dict, Any
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Tuple, List, Optional, Dict, Any
+from pymongo.errors import DuplicateKeyError
+from core.idempotency import IdempotencyStore
 from workflows.interfaces import BaseWorkflowTool
 from db.client import MongoDBClient
 from db.models import EnglishWriting, WritingCriteriaDimension
 from db.constants import CollectionName
+from db.indexes import INDEXES
+from db.rollups import (
+    aaverage_score,
+    acommon_weaknesses,
+    arecord_writing,
+    average_score,
+    common_weaknesses,
+    record_writing,
+)
 from workflows.states import WritingWorkflowState
 
 
@@ -71,11 +85,45 @@ class WritingJSONParser(BaseWorkflowTool):
 
 
 class WritingDatabaseManager(BaseWorkflowTool):
-    """Tool for managing writing-related database operations"""
-    
+    """
+    Tool for managing writing-related database operations.
+
+    Every query has a blocking method (sync client) and an ``a``-prefixed
+    coroutine (async client) with the same behaviour; async request paths
+    use the coroutines.
+    """
+
+    _indexes_ready = False
+    # Criteria only change with a redeploy: (loaded_at, criteria), shared by instances
+    _criteria: Optional[Tuple[float, Dict[str, Any]]] = None
+    # Evaluation a duplicate submission takes from the stored writing
+    _evaluation_fields = (
+        "genre",
+        "subjects",
+        "rubric_scores",
+        "overall_score",
+        "feedback_student",
+        "feedback_parent",
+        "improved_text",
+    )
+    # Evaluations in progress by content hash, shared with other workers through
+    # the idempotency collection; completed entries only bridge the gap until
+    # the saved writing is found by find_duplicate
+    _evaluations = IdempotencyStore(
+        ttl=60,
+        lease=int(os.getenv("IDEMPOTENCY_LEASE_SECONDS", "300")),
+        wait_timeout=float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120")),
+        persistent=os.getenv("IDEMPOTENCY_PERSISTENT", "true").lower() != "false",
+    )
+
     def __init__(self):
         self.mongodb = MongoDBClient.get_db()
         self.mongoclient = MongoDBClient.get_client()
+
+    @property
+    def amongodb(self):
+        """Async database handle, looked up on use (the client belongs to the event loop)"""
+        return MongoDBClient.get_async_db()
     
     def get_name(self) -> str:
         return "writing_database_manager"
@@ -89,13 +137,48 @@ class WritingDatabaseManager(BaseWorkflowTool):
             return self.get_writing_criteria()
         else:
             raise ValueError(f"Unknown database operation: {operation}")
+
+    async def aexecute(self, **kwargs) -> Any:
+        """Async variant of execute"""
+        operation = kwargs.get('operation')
+        if operation == 'save_writing':
+            return await self.asave_writing(kwargs['state'])
+        elif operation == 'get_criteria':
+            return await self.aget_writing_criteria()
+        else:
+            raise ValueError(f"Unknown database operation: {operation}")
     
+    @staticmethod
+    def criteria_ttl() -> float:
+        """Seconds the criteria are served from memory (WRITING_CRITERIA_TTL, default 300, 0 disables)"""
+        return float(os.getenv("WRITING_CRITERIA_TTL", "300"))
+
+    @classmethod
+    def _cached_criteria(cls) -> Optional[Dict[str, Any]]:
+        cached = cls._criteria
+        if cached is not None and time.monotonic() - cached[0] < cls.criteria_ttl():
+            return cached[1]
+        return None
+
     def get_writing_criteria(self) -> Dict[str, Any]:
-        """Get all criteria for evaluating writing"""
+        """Get all criteria for evaluating writing (cached, see criteria_ttl)"""
+        criteria = self._cached_criteria()
+        if criteria is None:
+            criteria = self.load_writing_criteria()
+            WritingDatabaseManager._criteria = (time.monotonic(), criteria)
+        return criteria
+
+    async def aget_writing_criteria(self) -> Dict[str, Any]:
+        criteria = self._cached_criteria()
+        if criteria is None:
+            criteria = await self.aload_writing_criteria()
+            WritingDatabaseManager._criteria = (time.monotonic(), criteria)
+        return criteria
+
+    @staticmethod
+    def _group_criteria(documents) -> Dict[str, Any]:
         from collections import defaultdict
-        
-        documents = self.mongodb[CollectionName.WRITING_CRITERIA.value].find()
-        
+
         dimension_map = defaultdict(list)
         for doc in documents:
             dimension = doc["dimension"]
@@ -109,9 +192,18 @@ class WritingDatabaseManager(BaseWorkflowTool):
             ]
         }
         return result
-    
-    def save_writing(self, state: WritingWorkflowState) -> str:
-        """Save writing to database"""
+
+    def load_writing_criteria(self) -> Dict[str, Any]:
+        """Read the criteria from MongoDB, grouped by dimension"""
+        documents = self.mongodb[CollectionName.WRITING_CRITERIA.value].find()
+        return self._group_criteria(documents)
+
+    async def aload_writing_criteria(self) -> Dict[str, Any]:
+        documents = await self.amongodb[CollectionName.WRITING_CRITERIA.value].find().to_list()
+        return self._group_criteria(documents)
+
+    @staticmethod
+    def _writing_record(state: WritingWorkflowState) -> EnglishWriting:
         # Convert rubric_scores to proper type if needed
         rubric_scores = state.get("rubric_scores")
         if rubric_scores and isinstance(rubric_scores, list):
@@ -126,9 +218,11 @@ class WritingDatabaseManager(BaseWorkflowTool):
                     converted_scores.append(score)
             rubric_scores = converted_scores
         
-        data = EnglishWriting(
-            title=state.get("title", ""),
-            text=state.get("text", ""),
+        title = state.get("title", "")
+        text = state.get("text", "")
+        return EnglishWriting(
+            title=title,
+            text=text,
             genre=state.get("genre"),
             subjects=state.get("subjects"),
             feedback_student=state.get("feedback_student"),
@@ -136,25 +230,157 @@ class WritingDatabaseManager(BaseWorkflowTool):
             overall_score=state.get("overall_score"),
             rubric_scores=rubric_scores,
             improved_text=state.get("improved_text"),
+            content_hash=EnglishWriting.compute_content_hash(title, text),
         )
-        
-        result = self.mongodb[CollectionName.ENG_WRITINGS.value].insert_one(data.model_dump())
-        return str(result.inserted_id)
+
+    @classmethod
+    def _stored_evaluation(cls, writing: Dict[str, Any]) -> Dict[str, Any]:
+        """State update that reports a stored writing instead of this run's evaluation"""
+        update = {field: writing.get(field) for field in cls._evaluation_fields}
+        update["writingId"] = str(writing["_id"])
+        return update
+
+    def save_writing(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        """
+        Save writing to database; returns the state update with its writingId.
+        If an identical submission was saved first, its writing and evaluation
+        are returned instead.
+        """
+        data = self._writing_record(state)
+        self.ensure_indexes()
+        collection = self.mongodb[CollectionName.ENG_WRITINGS.value]
+        doc = data.model_dump()
+        try:
+            result = collection.insert_one(doc)
+        except DuplicateKeyError:
+            # A concurrent identical submission was saved first: keep that one
+            existing = self.find_duplicate(data.title, data.text)
+            if existing is not None and not state.get("force"):
+                return self._stored_evaluation(existing)
+            # Re-evaluation: the older document stays as history without its hash
+            collection.update_many(
+                {"content_hash": data.content_hash}, {"$unset": {"content_hash": ""}}
+            )
+            doc = data.model_dump()
+            result = collection.insert_one(doc)
+        record_writing(self.mongodb, doc)
+        return {"writingId": str(result.inserted_id)}
+
+    async def asave_writing(self, state: WritingWorkflowState) -> Dict[str, Any]:
+        data = self._writing_record(state)
+        await self.aensure_indexes()
+        collection = self.amongodb[CollectionName.ENG_WRITINGS.value]
+        doc = data.model_dump()
+        try:
+            result = await collection.insert_one(doc)
+        except DuplicateKeyError:
+            existing = await self.afind_duplicate(data.title, data.text)
+            if existing is not None and not state.get("force"):
+                return self._stored_evaluation(existing)
+            await collection.update_many(
+                {"content_hash": data.content_hash}, {"$unset": {"content_hash": ""}}
+            )
+            doc = data.model_dump()
+            result = await collection.insert_one(doc)
+        await arecord_writing(self.amongodb, doc)
+        return {"writingId": str(result.inserted_id)}
+
+    def ensure_indexes(self):
+        """Declared englishWritings indexes (db.indexes), incl. the unique content hash"""
+        if WritingDatabaseManager._indexes_ready:
+            return
+        self.mongodb[CollectionName.ENG_WRITINGS.value].create_indexes(
+            INDEXES[CollectionName.ENG_WRITINGS]
+        )
+        WritingDatabaseManager._indexes_ready = True
+
+    async def aensure_indexes(self):
+        if WritingDatabaseManager._indexes_ready:
+            return
+        await self.amongodb[CollectionName.ENG_WRITINGS.value].create_indexes(
+            INDEXES[CollectionName.ENG_WRITINGS]
+        )
+        WritingDatabaseManager._indexes_ready = True
+
+    @staticmethod
+    def dedup_window() -> timedelta:
+        """How long a submission is answered from the stored evaluation
+        (WRITING_DEDUP_WINDOW_SECONDS, default one day, 0 disables)"""
+        return timedelta(seconds=int(os.getenv("WRITING_DEDUP_WINDOW_SECONDS", "86400")))
+
+    def _duplicate_query(self, title: str, text: str) -> Optional[Dict[str, Any]]:
+        window = self.dedup_window()
+        if not window:
+            return None
+        return {
+            "content_hash": EnglishWriting.compute_content_hash(title, text),
+            "created_at": {"$gte": datetime.now(timezone.utc) - window},
+        }
+
+    def find_duplicate(self, title: str, text: str) -> Optional[Dict[str, Any]]:
+        """Evaluated writing with the same content saved within the window"""
+        query = self._duplicate_query(title, text)
+        if query is None:
+            return None
+        return self.mongodb[CollectionName.ENG_WRITINGS.value].find_one(query)
+
+    async def afind_duplicate(self, title: str, text: str) -> Optional[Dict[str, Any]]:
+        query = self._duplicate_query(title, text)
+        if query is None:
+            return None
+        return await self.amongodb[CollectionName.ENG_WRITINGS.value].find_one(query)
+
+    async def aevaluate_once(
+        self,
+        title: str,
+        text: str,
+        evaluate: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run ``evaluate`` (the writing graph, returning its final state) unless
+        the same content is already being evaluated, here or in another worker.
+
+        Returns (writing, duplicate): this run's final state, or the writing
+        saved by the evaluation that claimed the content first, shaped like a
+        stored document. Call it after afind_duplicate found nothing.
+        """
+        if not self.dedup_window():
+            return await evaluate(), False
+        key = f"writing:{EnglishWriting.compute_content_hash(title, text)}"
+        stored = await self._evaluations.begin(key, key)
+        if stored is not None:
+            return stored, True
+        try:
+            final_state = await evaluate()
+        except BaseException as e:
+            await self._evaluations.fail(key, e)
+            raise
+        writing = {field: final_state.get(field) for field in self._evaluation_fields}
+        writing["_id"] = final_state.get("writingId")
+        await self._evaluations.complete(key, writing)
+        return final_state, False
     
     def get_recent_writings(self, n: int = 10) -> List[Dict]:
         """Get recent writings for analysis"""
         cursor = self.mongodb[CollectionName.ENG_WRITINGS.value].find().sort("created_at", -1).limit(n)
         return list(cursor)
+
+    async def aget_recent_writings(self, n: int = 10) -> List[Dict]:
+        cursor = self.amongodb[CollectionName.ENG_WRITINGS.value].find().sort("created_at", -1).limit(n)
+        return await cursor.to_list()
     
     def get_writing_by_id(self, writing_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific writing by ID"""
         from bson import ObjectId
         result = self.mongodb[CollectionName.ENG_WRITINGS.value].find_one({"_id": ObjectId(writing_id)})
         return result if result is not None else None
-    
+
+    async def aget_writing_by_id(self, writing_id: str) -> Optional[Dict[str, Any]]:
+        from bson import ObjectId
+        return await self.amongodb[CollectionName.ENG_WRITINGS.value].find_one({"_id": ObjectId(writing_id)})
+
     def search_writings_by_date(self, start_date: str, end_date: str) -> List[Dict]:
         """Search writings by date range"""
-        from datetime import datetime
         start = datetime.fromisoformat(start_date)
         end = datetime.fromisoformat(end_date)
         cursor = self.mongodb[CollectionName.ENG_WRITINGS.value].find({
@@ -169,7 +395,7 @@ class WritingDatabaseManager(BaseWorkflowTool):
 
 
 class WritingAnalysisTools(BaseWorkflowTool):
-    """Tools for analyzing writing performance"""
+    """Tools for analyzing writing performance (``a``-prefixed: async client)"""
     
     def __init__(self):
         self.db = WritingDatabaseManager()
@@ -189,38 +415,53 @@ class WritingAnalysisTools(BaseWorkflowTool):
             return self.get_single_writing_details(kwargs['writing_id'])
         else:
             raise ValueError(f"Unknown analysis operation: {operation}")
+
+    async def aexecute(self, **kwargs) -> Any:
+        """Async variant of execute"""
+        operation = kwargs.get('operation')
+
+        if operation == 'avg_score_by_type':
+            return await self.aget_avg_score_by_type(kwargs.get('essay_type'))
+        elif operation == 'common_weaknesses':
+            return await self.aget_common_weaknesses(kwargs.get('n', 5))
+        elif operation == 'single_writing_details':
+            return await self.aget_single_writing_details(kwargs['writing_id'])
+        else:
+            raise ValueError(f"Unknown analysis operation: {operation}")
     
     def get_avg_score_by_type(self, essay_type: str = None) -> float:
-        """Get average score by writing type"""
-        query = {"genre": essay_type} if essay_type else {}
-        cursor = self.db.mongodb[CollectionName.ENG_WRITINGS.value].find(query)
-        scores = [doc.get("overall_score", 0) for doc in cursor if doc.get("overall_score")]
-        return sum(scores) / len(scores) if scores else 0.0
+        """Get average score by writing type (from the analytics rollups)"""
+        return average_score(self.db.mongodb, essay_type)
+
+    async def aget_avg_score_by_type(self, essay_type: str = None) -> float:
+        return await aaverage_score(self.db.amongodb, essay_type)
     
     def get_common_weaknesses(self, n: int = 5) -> List[Dict]:
-        """Get most common weaknesses based on low-scoring criteria"""
-        pipeline = [
-            {"$unwind": "$rubric_scores"},
-            {"$unwind": "$rubric_scores.criteria"},
-            {"$match": {"rubric_scores.criteria.score": {"$lt": 7}}},
-            {"$group": {
-                "_id": "$rubric_scores.criteria.criterion",
-                "count": {"$sum": 1},
-                "avg_score": {"$avg": "$rubric_scores.criteria.score"}
-            }},
-            {"$sort": {"count": -1}},
-            {"$limit": n}
-        ]
-        return list(self.db.mongodb[CollectionName.ENG_WRITINGS.value].aggregate(pipeline))
+        """Get most common weaknesses based on low-scoring criteria (from the analytics rollups)"""
+        return common_weaknesses(self.db.mongodb, n)
+
+    async def aget_common_weaknesses(self, n: int = 5) -> List[Dict]:
+        return await acommon_weaknesses(self.db.amongodb, n)
+
+    @staticmethod
+    def _top_weakness(weaknesses: List[Dict]) -> str:
+        return weaknesses[0]["_id"] if weaknesses else "No weaknesses found"
     
     def get_top_weakness(self) -> str:
         """Get the most common weakness"""
-        weaknesses = self.get_common_weaknesses(1)
-        return weaknesses[0]["_id"] if weaknesses else "No weaknesses found"
+        return self._top_weakness(self.get_common_weaknesses(1))
+
+    async def aget_top_weakness(self) -> str:
+        return self._top_weakness(await self.aget_common_weaknesses(1))
     
     def get_single_writing_details(self, writing_id: str) -> Dict:
         """Get detailed analysis of a single writing"""
-        writing = self.db.get_writing_by_id(writing_id)
+        return self._writing_details(self.db.get_writing_by_id(writing_id))
+
+    async def aget_single_writing_details(self, writing_id: str) -> Dict:
+        return self._writing_details(await self.db.aget_writing_by_id(writing_id))
+
+    def _writing_details(self, writing: Optional[Dict]) -> Dict:
         if not writing:
             return {"error": "Writing not found"}
         
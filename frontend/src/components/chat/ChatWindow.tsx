@@ -26,7 +26,7 @@ function ChatWindow() {
   const containerRef = useRef<HTMLDivElement>(null);
 
   const dispatch = useDispatch<AppDispatch>();
-  const { messages, hasMore, loading } = useSelector(
+  const { messages, hasMore, loading, nextCursor } = useSelector(
     (state: RootState) => state.messages
   );
 
@@ -70,9 +70,8 @@ function ChatWindow() {
     if (containerRef.current?.scrollTop === 0) {
       //fetchMessages();
       if (!hasMore || loading) return;
-      const earliest = messages[0]?.date;
-      if (earliest) {
-        dispatch(fetchMessages(earliest.toString()));
+      if (nextCursor) {
+        dispatch(fetchMessages(nextCursor));
       }
     }
   };
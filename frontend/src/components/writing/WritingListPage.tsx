@@ -5,6 +5,7 @@ import { useEffect } from "react";
 import {
   fetchWritings,
   selectWritingLoading,
+  selectWritingNextCursor,
   selectWritings,
   selectWritingViewMode,
   setViewMode,
@@ -15,6 +16,7 @@ import { getThemeClasses, getThemeIcons } from "../../utils/themeUtils";
 function WritingListPage() {
   const dispatch = useDispatch<AppDispatch>();
   const writings = useSelector(selectWritings);
+  const nextCursor = useSelector(selectWritingNextCursor);
   const loading = useSelector(selectWritingLoading);
   const viewMode = useSelector(selectWritingViewMode);
   const { currentTheme } = useTheme();
@@ -25,7 +27,7 @@ function WritingListPage() {
     dispatch(fetchWritings());
   }, [dispatch]);
 
-  if (loading) {
+  if (loading && writings.length === 0) {
     return (
       <div className={`flex flex-col items-center justify-center min-h-96 space-y-4 bg-gradient-to-br ${currentTheme.colors.gradients.background} p-8 rounded-3xl`}>
         <div className="relative">
@@ -123,7 +125,7 @@ function WritingListPage() {
                     
                     <div className="flex items-center space-x-2 text-sm text-gray-500">
                       <span>📅</span>
-                      <span>{new Date(w.date).toLocaleDateString()}</span>
+                      <span>{w.created_at && new Date(w.created_at).toLocaleDateString()}</span>
                       {w.overall_score && (
                         <>
                           <span className="text-gray-300">•</span>
@@ -135,8 +137,8 @@ function WritingListPage() {
                       )}
                     </div>
                     
-                    <p className="text-gray-600 text-sm leading-relaxed line-clamp-3">
-                      {w.text.slice(0, 120)}...
+                    <p className="text-gray-600 text-sm">
+                      {[w.genre, `${w.word_count ?? 0} words`].filter(Boolean).join(" • ")}
                     </p>
                     
                     <div className={`pt-2 border-t border-gray-100`}>
@@ -173,17 +175,17 @@ function WritingListPage() {
                       <div className="flex items-center space-x-4 text-sm text-gray-500">
                         <div className="flex items-center space-x-1">
                           <span>📅</span>
-                          <span>{new Date(w.date).toLocaleDateString()}</span>
+                          <span>{w.created_at && new Date(w.created_at).toLocaleDateString()}</span>
                         </div>
                         <div className="flex items-center space-x-1">
                           <span>📝</span>
-                          <span>{w.text.length} characters</span>
+                          <span>{w.word_count ?? 0} words</span>
                         </div>
                       </div>
                       
-                      <p className="text-gray-600 line-clamp-2">
-                        {w.text.slice(0, 150)}...
-                      </p>
+                      {w.genre && (
+                        <p className="text-gray-600 capitalize">{w.genre}</p>
+                      )}
                     </div>
                     
                     <div className="ml-4 text-3xl group-hover:animate-bounce">
@@ -194,6 +196,18 @@ function WritingListPage() {
               ))}
             </div>
           )}
+
+          {nextCursor && (
+            <div className="flex justify-center">
+              <button
+                onClick={() => dispatch(fetchWritings(nextCursor))}
+                disabled={loading}
+                className={`bg-gradient-to-r ${currentTheme.colors.gradients.primary} text-white px-6 py-3 rounded-2xl font-semibold shadow-lg hover:shadow-xl transition-all duration-200 disabled:opacity-50`}
+              >
+                {loading ? "Loading..." : "Load more stories"}
+              </button>
+            </div>
+          )}
         </>
       )}
     </div>
@@ -9,15 +9,19 @@ interface WritingCriteriaDimension {
   criteria: CriterionScore[];
 }
 
+// Card fields returned by GET /writings
 type WritingPreview = {
   _id: string;
   title: string;
-  text: string;
-  date: Date;
-  overall_score: number;
+  genre?: string;
+  overall_score?: number;
+  word_count?: number;
+  created_at?: string;
 };
 
 type Writing = WritingPreview & {
+  text: string;
+  date: Date;
   genre: string;
   subjects?: string[];
   feedback_student?: string;
@@ -28,6 +28,8 @@ interface ChatState {
   messages: Message[];
   hasMore: boolean;
   loading: boolean;
+  // X-Next-Cursor of the oldest page loaded, for loading older messages
+  nextCursor?: string;
 }
 
 interface SendMessagePayload {
@@ -65,7 +67,7 @@ interface SendMessageError {
 
 interface FetchParams {
   limit: number;
-  beforeId?: string;
+  cursor?: string;
 }
 
 const initialState: ChatState = {
@@ -76,9 +78,9 @@ const initialState: ChatState = {
 
 const fetchMessages = createAsyncThunk(
   "chat/fetchChats",
-  async (beforeId?: string) => {
+  async (cursor?: string) => {
     const params: FetchParams = { limit: 30 };
-    if (beforeId) params.beforeId = beforeId;
+    if (cursor) params.cursor = cursor;
 
     const res = await axios.get<Message[]>(`${apiBaseUrl}/chats`, { params });
     // res.data.forEach((item) => {
@@ -87,7 +89,10 @@ const fetchMessages = createAsyncThunk(
     //   }
     // });
     console.log(res);
-    return res.data;
+    return {
+      messages: res.data,
+      nextCursor: res.headers["x-next-cursor"] as string | undefined,
+    };
   }
 );
 
@@ -194,15 +199,14 @@ const chatSlice = createSlice({
         state.loading = false;
         if (action.meta.arg) {
           // load more
-          state.messages = [...action.payload, ...state.messages];
+          state.messages = [...action.payload.messages, ...state.messages];
         } else {
           // init
-          state.messages = action.payload;
+          state.messages = action.payload.messages;
         }
 
-        if (action.payload.length < 30) {
-          state.hasMore = false;
-        }
+        state.nextCursor = action.payload.nextCursor;
+        state.hasMore = Boolean(action.payload.nextCursor);
       })
       .addCase(fetchMessages.rejected, (state) => {
         state.loading = false;
@@ -10,6 +10,8 @@ interface WritingState {
   //   selected?: Writing;
   viewMode: "grid" | "list";
   detail: Record<string, Writing>;
+  // X-Next-Cursor of the last page loaded, for loading more writings
+  nextCursor?: string;
 }
 
 const initialState: WritingState = {
@@ -19,14 +21,24 @@ const initialState: WritingState = {
   detail: {},
 };
 
-const fetchWritings = createAsyncThunk<WritingPreview[]>(
+interface WritingPage {
+  writings: WritingPreview[];
+  nextCursor?: string;
+}
+
+const fetchWritings = createAsyncThunk<WritingPage, string | undefined>(
   "writing/fetchAll",
-  async () => {
-    const res = await fetch(`${apiBaseUrl}/writings`);
+  async (cursor?: string) => {
+    const params = new URLSearchParams();
+    if (cursor) params.set("cursor", cursor);
+    const res = await fetch(`${apiBaseUrl}/writings?${params}`);
     if (!res.ok) {
       throw new Error("Failed to fetch writings");
     }
-    return (await res.json()) as WritingPreview[];
+    return {
+      writings: (await res.json()) as WritingPreview[],
+      nextCursor: res.headers.get("X-Next-Cursor") ?? undefined,
+    };
   }
 );
 
@@ -60,13 +72,13 @@ const writingSlice = createSlice({
       .addCase(fetchWritings.pending, (state) => {
         state.loading = true;
       })
-      .addCase(
-        fetchWritings.fulfilled,
-        (state, action: PayloadAction<WritingPreview[]>) => {
-          state.loading = false;
-          state.writings = action.payload;
-        }
-      )
+      .addCase(fetchWritings.fulfilled, (state, action) => {
+        state.loading = false;
+        state.writings = action.meta.arg
+          ? [...state.writings, ...action.payload.writings]
+          : action.payload.writings;
+        state.nextCursor = action.payload.nextCursor;
+      })
       .addCase(fetchWritings.rejected, (state) => {
         state.loading = false;
       })
@@ -94,6 +106,8 @@ export const { pushWriting, setViewMode, setLoading } = writingSlice.actions;
 export const selectWritings = (state: RootState) => state.writings.writings;
 export const selectWritingDetail = (id?: string) => (state: RootState) =>
   id ? state.writings.detail[id] : undefined;
+export const selectWritingNextCursor = (state: RootState) =>
+  state.writings.nextCursor;
 export const selectWritingLoading = (state: RootState) =>
   state.writings.loading;
 export const selectWritingViewMode = (state: RootState) =>